@@ -0,0 +1,125 @@
+# app/controllers/cambios_controller.py
+#
+# Re-resolución en caliente para escenarios "qué pasa si": en lugar de enviar y
+# resolver de nuevo el problema completo se envían sólo los cambios sobre una
+# solución anterior, que se repara (ver app/logic/cambios.py).
+#
+#   POST /resolver/cambios
+#   {
+#     "id_solucion": "...",                      # una solución devuelta antes por este endpoint
+#     "solucion": {"costos", "oferta", "demanda", "asignaciones", "metodo", "numerico", "tolerancia"},
+#                                                # o la solución completa (p. ej. la de /resolver/vogel)
+#     "cambios": {"costos": [[i, j, c]], "oferta": [[i, v]], "demanda": [[j, v]]},
+#     "metodo": "vogel", "modo": "auto", "optimizar": false
+#   }
+#
+# Cada respuesta trae un "id_solucion" nuevo con el que encadenar más cambios (o
+# "error_id_solucion" si la solución no cabe en el almacén); con "cambios" vacío
+# sólo se registra la solución enviada. Sólo costos densos.
+
+from flask import Blueprint, jsonify, current_app
+from app.logic.cambios import reresolver, verificar_asignaciones, basificar
+from app.logic.lote import FABRICAS
+from app.logic.vectorizado import MODOS
+from app.logic.modi import optimizar_solucion, costo_total
+from app.logic.numerico import a_fraccion, tolerancia_absoluta
+from app.logic.dispersa import num_celdas
+from app.models.input_schema import validar_problema, validar_cambios, validar_asignaciones, ErrorEntrada
+from app.utils.balanceador import balancear
+from app.utils.metricas import cronometro
+from app.controllers.comun import error_response, leer_datos, leer_opcion, guardar_solucion
+import traceback
+
+cambios_bp = Blueprint("cambios", __name__)
+
+
+def _almacen():
+    return current_app.extensions["soluciones"]
+
+
+def _solucion_enviada(solucion):
+    """Dict de solución guardable a partir de la que envía el cliente. Lanza ErrorEntrada."""
+    if not isinstance(solucion, dict):
+        raise ErrorEntrada("'solucion' debe ser un objeto con costos, oferta, demanda y asignaciones.", "solucion")
+    costos, oferta, demanda = validar_problema(solucion, dispersos=False)
+    numerico = solucion.get("numerico", "auto")
+    tolerancia = solucion.get("tolerancia")
+    asignaciones = validar_asignaciones(solucion.get("asignaciones"), numerico)
+    costos_b, oferta_b, demanda_b, _ = balancear(costos, oferta, demanda, tolerancia)
+    tol = tolerancia_absoluta(oferta_b + demanda_b, tolerancia)
+    mensaje = verificar_asignaciones(asignaciones, oferta_b, demanda_b, tol, costos_b)
+    if mensaje is not None:
+        raise ErrorEntrada(mensaje, "asignaciones")
+    # factible pero quizá no básica (celdas con flujo en ciclo): se deshacen los ciclos
+    # sin aumentar el costo, como en la reparación, para que MODI pueda partir de ella
+    celdas = [(i, j) for i, fila in enumerate(asignaciones) for j, x in enumerate(fila) if x]
+    basificar(costos_b, asignaciones, [], celdas, tol)
+    return {
+        "costos": costos, "oferta": oferta, "demanda": demanda, "asignaciones": asignaciones,
+        "metodo": solucion.get("metodo", "vogel"), "numerico": numerico, "tolerancia": tolerancia
+    }
+
+
+@cambios_bp.route("/resolver/cambios", methods=["POST"])
+def resolver_cambios():
+    try:
+        crono = cronometro()
+        try:
+            with crono.etapa("validacion"):
+                data = leer_datos()
+
+                # la solución de partida: por id (guardada) o completa en el cuerpo
+                if data.get("id_solucion") is not None:
+                    previa = _almacen().obtener(data["id_solucion"])
+                    if previa is None:
+                        raise ErrorEntrada("Solución no encontrada (o expirada).", "id_solucion", status=404)
+                elif data.get("solucion") is not None:
+                    previa = _solucion_enviada(data["solucion"])
+                else:
+                    raise ErrorEntrada("Se requiere 'id_solucion' o 'solucion'.")
+
+                # por defecto, el mismo método con que se obtuvo la solución
+                metodo = leer_opcion(data, "metodo", FABRICAS, previa["metodo"])
+                modo = leer_opcion(data, "modo", MODOS, "auto")
+                optimizar = bool(data.get("optimizar", False))
+                cambios = data.get("cambios", {})
+                validar_cambios(cambios, previa["oferta"], previa["demanda"])
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
+
+        numerico = previa["numerico"]
+        tolerancia = previa["tolerancia"]
+        with crono.etapa("resolver"):
+            costos, oferta, demanda, costos_b, asignaciones, meta, info = reresolver(
+                previa["costos"], previa["oferta"], previa["demanda"], previa["asignaciones"], cambios,
+                metodo, modo, tolerancia, a_fraccion if numerico == "fraccion" else None
+            )
+        crono.celdas = num_celdas(costos_b)
+
+        respuesta = {
+            "status": "ok",
+            "metodo": metodo,
+            "asignaciones": asignaciones,
+            "meta_balance": meta,
+            "reparacion": info
+        }
+        if info.get("error_solver"):
+            respuesta["error_solver"] = info.pop("error_solver")
+
+        if optimizar:
+            with crono.etapa("optimizacion"):
+                # MODI parte de la solución reparada, que ya es casi la anterior
+                respuesta["asignaciones"], respuesta["optimizacion"], respuesta["costo_total"] = optimizar_solucion(
+                    costos_b, asignaciones, respuesta.get("error_solver"))
+            del respuesta["optimizacion"]["pasos"]
+        else:
+            respuesta["costo_total"] = costo_total(costos_b, respuesta["asignaciones"])
+        guardar_solucion(respuesta, {
+            "costos": costos, "oferta": oferta, "demanda": demanda, "asignaciones": respuesta["asignaciones"],
+            "metodo": metodo, "numerico": numerico, "tolerancia": tolerancia
+        })
+        with crono.etapa("jsonify"):
+            return jsonify(respuesta)
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response("Error interno al re-resolver con cambios", 500, detalle=tb)
@@ -0,0 +1,109 @@
+# app/controllers/comparar_controller.py
+
+from flask import Blueprint, jsonify
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from app.logic.comparar import ORDEN_METODOS, resolver_metodo, marcar_mejor
+from app.logic.lote import FABRICAS
+from app.logic.vectorizado import MODOS
+from app.logic.dispersa import num_celdas
+from app.models.input_schema import validar_problema, ErrorEntrada
+from app.utils.procesos import num_procesos, obtener_pool, descartar_pool
+from app.utils.metricas import cronometro
+from app.controllers.comun import error_response, leer_datos, leer_opcion, balancear_problema
+import time
+import traceback
+
+comparar_bp = Blueprint("comparar", __name__)
+
+# plazo máximo aceptado (segundos)
+MAX_PLAZO_S = 300
+
+
+def _cancelado(nombre):
+    return {"metodo": nombre, "status": "cancelado", "tiempo_s": None}
+
+
+def _ejecutar(metodos, costos_b, oferta_b, demanda_b, modo, plazo, tolerancia=None):
+    """
+    Corre los métodos en el pool de procesos y devuelve sus resultados en el orden
+    de `metodos`. Con plazo, los que no terminaron a tiempo se informan como
+    "cancelado": los pendientes se quitan de la cola y los que ya corren se
+    abandonan solos al pasar el límite (ver resolver_metodo).
+    """
+    limite = time.time() + plazo if plazo is not None else None
+
+    if num_procesos() == 1:
+        # sin paralelismo posible: en orden (de más barato a más caro)
+        resultados = []
+        for nombre in metodos:
+            if limite is not None and time.time() > limite:
+                resultados.append(_cancelado(nombre))
+            else:
+                resultados.append(resolver_metodo(nombre, costos_b, oferta_b, demanda_b, modo, limite, tolerancia))
+        return resultados
+
+    try:
+        pool = obtener_pool()
+        futuros = [pool.submit(resolver_metodo, nombre, costos_b, oferta_b, demanda_b, modo, limite, tolerancia)
+                   for nombre in metodos]
+        wait(futuros, timeout=plazo)
+        resultados = []
+        for nombre, futuro in zip(metodos, futuros):
+            if futuro.done():
+                resultados.append(futuro.result())
+            else:
+                futuro.cancel()
+                resultados.append(_cancelado(nombre))
+        return resultados
+    except BrokenProcessPool:
+        # un proceso murió (p.ej. por memoria): se recrea el pool para la próxima petición
+        descartar_pool()
+        raise
+
+
+@comparar_bp.route("/resolver/comparar", methods=["POST"])
+def resolver_comparar():
+    try:
+        crono = cronometro()
+        try:
+            with crono.etapa("validacion"):
+                data = leer_datos()
+                modo = leer_opcion(data, "modo", MODOS, "auto")
+                # métodos a comparar (por defecto todos)
+                metodos = data.get("metodos", list(ORDEN_METODOS))
+                if not isinstance(metodos, list) or not metodos or any(m not in FABRICAS for m in metodos):
+                    raise ErrorEntrada(f"metodos debe ser una lista no vacía con valores de {list(FABRICAS)}.")
+                # plazo en segundos: se devuelve lo que haya terminado y se cancela el resto
+                plazo = data.get("plazo_s")
+                if plazo is not None:
+                    if isinstance(plazo, bool) or not isinstance(plazo, (int, float)) or not 0 < plazo <= MAX_PLAZO_S:
+                        raise ErrorEntrada(f"plazo_s debe ser un número entre 0 y {MAX_PLAZO_S}.")
+
+                # dimensiones, tipos y signos; costos_dispersos (rutas permitidas) en lugar de 'costos'
+                costos, oferta, demanda = validar_problema(data)
+                # tolerancia relativa para cantidades float (None = la de app/logic/numerico.py)
+                tolerancia = data.get("tolerancia")
+
+            # se balancea una sola vez para todos los métodos (422 si las rutas permitidas no bastan)
+            costos_b, oferta_b, demanda_b, meta = balancear_problema(costos, oferta, demanda, tolerancia, crono)
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
+
+        metodos = sorted(set(metodos), key=lambda m: ORDEN_METODOS.index(m) if m in ORDEN_METODOS else len(ORDEN_METODOS))
+        inicio = time.perf_counter()
+        with crono.etapa("resolver"):
+            resultados = _ejecutar(metodos, costos_b, oferta_b, demanda_b, modo, plazo, tolerancia)
+        crono.celdas = num_celdas(costos_b)
+
+        return jsonify({
+            "status": "ok",
+            "meta_balance": meta,
+            "mejor": marcar_mejor(resultados),
+            "plazo_agotado": any(r["status"] == "cancelado" for r in resultados),
+            "tiempo_total_s": time.perf_counter() - inicio,
+            "resultados": resultados
+        })
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response("Error interno al comparar métodos", 500, detalle=tb)
@@ -0,0 +1,316 @@
+# app/controllers/comun.py
+#
+# Partes comunes de los endpoints /resolver/<metodo> (Vogel, Noroeste, costo
+# mínimo, Russell): respuesta de error, lectura y validación de opciones, cache,
+# balanceo, medición del solver y cuerpo de la respuesta (JSON o stream). Cada
+# endpoint aporta sólo la fábrica de su solver y su nombre; Vogel compone las
+# etapas por separado para añadir las tablas HTML y pasos_en_servidor. La
+# respuesta de error, la lectura de opciones y el balanceo con comprobación de
+# factibilidad también los usan lote, comparar, cambios y trabajos.
+
+from flask import request, jsonify, current_app
+from app.logic.vectorizado import MODOS
+from app.logic.modi import optimizar_solucion, costo_total
+from app.logic.bitacora import FORMATOS_PASOS, NIVELES_DETALLE, registro_para, error_resultado
+from app.logic.dispersa import hay_prohibidas, verificar_factibilidad, num_celdas
+from app.logic.bloques import resolver_por_bloques
+from app.models.input_schema import leer_problema, validar_problema, ErrorEntrada
+from app.utils.balanceador import balancear
+from app.utils.procesos import num_procesos, mapa_pool
+from app.utils.streaming import formato_stream, respuesta_stream, FORMATOS_STREAM
+from app.utils.cache import clave_problema, respuesta_cacheada
+from app.utils.metricas import cronometro, CRONOMETRO_NULO
+from app.utils.serializacion import respuesta_json
+from app.utils.errores import registrar_error
+import uuid
+import traceback
+
+
+def error_response(message, status=400, detalle=None, **campos):
+    error_id = str(uuid.uuid4())[:8]
+    payload = {"error": message, "code": error_id, **campos}
+    if detalle is not None:
+        payload["detalle"] = str(detalle)
+        # registrar detalle extenso en log junto al código
+        registrar_error(error_id, detalle)
+    return jsonify(payload), status
+
+
+class Peticion:
+    """Problema y opciones ya validados de una petición /resolver/<metodo>."""
+
+    def __init__(self, data, costos, oferta, demanda, modo, optimizar, formato_pasos, detalle, stream, tolerancia,
+                 descomponer=False):
+        self.data = data
+        self.costos = costos
+        self.oferta = oferta
+        self.demanda = demanda
+        self.modo = modo
+        self.optimizar = optimizar
+        self.formato_pasos = formato_pasos
+        self.detalle = detalle
+        self.stream = stream
+        self.tolerancia = tolerancia
+        self.descomponer = descomponer
+
+    @property
+    def dispersa(self):
+        return self.data.get("costos_dispersos") is not None
+
+
+def leer_datos():
+    """Cuerpo de la petición actual (JSON, binario crudo, .npy/CSV o multipart); ErrorEntrada si no hay datos."""
+    # ver app/models/input_schema.py
+    data = leer_problema(request)
+    if not data:
+        raise ErrorEntrada("No se recibió ningún dato.")
+    return data
+
+
+def leer_opcion(data, nombre, validos, defecto):
+    """Valor de la opción `nombre` (o `defecto`); ErrorEntrada si no es uno de `validos`."""
+    valor = data.get(nombre, defecto)
+    if not isinstance(valor, str) or valor not in validos:
+        raise ErrorEntrada(f"{nombre} debe ser uno de {list(validos)}.")
+    return valor
+
+
+def leer_opciones(data, detalle_defecto="pasos"):
+    """(modo, optimizar, formato_pasos, detalle) validados: opciones comunes a los endpoints que resuelven."""
+    # modo de resolución: "python", "numpy" o "auto" (NumPy a partir de cierto tamaño);
+    # los métodos sin variante NumPy lo validan por compatibilidad
+    modo = leer_opcion(data, "modo", MODOS, "auto")
+    # fase de optimización MODI opcional sobre la solución inicial
+    optimizar = bool(data.get("optimizar", False))
+    # formato de pasos: "expandido" (estado completo por paso) o "compacto" (sólo diferencias)
+    formato_pasos = leer_opcion(data, "formato_pasos", FORMATOS_PASOS, "expandido")
+    # nivel de detalle de la respuesta: ninguno / resumen / pasos / html
+    detalle = leer_opcion(data, "detalle", NIVELES_DETALLE, detalle_defecto)
+    return modo, optimizar, formato_pasos, detalle
+
+
+def leer_peticion(detalle_defecto="pasos"):
+    """Lee y valida el problema y las opciones de la petición actual; lanza ErrorEntrada si algo no es válido."""
+    data = leer_datos()
+    modo, optimizar, formato_pasos, detalle = leer_opciones(data, detalle_defecto)
+    # streaming de pasos: "ndjson" o "sse" (en el cuerpo o por cabecera Accept)
+    stream = formato_stream(data, request.accept_mimetypes)
+    if stream == "":
+        raise ErrorEntrada(f"stream debe ser uno de {list(FORMATOS_STREAM)}.")
+
+    # dimensiones, tipos y signos; costos_dispersos (rutas permitidas) en lugar de 'costos'
+    costos, oferta, demanda = validar_problema(data)
+    # tolerancia relativa para cantidades float (None = la de app/logic/numerico.py)
+    tolerancia = data.get("tolerancia")
+    if data.get("costos_dispersos") is not None and optimizar:
+        raise ErrorEntrada("optimizar no está disponible con costos_dispersos.")
+    # cada componente conexo de rutas permitidas por separado (ver app/logic/bloques.py)
+    descomponer = bool(data.get("descomponer", False))
+    if descomponer and stream:
+        raise ErrorEntrada("descomponer no está disponible con stream.")
+    return Peticion(data, costos, oferta, demanda, modo, optimizar, formato_pasos, detalle, stream, tolerancia,
+                    descomponer)
+
+
+def buscar_en_cache(nombre, peticion, crono):
+    """(cache, clave, respuesta cacheada o None); clave es None si no hay cache."""
+    cache = current_app.extensions.get("cache_resultados")
+    if cache is None:
+        return None, None, None
+    data = peticion.data
+    costos = data["costos_dispersos"] if peticion.dispersa else peticion.costos
+    clave = clave_problema(nombre, costos, peticion.oferta, peticion.demanda,
+                           detalle=peticion.detalle, formato_pasos=peticion.formato_pasos, optimizar=peticion.optimizar,
+                           disperso=peticion.dispersa, descomponer=peticion.descomponer,
+                           numerico=data.get("numerico", "auto"), tolerancia=peticion.tolerancia)
+    with crono.etapa("cache"):
+        en_cache = cache.obtener(clave)
+    if en_cache is not None:
+        return cache, clave, respuesta_cacheada(en_cache)
+    return cache, clave, None
+
+
+def balancear_problema(costos, oferta, demanda, tolerancia, crono=CRONOMETRO_NULO):
+    """(costos_b, oferta_b, demanda_b, meta); ErrorEntrada con status 422 si las rutas permitidas no bastan."""
+    with crono.etapa("balancear"):
+        costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda, tolerancia)
+    # con rutas prohibidas (dispersas o None en la matriz densa) el problema balanceado
+    # puede no tener solución
+    if hay_prohibidas(costos):
+        infactible = verificar_factibilidad(costos_b, oferta_b, demanda_b)
+        if infactible:
+            raise ErrorEntrada(infactible, status=422)
+    return costos_b, oferta_b, demanda_b, meta
+
+
+def balancear_peticion(peticion, crono):
+    """balancear_problema con el problema de la petición."""
+    return balancear_problema(peticion.costos, peticion.oferta, peticion.demanda, peticion.tolerancia, crono)
+
+
+def resolver_medido(metodo, costos_b, crono):
+    """Resuelve con `metodo` y anota en el cronómetro pasos, celdas y tiempo de penalizaciones."""
+    with crono.etapa("resolver"):
+        resultado = metodo.resolver()
+    # penalizaciones: parte de "resolver" dedicada a mantener y elegir penalizaciones
+    tiempo_penal = getattr(metodo, "tiempo_penalizaciones", None)
+    if tiempo_penal is not None:
+        crono.agregar("penalizaciones", tiempo_penal)
+    crono.pasos = resultado["num_pasos"]
+    crono.celdas = num_celdas(costos_b)
+    return resultado
+
+
+def resolver_por_componentes(nombre, peticion, registro, crono):
+    """
+    resolver_medido con "descomponer": cada componente conexo de rutas permitidas
+    se resuelve por separado con el método `nombre` (una clave de FABRICAS), en el
+    pool de procesos si el problema es grande. El resultado añade "componentes".
+    """
+    mapa = mapa_pool if num_procesos() > 1 else map
+    with crono.etapa("resolver"):
+        *_, resultado = resolver_por_bloques(peticion.costos, peticion.oferta, peticion.demanda, nombre,
+                                             peticion.modo, registro, peticion.tolerancia, mapa)
+    crono.pasos = resultado["num_pasos"]
+    crono.celdas = num_celdas(peticion.costos)
+    return resultado
+
+
+def responder(respuesta, crono, cache=None, clave=None):
+    """Serializa la respuesta y, si hay clave, la guarda en la cache de resultados."""
+    with crono.etapa("jsonify"):
+        resp = respuesta_json(respuesta)
+    if clave is not None:
+        with crono.etapa("cache"):
+            cache.guardar(clave, resp.get_data())
+        resp.headers["X-Cache"] = "MISS"
+    return resp
+
+
+def completar_respuesta(respuesta, costos_b, resultado, detalle, optimizar, crono=CRONOMETRO_NULO):
+    """Añade error del solver, fase MODI y costo total (común a la respuesta JSON y al trailer del stream)."""
+    if detalle not in ("pasos", "html") and resultado.get("error"):
+        respuesta["error_solver"] = resultado["error"]
+
+    if optimizar:
+        # si el solver se detuvo antes de asignarlo todo, MODI no se aplica (optimo false y motivo)
+        with crono.etapa("optimizacion"):
+            respuesta["asignaciones"], respuesta["optimizacion"], respuesta["costo_total"] = optimizar_solucion(
+                costos_b, resultado["asignaciones"], error_resultado(resultado))
+        if detalle not in ("pasos", "html"):
+            del respuesta["optimizacion"]["pasos"]
+    else:
+        respuesta["costo_total"] = costo_total(costos_b, respuesta["asignaciones"])
+    return respuesta
+
+
+def guardar_solucion(respuesta, solucion):
+    """
+    Guarda la solución en el almacén (app/utils/soluciones.py) y añade su
+    "id_solucion" a la respuesta; si no cabe, "error_id_solucion" en su lugar.
+    """
+    id_solucion = current_app.extensions["soluciones"].guardar(solucion)
+    if id_solucion is None:
+        respuesta["error_id_solucion"] = ("La solución supera el tamaño máximo del almacén de soluciones "
+                                          "(SOLUCIONES_MAX_MB): no se guardó.")
+    else:
+        respuesta["id_solucion"] = id_solucion
+
+
+def eventos_de_pasos(pasos, detalle):
+    """Un evento "paso" por paso del solver si el detalle los incluye; si no, sólo los consume."""
+    if detalle in ("pasos", "html"):
+        for paso in pasos:
+            yield {"tipo": "paso", "paso": paso}
+    else:
+        for _ in pasos:
+            pass
+
+
+def eventos_solver(metodo, costos_b, meta, detalle, formato_pasos, optimizar, convertir=eventos_de_pasos):
+    """
+    Eventos del modo streaming: "inicio", un "paso" por paso y un "fin" con el
+    resultado. convertir(pasos, detalle) convierte los pasos del solver en eventos.
+    """
+    yield {"tipo": "inicio", "meta_balance": meta, "detalle": detalle, "formato_pasos": formato_pasos}
+
+    yield from convertir(metodo.iterar(guardar=False), detalle)
+
+    resultado = metodo.resultado()
+    fin = {
+        "tipo": "fin",
+        "asignaciones": resultado["asignaciones"],
+        "meta_balance": meta
+    }
+    if detalle != "ninguno":
+        fin["num_pasos"] = resultado["num_pasos"]
+    if detalle in ("pasos", "html") and formato_pasos == "compacto":
+        # cabecera de la bitácora (campos, estado inicial, error); los pasos ya se enviaron
+        bitacora = resultado["bitacora"].a_dict()
+        bitacora.pop("pasos")
+        fin["bitacora"] = bitacora
+    yield completar_respuesta(fin, costos_b, resultado, detalle, optimizar)
+
+
+def cuerpo_respuesta(resultado, meta, detalle, formato_pasos):
+    """Asignaciones, meta_balance, número de pasos y pasos (o bitácora compacta) según el detalle."""
+    respuesta = {
+        "status": "ok",
+        "asignaciones": resultado["asignaciones"],
+        "meta_balance": meta
+    }
+    if detalle != "ninguno":
+        respuesta["num_pasos"] = resultado["num_pasos"]
+    if detalle in ("pasos", "html"):
+        if formato_pasos == "compacto":
+            # sólo diferencias por paso; el cliente reconstruye el estado (sin tablas HTML)
+            respuesta["bitacora"] = resultado["bitacora"].a_dict()
+        else:
+            respuesta["pasos"] = resultado["pasos"]
+    if "componentes" in resultado:
+        respuesta["componentes"] = resultado["componentes"]
+    return respuesta
+
+
+def respuesta_solver(resultado, costos_b, meta, detalle, formato_pasos, optimizar, crono=CRONOMETRO_NULO):
+    """Cuerpo de la respuesta de /resolver/<metodo> para métodos sin tablas HTML ("html" equivale a "pasos")."""
+    respuesta = cuerpo_respuesta(resultado, meta, detalle, formato_pasos)
+    return completar_respuesta(respuesta, costos_b, resultado, detalle, optimizar, crono)
+
+
+def resolver_endpoint(nombre, titulo, crear_solver, detalle_defecto="pasos"):
+    """
+    Atiende una petición /resolver/<nombre>: validar → cache → balancear → resolver
+    (por componentes con "descomponer") → JSON (o stream). crear_solver tiene la
+    firma de crear_vogel: (costos, oferta, demanda, modo, registro, tolerancia).
+    """
+    try:
+        crono = cronometro()
+        try:
+            with crono.etapa("validacion"):
+                peticion = leer_peticion(detalle_defecto)
+            # resultados ya calculados para el mismo problema y opciones (no aplica al streaming)
+            cache = clave = None
+            if not peticion.stream:
+                cache, clave, cacheada = buscar_en_cache(nombre, peticion, crono)
+                if cacheada is not None:
+                    return cacheada
+            costos_b, oferta_b, demanda_b, meta = balancear_peticion(peticion, crono)
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
+
+        detalle, formato_pasos, optimizar = peticion.detalle, peticion.formato_pasos, peticion.optimizar
+        registro = registro_para(detalle, formato_pasos)
+        if peticion.descomponer:
+            resultado = resolver_por_componentes(nombre, peticion, registro, crono)
+        else:
+            metodo = crear_solver(costos_b, oferta_b, demanda_b, peticion.modo, registro, peticion.tolerancia)
+            if peticion.stream:
+                eventos = eventos_solver(metodo, costos_b, meta, detalle, formato_pasos, optimizar)
+                return respuesta_stream(eventos, peticion.stream, f"Error interno al resolver {titulo}")
+            resultado = resolver_medido(metodo, costos_b, crono)
+        respuesta = respuesta_solver(resultado, costos_b, meta, detalle, formato_pasos, optimizar, crono)
+        return responder(respuesta, crono, cache, clave)
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response(f"Error interno al resolver {titulo}", 500, detalle=tb)
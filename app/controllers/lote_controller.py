@@ -0,0 +1,61 @@
+# app/controllers/lote_controller.py
+
+from flask import Blueprint, request, jsonify
+from concurrent.futures.process import BrokenProcessPool
+from app.logic.lote import resolver_problema
+from app.utils.procesos import num_procesos, obtener_pool, descartar_pool, mapa_pool
+from app.controllers.comun import error_response
+import traceback
+
+lote_bp = Blueprint("lote", __name__)
+
+# por debajo de este número de problemas no compensa enviar trabajo a otros procesos
+MIN_PROBLEMAS_POOL = 8
+# máximo de problemas por petición
+MAX_PROBLEMAS = 10000
+
+
+def _resolver_lote(problemas):
+    if len(problemas) < MIN_PROBLEMAS_POOL or num_procesos() == 1:
+        # pocos problemas: los que piden "descomponer" reparten sus bloques en el pool
+        mapa = mapa_pool if num_procesos() > 1 else map
+        return [resolver_problema(p, mapa) for p in problemas]
+    # bloques de varios problemas por envío: ~4 bloques por proceso para repartir la carga
+    chunksize = max(1, len(problemas) // (num_procesos() * 4))
+    try:
+        return list(obtener_pool().map(resolver_problema, problemas, chunksize=chunksize))
+    except BrokenProcessPool:
+        # un proceso murió (p.ej. por memoria): se recrea el pool para la próxima petición
+        descartar_pool()
+        raise
+
+
+@lote_bp.route("/resolver/batch", methods=["POST"])
+def resolver_batch():
+    try:
+        # lista de problemas u objeto {"problemas": [...]}; un JSON mal formado es un 400, no un 500
+        data = request.get_json(silent=True)
+        if data is None and request.get_data():
+            return error_response("El cuerpo no es un JSON válido.", 400)
+        if not data:
+            return error_response("No se recibió ningún dato.", 400)
+
+        problemas = data.get("problemas") if isinstance(data, dict) else data
+        if not isinstance(problemas, list) or not problemas:
+            return error_response("problemas debe ser una lista no vacía.", 400)
+        if len(problemas) > MAX_PROBLEMAS:
+            return error_response(f"Se admiten como máximo {MAX_PROBLEMAS} problemas por lote.", 400)
+
+        resultados = _resolver_lote(problemas)
+        for indice, item in enumerate(resultados):
+            item["indice"] = indice
+
+        return jsonify({
+            "status": "ok",
+            "num_problemas": len(resultados),
+            "num_errores": sum(1 for r in resultados if r["status"] == "error"),
+            "resultados": resultados
+        })
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response("Error interno al resolver el lote", 500, detalle=tb)
@@ -0,0 +1,24 @@
+# app/controllers/metodos_controller.py
+#
+# Endpoints de los métodos construidos sobre NucleoTransporte (costo mínimo y
+# Russell). Aceptan el mismo JSON que /resolver/noroeste.
+
+from flask import Blueprint
+from app.logic.lote import FABRICAS
+from app.controllers.comun import resolver_endpoint
+
+metodos_bp = Blueprint("metodos", __name__)
+
+NOMBRES = {
+    "costo_minimo": "Costo Mínimo",
+    "russell": "Russell",
+}
+
+
+@metodos_bp.route("/resolver/costo_minimo", methods=["POST"], endpoint="resolver_costo_minimo",
+                  defaults={"nombre": "costo_minimo"})
+@metodos_bp.route("/resolver/russell", methods=["POST"], endpoint="resolver_russell",
+                  defaults={"nombre": "russell"})
+def resolver_metodo(nombre):
+    # sólo tienen versión Python: la fábrica ignora modo; sin tablas HTML ("html" equivale a "pasos")
+    return resolver_endpoint(nombre, NOMBRES[nombre], FABRICAS[nombre])
@@ -0,0 +1,13 @@
+# app/controllers/metricas_controller.py
+
+from flask import Blueprint, Response, current_app, jsonify
+
+metricas_bp = Blueprint("metricas", __name__)
+
+
+@metricas_bp.route("/metrics", methods=["GET"])
+def metricas():
+    registro = current_app.extensions.get("metricas")
+    if registro is None:
+        return jsonify({"error": "Las métricas están desactivadas."}), 404
+    return Response(registro.exportar(), mimetype="text/plain; version=0.0.4")
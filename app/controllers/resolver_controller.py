@@ -1,26 +1,40 @@
 # app/controllers/resolver_controller.py
+#
+# /resolver/vogel con "pasos_en_servidor": true guarda la bitácora compacta en el
+# servidor (app/utils/soluciones.py) y responde sólo asignaciones, costo total,
+# número de pasos e "id_solucion". Los pasos se piden luego por ventanas con
+# GET /resolver/<id_solucion>/pasos?desde=&hasta=&formato=json|html: sólo se
+# reconstruyen y se convierten a HTML los pasos pedidos, y las últimas páginas
+# quedan en una cache pequeña. El mismo id sirve para /resolver/cambios. Si la
+# bitácora no cabe en el almacén la respuesta trae "error_id_solucion" y no el id.
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, current_app, Response
+from app.logic.vectorizado import crear_vogel
 from app.logic.vogel import MetodoVogel
+from app.logic.bitacora import registro_para
+from app.models.input_schema import ErrorEntrada
 from app.utils.balanceador import balancear
-import uuid
-import logging
+from app.utils.streaming import respuesta_stream
+from app.utils.cache import CacheResultados
+from app.utils.metricas import cronometro, CRONOMETRO_NULO
+from app.utils.serializacion import codificar_json
+from app.controllers.comun import (
+    error_response, leer_opcion, leer_peticion, buscar_en_cache, balancear_peticion, resolver_medido,
+    resolver_por_componentes, guardar_solucion, responder, eventos_solver, eventos_de_pasos, cuerpo_respuesta, completar_respuesta
+)
+from itertools import islice
 import traceback
 import html
 
-# configurar logger (escribirá en errors.log en el working dir)
-logging.basicConfig(filename='errors.log', level=logging.ERROR, format='%(asctime)s %(levelname)s %(message)s')
-
 resolver_bp = Blueprint("resolver", __name__)
 
-def _error_response(message, status=400, detalle=None):
-    error_id = str(uuid.uuid4())[:8]
-    payload = {"error": message, "code": error_id}
-    if detalle is not None:
-        payload["detalle"] = str(detalle)
-        # registrar detalle extenso en log junto al código
-        logging.error(f"Error {error_id}: {detalle}")
-    return jsonify(payload), status
+# pasos por página de /resolver/<id>/pasos: por defecto y como máximo
+PASOS_POR_PAGINA = 20
+MAX_PASOS_POR_PAGINA = 200
+FORMATOS_PAGINA = ("json", "html")
+
+# páginas ya generadas (JSON o HTML) por (id, desde, hasta, formato)
+_paginas = CacheResultados(max_entradas=64, max_bytes=32 * 1024 * 1024)
 
 def _calc_penalizaciones_local(costos, oferta, demanda):
     # devuelve listas de penalizaciones en formato [(penal, idx), ...] para filas y columnas
@@ -30,7 +44,7 @@ def _calc_penalizaciones_local(costos, oferta, demanda):
     n = len(demanda)
     for i in range(m):
         if oferta[i] > 0:
-            vals = [costos[i][j] for j in range(n) if demanda[j] > 0]
+            vals = [costos[i][j] for j in range(n) if demanda[j] > 0 and costos[i][j] is not None]
             if len(vals) >= 2:
                 vals_sorted = sorted(vals)
                 filas.append((vals_sorted[1] - vals_sorted[0], i))
@@ -42,7 +56,7 @@ def _calc_penalizaciones_local(costos, oferta, demanda):
             filas.append((-1, i))
     for j in range(n):
         if demanda[j] > 0:
-            vals = [costos[i][j] for i in range(m) if oferta[i] > 0]
+            vals = [costos[i][j] for i in range(m) if oferta[i] > 0 and costos[i][j] is not None]
             if len(vals) >= 2:
                 vals_sorted = sorted(vals)
                 columnas.append((vals_sorted[1] - vals_sorted[0], j))
@@ -54,87 +68,153 @@ def _calc_penalizaciones_local(costos, oferta, demanda):
             columnas.append((-1, j))
     return filas, columnas
 
-def _build_step_table_html(costos, oferta, demanda, paso, meta, paso_idx):
+# el aspecto de las tablas va en styles.css (.tabla-paso, .step-block): cada celda
+# es sólo <td> o <th>, con una clase corta para la celda elegida (el) y la columna
+# ficticia (fi); con estilos inline cada celda ocupaba ~70 bytes más
+_TH = '<th>'
+_TD = '<td>'
+_TD_ELEGIDA = '<td class="el">'
+_TD_FICTICIA = '<td class="fi">'
+
+
+def _texto(v):
+    # los enteros no necesitan escape (caso habitual en oferta/demanda/penalizaciones)
+    return str(v) if type(v) is int else html.escape(str(v))
+
+
+class _PlantillaTabla:
     """
-    Construye HTML con dos tablas (Estado ANTES / Estado DESPUÉS) en el formato:
-    |     | C1 | C2 | ... | Oferta | Penal Fila |
-    ...
-    Además incluye la explicación textual entre ambas tablas.
-    Resalta la celda elegida (antes) con fondo negro y texto claro.
+    Partes de la tabla que no cambian entre pasos (encabezado, etiquetas y celdas de costo),
+    renderizadas una sola vez por problema. Cada paso sólo añade oferta/demanda,
+    penalizaciones y la celda resaltada.
     """
-    def render_table(costos_mat, oferta_state, demanda_state, pen_filas, pen_cols, meta, chosen=None):
-        m = len(costos_mat)
-        n = len(costos_mat[0]) if costos_mat else 0
-        parts = []
-        parts.append('<table class="tabla-visual" style="border-collapse:collapse;width:100%;margin-bottom:8px;">')
-        # header
-        parts.append('<thead><tr>')
-        parts.append('<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;"></th>')
+
+    def __init__(self, costos, meta):
+        m = len(costos)
+        n = len(costos[0]) if costos else 0
+        self.m = m
+        self.n = n
+        col_ficticia = bool(meta and meta.get("tipo") == "columna_ficticia")
+        fila_ficticia = bool(meta and meta.get("tipo") == "fila_ficticia")
+
+        parts = ['<table class="tabla-visual tabla-paso">', '<thead><tr>', _TH, '</th>']
         for j in range(n):
             header = f"C{j+1}"
-            if meta and meta.get("tipo") == "columna_ficticia" and j == n-1:
+            if col_ficticia and j == n-1:
                 header = f"{header} (Ficticia)"
-            parts.append(f'<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;">{html.escape(header)}</th>')
-        parts.append('<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;">Oferta</th>')
-        parts.append('<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;">Penal Fila</th>')
-        parts.append('</tr></thead>')
+            parts.append(f'{_TH}{html.escape(header)}</th>')
+        parts.append(f'{_TH}Oferta</th>')
+        parts.append(f'{_TH}Penal Fila</th>')
+        parts.append('</tr></thead><tbody>')
+        self.encabezado = ''.join(parts)
 
-        # body rows
-        parts.append('<tbody>')
+        self.etiquetas = []
+        self.textos = []      # costo escapado por celda (para re-renderizar la celda elegida)
+        self.celdas = []      # lista de <td> por fila
+        self.filas_html = []  # '<tr><th>..</th><td>..' por fila, sin oferta/penal
         for i in range(m):
             row_label = f"F{i+1}"
-            if meta and meta.get("tipo") == "fila_ficticia" and i == m-1:
+            if fila_ficticia and i == m-1:
                 row_label = f"{row_label} (Ficticia)"
-            parts.append('<tr>')
-            parts.append(f'<th style="background:#f7f7f7;border:1px solid #000;padding:6px;text-align:center;">{html.escape(row_label)}</th>')
+            etiqueta = f'<tr>{_TH}{html.escape(row_label)}</th>'
+            textos = []
+            celdas = []
             for j in range(n):
-                cell = costos_mat[i][j]
-                display = "" if cell is None else str(cell)
-                # highlight chosen cell
-                if chosen and isinstance(chosen, (list, tuple)) and chosen[0] == i and chosen[1] == j:
-                    parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;background:#000;color:#fff;font-weight:700;">{html.escape(display)}</td>')
-                else:
-                    # mark ficticia with subtle red (keeps consistency)
-                    if meta and meta.get("tipo") == "columna_ficticia" and j == n-1:
-                        parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;background:#fff2f2;color:{html.escape(meta.get("color",""))};">{html.escape(display)}</td>')
-                    else:
-                        parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;">{html.escape(display)}</td>')
-            oferta_val = oferta_state[i] if i < len(oferta_state) else ""
-            penal_val = next((p for p, idx in pen_filas if idx == i), "")
-            parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;"><strong>{html.escape(str(oferta_val))}</strong></td>')
-            parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;">{html.escape(str(penal_val))}</td>')
-            parts.append('</tr>')
-        parts.append('</tbody>')
-
-        # demanda row
-        parts.append('<tfoot>')
-        parts.append('<tr>')
-        parts.append('<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;">Dem</th>')
-        for j in range(n):
-            dem_val = demanda_state[j] if j < len(demanda_state) else ""
-            parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;"><strong>{html.escape(str(dem_val))}</strong></td>')
-        parts.append('<td style="border:1px solid #000;padding:6px;text-align:center;"></td>')
-        parts.append('<td style="border:1px solid #000;padding:6px;text-align:center;">Penal Col</td>')
-        parts.append('</tr>')
-
-        # penal col row
-        parts.append('<tr>')
-        parts.append('<th style="background:#f0f0f0;border:1px solid #000;padding:6px;text-align:center;">Penal Col</th>')
-        for j in range(n):
-            penal_c = next((p for p, idx in pen_cols if idx == j), "")
-            parts.append(f'<td style="border:1px solid #000;padding:6px;text-align:center;">{html.escape(str(penal_c))}</td>')
-        parts.append('<td style="border:1px solid #000;padding:6px;text-align:center;"></td>')
-        parts.append('<td style="border:1px solid #000;padding:6px;text-align:center;"></td>')
-        parts.append('</tr>')
-        parts.append('</tfoot>')
-
-        parts.append('</table>')
+                cell = costos[i][j]
+                display = html.escape("" if cell is None else str(cell))
+                textos.append(display)
+                td = _TD_FICTICIA if col_ficticia and j == n-1 else _TD
+                celdas.append(f'{td}{display}</td>')
+            self.etiquetas.append(etiqueta)
+            self.textos.append(textos)
+            self.celdas.append(celdas)
+            self.filas_html.append(etiqueta + ''.join(celdas))
+
+        self.pie_inicio = f'</tbody><tfoot><tr>{_TH}Dem</th>'
+        self.pie_medio = f'{_TD}</td>{_TD}Penal Col</td></tr><tr>{_TH}Penal Col</th>'
+        self.pie_fin = f'{_TD}</td>{_TD}</td></tr></tfoot></table>'
+
+    def render(self, oferta_state, demanda_state, pen_filas, pen_cols, chosen=None):
+        # pen_filas / pen_cols: vectores indexados por fila/columna
+        elegida_i = elegida_j = None
+        if chosen and isinstance(chosen, (list, tuple)):
+            elegida_i, elegida_j = chosen[0], chosen[1]
+
+        parts = [self.encabezado]
+        len_of = len(oferta_state)
+        len_pf = len(pen_filas)
+        for i in range(self.m):
+            if i == elegida_i and isinstance(elegida_j, int) and 0 <= elegida_j < self.n:
+                celdas = self.celdas[i][:]
+                celdas[elegida_j] = f'{_TD_ELEGIDA}{self.textos[i][elegida_j]}</td>'
+                parts.append(self.etiquetas[i])
+                parts.append(''.join(celdas))
+            else:
+                parts.append(self.filas_html[i])
+            oferta_val = oferta_state[i] if i < len_of else ""
+            penal_val = pen_filas[i] if i < len_pf else ""
+            parts.append(f'{_TD}<strong>{_texto(oferta_val)}</strong></td>{_TD}{_texto(penal_val)}</td></tr>')
+
+        parts.append(self.pie_inicio)
+        len_de = len(demanda_state)
+        for j in range(self.n):
+            dem_val = demanda_state[j] if j < len_de else ""
+            parts.append(f'{_TD}<strong>{_texto(dem_val)}</strong></td>')
+        parts.append(self.pie_medio)
+        len_pc = len(pen_cols)
+        for j in range(self.n):
+            penal_c = pen_cols[j] if j < len_pc else ""
+            parts.append(f'{_TD}{_texto(penal_c)}</td>')
+        parts.append(self.pie_fin)
         return ''.join(parts)
 
+
+def _vector_penalizaciones(pares, largo):
+    # [(penal, idx), ...] -> vector indexado por idx ("" donde no hay valor)
+    vec = [""] * largo
+    for p, idx in pares:
+        if 0 <= idx < largo and vec[idx] == "":
+            vec[idx] = p
+    return vec
+
+
+def _penalizaciones_de_paso(paso):
+    """Vectores (filas, columnas) de penalizaciones que el solver guardó en el paso, o None."""
+    if not paso:
+        return None
+    pf = paso.get("penalizaciones_filas")
+    pc = paso.get("penalizaciones_columnas")
+    if pf is None or pc is None:
+        return None
+    return [e["penal"] for e in pf], [e["penal"] for e in pc]
+
+
+def _build_step_table_html(costos, oferta, demanda, paso, meta, paso_idx, plantilla=None, pen_despues=None):
+    """
+    Construye HTML con dos tablas (Estado ANTES / Estado DESPUÉS) en el formato:
+    |     | C1 | C2 | ... | Oferta | Penal Fila |
+    ...
+    Además incluye la explicación textual entre ambas tablas.
+    Resalta la celda elegida (antes) con fondo negro y texto claro.
+
+    Las penalizaciones ANTES se toman del propio paso (las calculó el solver); las
+    DESPUÉS pueden pasarse en pen_despues (son las ANTES del paso siguiente). Sólo
+    si faltan se recalculan localmente. `plantilla` permite reutilizar las partes
+    fijas de la tabla entre pasos.
+    """
+    if plantilla is None:
+        plantilla = _PlantillaTabla(costos, meta)
+    m = plantilla.m
+    n = plantilla.n
+
     # estado ANTES
     oferta_before = paso.get("oferta_restante") if paso and paso.get("oferta_restante") is not None else oferta
     demanda_before = paso.get("demanda_restante") if paso and paso.get("demanda_restante") is not None else demanda
-    pen_filas_before, pen_cols_before = _calc_penalizaciones_local(costos, oferta_before, demanda_before)
+    pen_before = _penalizaciones_de_paso(paso)
+    if pen_before is None:
+        pf, pc = _calc_penalizaciones_local(costos, oferta_before, demanda_before)
+        pen_before = (_vector_penalizaciones(pf, m), _vector_penalizaciones(pc, n))
+    pen_filas_before, pen_cols_before = pen_before
 
     # elegir celda elegida (resaltar en BEFORE)
     chosen = None
@@ -142,12 +222,12 @@ def _build_step_table_html(costos, oferta, demanda, paso, meta, paso_idx):
         chosen = paso.get("celda_elegida") or paso.get("celda") or None
 
     html_parts = []
-    html_parts.append(f'<div class="step-block" id="step-{paso_idx}" style="margin-bottom:18px;">')
-    html_parts.append(f'<h3 style="margin:6px 0;color:var(--brand-blue);">Paso {paso_idx}</h3>')
+    html_parts.append(f'<div class="step-block" id="step-{paso_idx}">')
+    html_parts.append(f'<h3>Paso {paso_idx}</h3>')
 
     # tabla antes (resaltando celda elegida)
-    html_parts.append('<div style="margin-bottom:8px;"><strong>Estado ANTES</strong></div>')
-    html_parts.append(render_table(costos, oferta_before, demanda_before, pen_filas_before, pen_cols_before, meta, chosen))
+    html_parts.append('<div class="estado"><strong>Estado ANTES</strong></div>')
+    html_parts.append(plantilla.render(oferta_before, demanda_before, pen_filas_before, pen_cols_before, chosen))
 
     # explicación textual
     if paso:
@@ -159,69 +239,223 @@ def _build_step_table_html(costos, oferta, demanda, paso, meta, paso_idx):
         if paso.get("tie_info"):
             tie = paso["tie_info"]
             reason = f" Desempate: {html.escape(str(tie.get('reason', tie)))}."
-        pen_vals = [p for p, _ in pen_filas_before] + [p for p, _ in pen_cols_before]
+        pen_vals = [p for p in pen_filas_before if p != ""] + [p for p in pen_cols_before if p != ""]
         max_pen = max(pen_vals) if pen_vals else ""
         explanation = f"Paso {paso_idx}: Penalización mayor = {html.escape(str(max_pen))} (tipo={html.escape(str(tipo))} pos={html.escape(str(pos))}). Se asignan {html.escape(str(asign))} unidades a {html.escape(str(cel))}.{reason}"
-        html_parts.append(f"<div class='explanation' style='margin:8px 0;padding:10px;background:#fff8e1;border-radius:6px;border:1px solid #e6d8a7;'>{explanation}</div>")
+        html_parts.append(f'<div class="explanation">{explanation}</div>')
 
     # tabla despues (si hay estado posterior), en caso contrario mostrar estado resultante actual
     oferta_after = paso.get("oferta_posterior") if paso and paso.get("oferta_posterior") is not None else None
     demanda_after = paso.get("demanda_posterior") if paso and paso.get("demanda_posterior") is not None else None
     if oferta_after is not None and demanda_after is not None:
-        pen_filas_after, pen_cols_after = _calc_penalizaciones_local(costos, oferta_after, demanda_after)
-        html_parts.append('<div style="margin-top:8px;margin-bottom:6px;"><strong>Estado DESPUÉS</strong></div>')
-        html_parts.append(render_table(costos, oferta_after, demanda_after, pen_filas_after, pen_cols_after, meta, None))
+        if pen_despues is None:
+            pf, pc = _calc_penalizaciones_local(costos, oferta_after, demanda_after)
+            pen_despues = (_vector_penalizaciones(pf, m), _vector_penalizaciones(pc, n))
+        pen_filas_after, pen_cols_after = pen_despues
+        html_parts.append('<div class="estado estado-despues"><strong>Estado DESPUÉS</strong></div>')
+        html_parts.append(plantilla.render(oferta_after, demanda_after, pen_filas_after, pen_cols_after, None))
     else:
         # Si no hay estado posterior, mostrar nota y el estado "actual" (oferta/demanda sin cambios)
-        html_parts.append('<div style="margin-top:8px;margin-bottom:6px;color:#666;">(No hay estado posterior registrado.)</div>')
+        html_parts.append('<div class="estado estado-despues sin-posterior">(No hay estado posterior registrado.)</div>')
 
     html_parts.append('</div>')
     return ''.join(html_parts)
 
+
+def _build_pasos_html(costos, oferta, demanda, pasos, meta, progreso=None):
+    """
+    HTML de todos los pasos reutilizando una plantilla y las penalizaciones del solver.
+    `progreso(k)` se llama tras cada paso (trabajos en segundo plano).
+    """
+    plantilla = _PlantillaTabla(costos, meta)
+    pen_pasos = [_penalizaciones_de_paso(p) for p in pasos]
+    pasos_html = []
+    for idx, paso in enumerate(pasos, start=1):
+        # las penalizaciones DESPUÉS de un paso son las ANTES del siguiente
+        pen_despues = pen_pasos[idx] if idx < len(pen_pasos) else None
+        pasos_html.append(_build_step_table_html(costos, oferta, demanda, paso, meta, idx, plantilla, pen_despues))
+        if progreso is not None:
+            progreso(idx)
+    return pasos_html
+
+def _pasos_ventana(bitacora, costos_b, oferta_b, demanda_b, tolerancia, desde, hasta):
+    """
+    Pasos desde..hasta (1..n) con la misma expansión que detalle=pasos: se aplican
+    las asignaciones anteriores de la bitácora (sin elegir líneas) y Vogel sigue
+    con registro expandido desde ese estado; cada elección sólo depende del estado.
+    """
+    metodo = MetodoVogel(costos_b, oferta_b, demanda_b, "expandido", tolerancia)
+    metodo.reproducir(bitacora.pasos[:desde - 1])
+    return list(islice(metodo.iterar(guardar=False), hasta - desde + 1))
+
+
+def _pagina_html(bitacora, costos_b, oferta_b, demanda_b, meta, tolerancia, desde, hasta):
+    """
+    HTML de los pasos desde..hasta a partir de los mismos pasos que la página JSON
+    (penalizaciones y desempates del solver); se pide un paso más porque sus
+    penalizaciones son las DESPUÉS del último, como en detalle=html.
+    """
+    pasos = _pasos_ventana(bitacora, costos_b, oferta_b, demanda_b, tolerancia, desde, hasta + 1)
+    pen_pasos = [_penalizaciones_de_paso(p) for p in pasos]
+    plantilla = _PlantillaTabla(costos_b, meta)
+    return ''.join(_build_step_table_html(costos_b, oferta_b, demanda_b, paso, meta, k, plantilla,
+                                          pen_pasos[idx + 1] if idx + 1 < len(pen_pasos) else None)
+                   for idx, (k, paso) in enumerate(zip(range(desde, hasta + 1), pasos)))
+
+
+def _entero_arg(nombre, defecto):
+    valor = request.args.get(nombre)
+    if valor is None or valor == "":
+        return defecto
+    try:
+        return int(valor)
+    except ValueError:
+        raise ErrorEntrada(f"'{nombre}' debe ser un entero.", nombre)
+
+
+def _eventos_paso_html(costos_b, oferta_b, demanda_b, meta, formato_pasos):
+    """convertir de eventos_solver para el streaming de Vogel: con detalle == "html" cada paso lleva su tabla HTML."""
+    def eventos(pasos, detalle):
+        if detalle != "html" or formato_pasos != "expandido":
+            yield from eventos_de_pasos(pasos, detalle)
+            return
+        # las penalizaciones DESPUÉS de un paso son las ANTES del siguiente: se retiene un paso
+        plantilla = _PlantillaTabla(costos_b, meta)
+        anterior = None
+        idx = 0
+        for paso in pasos:
+            if anterior is not None:
+                idx += 1
+                pasos_html = _build_step_table_html(costos_b, oferta_b, demanda_b, anterior, meta, idx,
+                                                    plantilla, _penalizaciones_de_paso(paso))
+                yield {"tipo": "paso", "paso": anterior, "html": pasos_html}
+            anterior = paso
+        if anterior is not None:
+            idx += 1
+            pasos_html = _build_step_table_html(costos_b, oferta_b, demanda_b, anterior, meta, idx, plantilla)
+            yield {"tipo": "paso", "paso": anterior, "html": pasos_html}
+    return eventos
+
+
+def respuesta_vogel(resultado, costos_b, oferta_b, demanda_b, meta, detalle, formato_pasos, optimizar, progreso=None,
+                    crono=CRONOMETRO_NULO):
+    """Cuerpo de la respuesta de /resolver/vogel a partir del resultado del solver."""
+    respuesta = cuerpo_respuesta(resultado, meta, detalle, formato_pasos)
+    if detalle == "html" and formato_pasos == "expandido":
+        # Construir HTML para cada paso (será devuelto en el JSON para mostrar tablas completas)
+        with crono.etapa("html"):
+            respuesta["pasos_html"] = _build_pasos_html(costos_b, oferta_b, demanda_b, resultado["pasos"], meta, progreso)
+    return completar_respuesta(respuesta, costos_b, resultado, detalle, optimizar, crono)
+
+
 @resolver_bp.route("/resolver/vogel", methods=["POST"])
 def resolver_vogel():
     try:
-        data = request.get_json()
-        if not data:
-            return _error_response("No se recibió ningún dato.", 400)
+        crono = cronometro()
+        try:
+            with crono.etapa("validacion"):
+                peticion = leer_peticion("html")
+                data = peticion.data
+                # las tablas HTML recorren m·n celdas por paso: con costos dispersos se devuelven sólo los pasos
+                if peticion.dispersa and peticion.detalle == "html":
+                    peticion.detalle = "pasos"
+                # bitácora guardada en el servidor: la respuesta lleva sólo el resumen e id_solucion
+                pasos_en_servidor = bool(data.get("pasos_en_servidor", False))
+                if pasos_en_servidor:
+                    if peticion.stream:
+                        raise ErrorEntrada("pasos_en_servidor no está disponible con stream.")
+                    if peticion.dispersa:
+                        raise ErrorEntrada("pasos_en_servidor no está disponible con costos_dispersos.")
+                    if peticion.descomponer:
+                        raise ErrorEntrada("pasos_en_servidor no está disponible con descomponer.")
+                    peticion.detalle = "resumen"
+                # los pasos por componentes sólo llevan las penalizaciones de su bloque: sin tablas HTML
+                if peticion.descomponer and peticion.detalle == "html":
+                    peticion.detalle = "pasos"
 
-        costos = data.get("costos")
-        oferta = data.get("oferta")
-        demanda = data.get("demanda")
+            # resultados ya calculados para el mismo problema y opciones (no aplica al streaming
+            # ni a pasos_en_servidor: cada respuesta lleva su propio id_solucion)
+            cache = clave = None
+            if not peticion.stream and not pasos_en_servidor:
+                cache, clave, cacheada = buscar_en_cache("vogel", peticion, crono)
+                if cacheada is not None:
+                    return cacheada
+            costos_b, oferta_b, demanda_b, meta = balancear_peticion(peticion, crono)
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
 
-        # validaciones básicas (dimensiones)
-        if not isinstance(costos, list) or not isinstance(oferta, list) or not isinstance(demanda, list):
-            return _error_response("costos, oferta y demanda deben ser listas.", 400)
+        # Ejecutar método sobre las estructuras balanceadas
+        detalle, formato_pasos, optimizar = peticion.detalle, peticion.formato_pasos, peticion.optimizar
+        registro = "compacto" if pasos_en_servidor else registro_para(detalle, formato_pasos)
+        if peticion.descomponer:
+            resultado = resolver_por_componentes("vogel", peticion, registro, crono)
+        else:
+            metodo = crear_vogel(costos_b, oferta_b, demanda_b, peticion.modo, registro, peticion.tolerancia)
+            if peticion.stream:
+                eventos = eventos_solver(metodo, costos_b, meta, detalle, formato_pasos, optimizar,
+                                         _eventos_paso_html(costos_b, oferta_b, demanda_b, meta, formato_pasos))
+                return respuesta_stream(eventos, peticion.stream, "Error interno al resolver Vogel")
+            resultado = resolver_medido(metodo, costos_b, crono)
 
-        if len(costos) != len(oferta):
-            return _error_response("Las filas de 'costos' deben coincidir con el tamaño de 'oferta'.", 400)
+        respuesta = respuesta_vogel(resultado, costos_b, oferta_b, demanda_b, meta, detalle, formato_pasos, optimizar,
+                                    crono=crono)
+        if pasos_en_servidor:
+            guardar_solucion(respuesta, {
+                "costos": peticion.costos, "oferta": peticion.oferta, "demanda": peticion.demanda,
+                "asignaciones": respuesta["asignaciones"], "metodo": "vogel",
+                "numerico": data.get("numerico", "auto"), "tolerancia": peticion.tolerancia,
+                "bitacora": resultado["bitacora"]
+            })
+        return responder(respuesta, crono, cache, clave)
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response("Error interno al resolver Vogel", 500, detalle=tb)
 
-        for fila in costos:
-            if len(fila) != len(demanda):
-                return _error_response("Todas las filas de 'costos' deben coincidir con el tamaño de 'demanda'.", 400)
 
-        # Balancear automáticamente si es necesario
-        costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda)
+@resolver_bp.route("/resolver/<id_solucion>/pasos", methods=["GET"])
+def pasos_resultado(id_solucion):
+    try:
+        try:
+            desde = _entero_arg("desde", 1)
+            hasta = _entero_arg("hasta", desde + PASOS_POR_PAGINA - 1)
+            formato = leer_opcion(request.args, "formato", FORMATOS_PAGINA, "json")
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
 
-        # Ejecutar método sobre las estructuras balanceadas
-        metodo = MetodoVogel(costos_b, oferta_b, demanda_b)
-        resultado = metodo.resolver()
+        solucion = current_app.extensions["soluciones"].obtener(id_solucion)
+        if solucion is None or solucion.get("bitacora") is None:
+            return error_response("Resultado no encontrado (o expirado) o sin pasos guardados.", 404)
+        bitacora = solucion["bitacora"]
+        num_pasos = len(bitacora)
+        hasta = min(hasta, num_pasos)
+        if desde < 1 or (num_pasos and desde > num_pasos) or hasta < desde - 1:
+            return error_response(f"Rango de pasos inválido: hay {num_pasos} pasos (1..{num_pasos}).", 400)
+        if hasta - desde + 1 > MAX_PASOS_POR_PAGINA:
+            return error_response(f"Como máximo {MAX_PASOS_POR_PAGINA} pasos por página.", 400)
 
-        # Construir HTML para cada paso (será devuelto en el JSON para mostrar tablas completas)
-        pasos = resultado.get("pasos", [])
-        pasos_html = []
-        for idx, paso in enumerate(pasos, start=1):
-            # use el estado almacenado en cada paso (oferta_restante / demanda_restante)
-            html_step = _build_step_table_html(costos_b, oferta_b, demanda_b, paso, meta, idx)
-            pasos_html.append(html_step)
-
-        return jsonify({
-            "status": "ok",
-            "asignaciones": resultado["asignaciones"],
-            "pasos": resultado["pasos"],
-            "pasos_html": pasos_html,           # <-- nuevo: tablas HTML por paso
-            "meta_balance": meta
-        })
+        clave = f"{id_solucion}:{desde}:{hasta}:{formato}"
+        mimetype = "text/html" if formato == "html" else "application/json"
+        pagina = _paginas.obtener(clave)
+        if pagina is None:
+            costos_b, oferta_b, demanda_b, meta = balancear(solucion["costos"], solucion["oferta"], solucion["demanda"],
+                                                           solucion["tolerancia"])
+            if formato == "html":
+                pagina = _pagina_html(bitacora, costos_b, oferta_b, demanda_b, meta, solucion["tolerancia"],
+                                      desde, hasta).encode("utf-8")
+            else:
+                pagina = codificar_json({
+                    "status": "ok",
+                    "id_solucion": id_solucion,
+                    "num_pasos": num_pasos,
+                    "desde": desde,
+                    "hasta": hasta,
+                    "pasos": _pasos_ventana(bitacora, costos_b, oferta_b, demanda_b, solucion["tolerancia"],
+                                            desde, hasta)
+                }).encode("utf-8")
+            _paginas.guardar(clave, pagina)
+        # rango devuelto también en cabeceras (útil con formato html)
+        return Response(pagina, mimetype=mimetype,
+                        headers={"X-Num-Pasos": str(num_pasos), "X-Pasos-Desde": str(desde), "X-Pasos-Hasta": str(hasta)})
     except Exception:
         tb = traceback.format_exc()
-        return _error_response("Error interno al resolver Vogel", 500, detalle=tb)
+        return error_response("Error interno al obtener los pasos", 500, detalle=tb)
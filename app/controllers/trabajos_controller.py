@@ -0,0 +1,123 @@
+# app/controllers/trabajos_controller.py
+
+from flask import Blueprint, jsonify, current_app, url_for
+from app.logic.vectorizado import crear_vogel, crear_noroeste
+from app.logic.bitacora import registro_para
+from app.models.input_schema import validar_problema, ErrorEntrada
+from app.utils.balanceador import balancear
+from app.controllers.resolver_controller import respuesta_vogel
+from app.controllers.comun import error_response, leer_datos, leer_opcion, leer_opciones, respuesta_solver
+from app.utils.serializacion import respuesta_json
+import traceback
+
+trabajos_bp = Blueprint("trabajos", __name__)
+
+METODOS = ("vogel", "noroeste")
+
+
+def _funcion_trabajo(metodo, costos, oferta, demanda, modo, detalle, formato_pasos, optimizar, tolerancia=None):
+    """Función que ejecuta el gestor en segundo plano: misma respuesta que el endpoint síncrono."""
+    def ejecutar(trabajo):
+        costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda, tolerancia)
+        registro = registro_para(detalle, formato_pasos)
+        if metodo == "vogel":
+            solver = crear_vogel(costos_b, oferta_b, demanda_b, modo, registro, tolerancia)
+        else:
+            solver = crear_noroeste(costos_b, oferta_b, demanda_b, modo, registro, tolerancia)
+
+        # iterar() produce algo por asignación con cualquier registro (None si "ninguno"):
+        # el progreso avanza y la cancelación se comprueba también sin pasos
+        for paso_actual, _ in enumerate(solver.iterar(), start=1):
+            trabajo.avanzar(paso_actual)
+        resultado = solver.resultado()
+        trabajo.avanzar(resultado["num_pasos"], fase="respuesta")
+
+        if metodo == "vogel":
+            # el HTML de los pasos también informa progreso (y permite cancelar)
+            return respuesta_vogel(resultado, costos_b, oferta_b, demanda_b, meta, detalle, formato_pasos, optimizar,
+                                   progreso=lambda k: trabajo.avanzar(k, fase="html" if k == 1 else None))
+        return respuesta_solver(resultado, costos_b, meta, detalle, formato_pasos, optimizar)
+    return ejecutar
+
+
+def _gestor():
+    return current_app.extensions["trabajos"]
+
+
+def _con_enlaces(estado):
+    estado["enlaces"] = {
+        "estado": url_for("trabajos.estado_trabajo", id_trabajo=estado["id"]),
+        "progreso": url_for("trabajos.progreso_trabajo", id_trabajo=estado["id"]),
+        "resultado": url_for("trabajos.resultado_trabajo", id_trabajo=estado["id"]),
+        "cancelar": url_for("trabajos.cancelar_trabajo", id_trabajo=estado["id"])
+    }
+    return estado
+
+
+@trabajos_bp.route("/trabajos", methods=["POST"])
+def crear_trabajo():
+    try:
+        try:
+            data = leer_datos()
+            metodo = leer_opcion(data, "metodo", METODOS, "vogel")
+            modo, optimizar, formato_pasos, detalle = leer_opciones(data, "html" if metodo == "vogel" else "pasos")
+            # dimensiones, tipos y signos de costos, oferta y demanda
+            costos, oferta, demanda = validar_problema(data, dispersos=False)
+        except ErrorEntrada as e:
+            return error_response(str(e), e.status, **e.a_dict())
+
+        # ambos métodos terminan en a lo sumo m+n-1 asignaciones (+1 por la línea ficticia)
+        pasos_estimados = len(oferta) + len(demanda)
+        funcion = _funcion_trabajo(metodo, costos, oferta, demanda, modo, detalle, formato_pasos, optimizar,
+                                   data.get("tolerancia"))
+        id_trabajo = _gestor().crear(metodo, funcion, pasos_estimados)
+        return jsonify(_con_enlaces(_gestor().estado(id_trabajo))), 202
+    except Exception:
+        tb = traceback.format_exc()
+        return error_response("Error interno al crear el trabajo", 500, detalle=tb)
+
+
+@trabajos_bp.route("/trabajos/<id_trabajo>", methods=["GET"])
+def estado_trabajo(id_trabajo):
+    estado = _gestor().estado(id_trabajo)
+    if estado is None:
+        return error_response("Trabajo no encontrado.", 404)
+    return jsonify(_con_enlaces(estado))
+
+
+@trabajos_bp.route("/trabajos/<id_trabajo>/progreso", methods=["GET"])
+def progreso_trabajo(id_trabajo):
+    estado = _gestor().estado(id_trabajo)
+    if estado is None:
+        return error_response("Trabajo no encontrado.", 404)
+    return jsonify({
+        "id": estado["id"],
+        "estado": estado["estado"],
+        "fase": estado.get("fase"),
+        "paso_actual": estado.get("paso_actual"),
+        "pasos_estimados": estado.get("pasos_estimados"),
+        "restante_estimado_s": estado.get("restante_estimado_s")
+    })
+
+
+@trabajos_bp.route("/trabajos/<id_trabajo>/resultado", methods=["GET"])
+def resultado_trabajo(id_trabajo):
+    estado = _gestor().estado(id_trabajo)
+    if estado is None:
+        return error_response("Trabajo no encontrado.", 404)
+    if estado["estado"] == "error":
+        return jsonify({"error": estado.get("error"), "code": estado.get("code")}), 500
+    if estado["estado"] != "terminado":
+        return error_response(f"El trabajo no tiene resultado (estado: {estado['estado']}).", 409)
+    resultado = _gestor().resultado(id_trabajo)
+    if resultado is None:
+        return error_response("Resultado no encontrado.", 404)
+    return respuesta_json(resultado)
+
+
+@trabajos_bp.route("/trabajos/<id_trabajo>/cancelar", methods=["POST"])
+def cancelar_trabajo(id_trabajo):
+    estado = _gestor().cancelar(id_trabajo)
+    if estado is None:
+        return error_response("Trabajo no encontrado.", 404)
+    return jsonify(_con_enlaces(estado))
@@ -0,0 +1,156 @@
+# app/logic/bitacora.py
+
+# formatos de registro de pasos aceptados por los solvers
+FORMATOS_PASOS = ("expandido", "compacto")
+
+# niveles de detalle de los endpoints: "ninguno" (sólo asignaciones y costo),
+# "resumen" (+ número de pasos), "pasos" (+ registro de pasos), "html" (+ tablas HTML)
+NIVELES_DETALLE = ("ninguno", "resumen", "pasos", "html")
+
+
+def registro_para(detalle, formato_pasos="expandido"):
+    """Registro que debe llevar el solver para el nivel de detalle pedido."""
+    if detalle in ("ninguno", "resumen"):
+        return "ninguno"
+    return formato_pasos
+
+
+def error_resultado(resultado):
+    """Mensaje de error del solver según el registro: en el resultado, en la bitácora compacta o como último paso."""
+    if resultado.get("error"):
+        return resultado["error"]
+    bitacora = resultado.get("bitacora")
+    if bitacora is not None and bitacora.error:
+        return bitacora.error["error"]
+    if resultado["pasos"] and "error" in resultado["pasos"][-1]:
+        return resultado["pasos"][-1]["error"]
+    return None
+
+
+class BitacoraCompacta:
+    """
+    Registro de pasos codificado por diferencias.
+
+    En lugar de copiar oferta/demanda completas en cada paso, se guarda el estado
+    inicial una vez y, por paso, sólo la celda elegida, la cantidad asignada y la
+    línea retirada ("fila", "columna", "ambas" o None). Los métodos que guardan
+    datos adicionales por paso (p.ej. Vogel: tipo y posición de la penalización)
+    los declaran en `extra`.
+
+    El estado completo de cualquier paso se reconstruye bajo demanda con
+    estado(k), asignaciones(k) o paso_expandido(k).
+    """
+
+    FORMATO = "delta-v1"
+    CAMPOS = ("fila", "columna", "cantidad", "retira")
+
+    # cada cuántos pasos se guarda un punto de control al reconstruir estados
+    INTERVALO_CONTROL = 64
+
+    def __init__(self, oferta, demanda, extra=()):
+        self.oferta_inicial = list(oferta)
+        self.demanda_inicial = list(demanda)
+        self.extra = tuple(extra)
+        self.pasos = []
+        self.error = None
+        self._controles = {0: (self.oferta_inicial, self.demanda_inicial)}
+
+    def __len__(self):
+        return len(self.pasos)
+
+    def registrar(self, fila, columna, cantidad, retira, *extra):
+        self.pasos.append((fila, columna, cantidad, retira) + extra)
+
+    # --- serialización ---
+
+    def a_dict(self):
+        datos = {
+            "formato": self.FORMATO,
+            "campos": list(self.CAMPOS + self.extra),
+            "oferta_inicial": self.oferta_inicial,
+            "demanda_inicial": self.demanda_inicial,
+            "pasos": self.pasos,
+        }
+        if self.error is not None:
+            datos["error"] = self.error
+        return datos
+
+    @classmethod
+    def desde_dict(cls, datos):
+        if datos.get("formato") != cls.FORMATO:
+            raise ValueError(f"formato de bitácora no soportado: {datos.get('formato')}")
+        extra = tuple(datos["campos"][len(cls.CAMPOS):])
+        bitacora = cls(datos["oferta_inicial"], datos["demanda_inicial"], extra)
+        bitacora.pasos = [tuple(p) for p in datos["pasos"]]
+        bitacora.error = datos.get("error")
+        return bitacora
+
+    # --- lectura ---
+
+    def estado(self, k):
+        """(oferta, demanda) después de aplicar los primeros k pasos (k=0 es el estado inicial)."""
+        if not 0 <= k <= len(self.pasos):
+            raise IndexError(f"paso fuera de rango: {k}")
+        base = k - k % self.INTERVALO_CONTROL
+        while base not in self._controles:
+            base -= self.INTERVALO_CONTROL
+        oferta, demanda = self._controles[base]
+        oferta = oferta[:]
+        demanda = demanda[:]
+        for t in range(base, k):
+            i, j, cantidad = self.pasos[t][:3]
+            oferta[i] -= cantidad
+            demanda[j] -= cantidad
+            if (t + 1) % self.INTERVALO_CONTROL == 0 and (t + 1) not in self._controles:
+                self._controles[t + 1] = (oferta[:], demanda[:])
+        return oferta, demanda
+
+    def asignaciones(self, k=None):
+        """Matriz de asignaciones después de k pasos (por defecto, todos)."""
+        k = len(self.pasos) if k is None else k
+        matriz = [[0] * len(self.demanda_inicial) for _ in self.oferta_inicial]
+        for i, j, cantidad in (p[:3] for p in self.pasos[:k]):
+            matriz[i][j] = cantidad
+        return matriz
+
+    def paso(self, k):
+        """Paso k (1..n) como dict con los nombres de campo."""
+        return dict(zip(self.CAMPOS + self.extra, self.pasos[k - 1]))
+
+    def paso_expandido(self, k):
+        """
+        Paso k (1..n) con el estado ANTES y DESPUÉS, con las mismas claves que el
+        registro expandido (oferta_restante = antes, oferta_posterior = después).
+        """
+        oferta_antes, demanda_antes = self.estado(k - 1)
+        oferta_despues, demanda_despues = self.estado(k)
+        datos = self.paso(k)
+        paso = {
+            "paso_num": k,
+            "celda_elegida": (datos["fila"], datos["columna"]),
+            "asignacion_realizada": datos["cantidad"],
+            "retira": datos["retira"],
+            "oferta_restante": oferta_antes,
+            "demanda_restante": demanda_antes,
+            "oferta_posterior": oferta_despues,
+            "demanda_posterior": demanda_despues,
+        }
+        if "tipo" in datos:
+            paso["tipo_penalizacion"] = datos["tipo"]
+        if "posicion" in datos:
+            paso["posicion"] = datos["posicion"]
+        # otros campos extra (p.ej. Russell: delta) con su mismo nombre
+        for campo in self.extra:
+            if campo not in ("tipo", "posicion"):
+                paso[campo] = datos[campo]
+        return paso
+
+
+def linea_retirada(fila_agotada, col_agotada):
+    if fila_agotada and col_agotada:
+        return "ambas"
+    if fila_agotada:
+        return "fila"
+    if col_agotada:
+        return "columna"
+    return None
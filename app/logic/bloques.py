@@ -0,0 +1,232 @@
+# app/logic/bloques.py
+#
+# Descomposición por bloques. Con rutas prohibidas (costo None o ausentes en
+# costos_dispersos) el grafo bipartito de orígenes y destinos suele partirse en
+# componentes sin rutas entre sí; el flujo de uno nunca llega a otro, así que cada
+# componente es un problema independiente, más pequeño, que se resuelve por su
+# cuenta (en paralelo si se da un `mapa` de un pool de procesos).
+#
+# El balanceo sigue el del problema completo: si sobra oferta, la columna
+# ficticia global recibe, de cada componente, su propio excedente (columna ficticia
+# del bloque); igual con la fila ficticia si falta oferta. Un componente cuyo
+# desbalance va en el sentido contrario (o que lo tiene en un problema balanceado)
+# no puede compensarlo con los demás: es infactible y se informa por separado,
+# sin impedir resolver el resto.
+#
+# Las asignaciones y el registro de pasos de cada bloque se traducen a índices
+# globales; los pasos se concatenan bloque a bloque, con el estado de oferta y
+# demanda del problema completo (los bloques anteriores ya resueltos, los
+# siguientes intactos) y el número de componente en "componente".
+
+from app.logic.bitacora import BitacoraCompacta, error_resultado
+from app.logic.dispersa import (MatrizDispersa, es_dispersa, componentes, matriz_asignaciones,
+                                asignaciones_a_rutas, num_celdas)
+from app.logic.numerico import tolerancia_absoluta
+from app.utils.balanceador import balancear
+
+# por debajo de estas celdas los bloques se resuelven en el proceso actual: enviar
+# los subproblemas a un pool cuesta más que resolverlos
+MIN_CELDAS_PARALELO = 40000
+
+
+def _subproblema(costos, filas, columnas):
+    """Costos de las filas y columnas dadas, en la misma representación (densa o dispersa)."""
+    if es_dispersa(costos):
+        posicion = {j: l for l, j in enumerate(columnas)}
+        sub = MatrizDispersa(len(filas), len(columnas))
+        for k, i in enumerate(filas):
+            sub.filas[k].update((posicion[j], c) for j, c in costos[i].items())
+        return sub
+    return [[costos[i][j] for j in columnas] for i in filas]
+
+
+def _lineas(indices, limite=5):
+    texto = ", ".join(str(k) for k in indices[:limite])
+    return texto + (", ..." if len(indices) > limite else "")
+
+
+def dividir(costos, oferta, demanda, tolerancia=None):
+    """
+    Componentes del problema sin balancear. Devuelve (bloques, meta): meta es el
+    balanceo del problema completo y cada bloque un dict con "componente",
+    "filas" y "columnas" (índices globales) y, si es resoluble, "costos", "oferta",
+    "demanda" y "meta" del subproblema ya balanceado; si no, "error". Los
+    componentes sin oferta ni demanda se omiten.
+    """
+    m = len(oferta)
+    n = len(demanda)
+    _, _, _, meta = balancear(costos, oferta, demanda, tolerancia)
+    tol = tolerancia_absoluta(oferta + demanda, tolerancia)
+
+    bloques = []
+    for filas, columnas in componentes(costos, m, n):
+        total_o = sum(oferta[i] for i in filas)
+        total_d = sum(demanda[j] for j in columnas)
+        if not total_o and not total_d:
+            continue
+        bloque = {"componente": len(bloques), "filas": filas, "columnas": columnas}
+        bloques.append(bloque)
+
+        diferencia = total_o - total_d
+        if abs(diferencia) <= tol:
+            tipo = "balanceado"
+        else:
+            tipo = "columna_ficticia" if diferencia > 0 else "fila_ficticia"
+        if tipo not in ("balanceado", meta["tipo"]):
+            bloque["error"] = (f"Componente infactible: las filas [{_lineas(filas)}] y columnas [{_lineas(columnas)}] "
+                               f"sólo se conectan entre sí; su oferta ({total_o}) no coincide con su demanda "
+                               f"({total_d}) y el resto del problema no puede compensarlo.")
+            continue
+
+        sub_costos = _subproblema(costos, filas, columnas)
+        sub_oferta = [oferta[i] for i in filas]
+        sub_demanda = [demanda[j] for j in columnas]
+        if tipo == "balanceado":
+            # un residuo dentro de la tolerancia global no merece una línea ficticia propia
+            sub_meta = {"tipo": "balanceado", "diferencia": 0}
+        else:
+            sub_costos, sub_oferta, sub_demanda, sub_meta = balancear(sub_costos, sub_oferta, sub_demanda, tolerancia)
+        bloque.update(costos=sub_costos, oferta=sub_oferta, demanda=sub_demanda, meta=sub_meta)
+    return bloques, meta
+
+
+def resolver_bloque(metodo, costos, oferta, demanda, modo="auto", registro="expandido", tolerancia=None):
+    """Resultado del solver para un bloque. Función de módulo para poder enviarse a un pool de procesos."""
+    from app.logic.lote import FABRICAS  # lote importa este módulo
+    return FABRICAS[metodo](costos, oferta, demanda, modo, registro, tolerancia).resolver()
+
+
+def _mapear_paso(paso, mapa_f, mapa_c, base_o, base_d, desfase_o, desfase_d, num, componente):
+    """Paso de un bloque con índices y estado globales."""
+    global_ = dict(paso)
+    global_["paso_num"] = num
+    global_["componente"] = componente
+    for clave in ("celda_elegida", "celda"):
+        if paso.get(clave) is not None:
+            i, j = paso[clave]
+            global_[clave] = (mapa_f[i], mapa_c[j])
+    for clave, mapa, base, desfase in (("oferta_restante", mapa_f, base_o, desfase_o),
+                                       ("oferta_posterior", mapa_f, base_o, desfase_o),
+                                       ("demanda_restante", mapa_c, base_d, desfase_d),
+                                       ("demanda_posterior", mapa_c, base_d, desfase_d)):
+        if paso.get(clave) is not None:
+            vector = base[:]
+            for k, v in enumerate(paso[clave]):
+                vector[mapa[k]] = v + desfase[k]
+            global_[clave] = vector
+    if paso.get("penalizaciones_filas") is not None:
+        global_["penalizaciones_filas"] = [{**e, "fila": mapa_f[e["fila"]]} for e in paso["penalizaciones_filas"]]
+    if paso.get("penalizaciones_columnas") is not None:
+        global_["penalizaciones_columnas"] = [{**e, "columna": mapa_c[e["columna"]]}
+                                              for e in paso["penalizaciones_columnas"]]
+    tipo = paso.get("tipo_penalizacion")
+    if tipo in ("fila", "columna") and paso.get("posicion") is not None:
+        global_["posicion"] = (mapa_f if tipo == "fila" else mapa_c)[paso["posicion"]]
+    tie = paso.get("tie_info")
+    if isinstance(tie, dict) and tie.get("candidates"):
+        global_["tie_info"] = {**tie, "candidates": [(t, (mapa_f if t == "fila" else mapa_c)[k], c)
+                                                     for t, k, c in tie["candidates"]]}
+    return global_
+
+
+def unir(bloques, resultados, costos_b, oferta_b, demanda_b, registro="expandido"):
+    """
+    Resultado del problema completo (mismo formato que el de un solver) a partir de
+    los resultados de los bloques resolubles, en el orden de `bloques`. Añade
+    "componentes": por componente, su tamaño, estado, pasos y error si lo hubo.
+    """
+    m = len(oferta_b)
+    n = len(demanda_b)
+    asignaciones = matriz_asignaciones(costos_b, m, n)
+    disperso = es_dispersa(costos_b)
+    # estado global a medida que se recorren los bloques (para los pasos)
+    resto_o = list(oferta_b)
+    resto_d = list(demanda_b)
+    pasos = []
+    bitacora = None
+    errores = []
+    info = []
+
+    resultados = iter(resultados)
+    for bloque in bloques:
+        datos = {"componente": bloque["componente"], "filas": len(bloque["filas"]),
+                 "columnas": len(bloque["columnas"])}
+        info.append(datos)
+        if "error" in bloque:
+            datos.update(status="infactible", error=bloque["error"])
+            errores.append(bloque["error"])
+            continue
+        resultado = next(resultados)
+
+        # la línea ficticia del bloque es una parte de la global (índice m-1 o n-1)
+        mapa_f = bloque["filas"] + [m - 1] * (len(bloque["oferta"]) - len(bloque["filas"]))
+        mapa_c = bloque["columnas"] + [n - 1] * (len(bloque["demanda"]) - len(bloque["columnas"]))
+        desfase_o = [resto_o[g] - v for g, v in zip(mapa_f, bloque["oferta"])]
+        desfase_d = [resto_d[g] - v for g, v in zip(mapa_c, bloque["demanda"])]
+
+        if registro == "expandido":
+            for paso in resultado["pasos"]:
+                pasos.append(_mapear_paso(paso, mapa_f, mapa_c, resto_o, resto_d, desfase_o, desfase_d,
+                                          len(pasos) + 1, bloque["componente"]))
+        elif registro == "compacto":
+            sub = resultado["bitacora"]
+            if bitacora is None:
+                bitacora = BitacoraCompacta(oferta_b, demanda_b, extra=sub.extra)
+            por_tipo = "tipo" in sub.extra and "posicion" in sub.extra
+            for i, j, cantidad, retira, *extra in sub.pasos:
+                if por_tipo:
+                    datos_extra = dict(zip(sub.extra, extra))
+                    datos_extra["posicion"] = (mapa_f if datos_extra["tipo"] == "fila" else mapa_c)[datos_extra["posicion"]]
+                    extra = [datos_extra[c] for c in sub.extra]
+                bitacora.registrar(mapa_f[i], mapa_c[j], cantidad, retira, *extra)
+            if sub.error is not None and bitacora.error is None:
+                bitacora.error = sub.error
+
+        celdas = resultado["asignaciones"]
+        celdas = celdas if es_dispersa(bloque["costos"]) else (
+            (i, j, x) for i, fila in enumerate(celdas) for j, x in enumerate(fila) if x)
+        for i, j, x in celdas:
+            gi, gj = mapa_f[i], mapa_c[j]
+            asignaciones[gi][gj] += x
+            resto_o[gi] -= x
+            resto_d[gj] -= x
+
+        datos.update(status="ok", num_pasos=resultado["num_pasos"])
+        error = error_resultado(resultado)
+        if error:
+            datos["error"] = error
+            errores.append(f"componente {bloque['componente']}: {error}")
+
+    if bitacora is None and registro == "compacto":
+        bitacora = BitacoraCompacta(oferta_b, demanda_b)
+    union = {
+        "asignaciones": asignaciones_a_rutas(asignaciones) if disperso else asignaciones,
+        "pasos": pasos,
+        "num_pasos": sum(d.get("num_pasos", 0) for d in info),
+        "componentes": info
+    }
+    if bitacora is not None:
+        union["bitacora"] = bitacora
+    if errores:
+        union["error"] = errores[0] if len(errores) == 1 else f"{len(errores)} componentes con error; el primero: {errores[0]}"
+    return union
+
+
+def resolver_por_bloques(costos, oferta, demanda, metodo="vogel", modo="auto", registro="expandido",
+                         tolerancia=None, mapa=map):
+    """
+    Resuelve el problema componente a componente. `mapa` reparte los bloques
+    (p. ej. el map de un pool de procesos); sólo se usa con más de un bloque y
+    al menos MIN_CELDAS_PARALELO celdas. Devuelve (costos_b, oferta_b, demanda_b,
+    meta, resultado) con el problema completo balanceado como lo hace balancear.
+    """
+    costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda, tolerancia)
+    bloques, _ = dividir(costos, oferta, demanda, tolerancia)
+    resolubles = [b for b in bloques if "error" not in b]
+    if len(resolubles) < 2 or num_celdas(costos) < MIN_CELDAS_PARALELO:
+        mapa = map
+    k = len(resolubles)
+    resultados = mapa(resolver_bloque, [metodo] * k, [b["costos"] for b in resolubles],
+                      [b["oferta"] for b in resolubles], [b["demanda"] for b in resolubles],
+                      [modo] * k, [registro] * k, [tolerancia] * k)
+    return costos_b, oferta_b, demanda_b, meta, unir(bloques, resultados, costos_b, oferta_b, demanda_b, registro)
@@ -0,0 +1,268 @@
+# app/logic/cambios.py
+#
+# Re-resolución en caliente: dado un problema ya resuelto y unos pocos cambios
+# (costos de algunas rutas, oferta de algunas filas, demanda de algunas columnas)
+# se repara la solución anterior en lugar de resolver desde cero:
+#
+#   1. las filas y columnas afectadas por un cambio pierden sus asignaciones; el
+#      resto de asignaciones se conserva (la línea ficticia se conserva si el
+#      balanceo sigue siendo del mismo tipo y con la misma diferencia);
+#   2. la oferta y demanda que quedaron sin asignar forman un subproblema, en
+#      general de pocas filas y columnas, que se resuelve con el método elegido;
+#   3. las asignaciones del subproblema pueden cerrar ciclos con las conservadas:
+#      cada ciclo se deshace moviendo flujo en el sentido que no aumenta el costo,
+#      así la solución vuelve a ser básica (y MODI puede partir de ella).
+
+import math
+from collections import deque
+from app.logic.lote import FABRICAS
+from app.logic.numerico import tolerancia_absoluta
+from app.utils.balanceador import balancear
+
+
+def aplicar_cambios(costos, oferta, demanda, cambios, convertir=None):
+    """
+    Problema con `cambios` aplicados, sin modificar el original: sólo se copian las
+    filas de costos que cambian. `cambios` ya validado (ver validar_cambios):
+    {"costos": [[fila, columna, costo]], "oferta": [[fila, valor]], "demanda": [[columna, valor]]}.
+    `convertir` se aplica a cada valor nuevo (p. ej. a_fraccion). Devuelve
+    (costos, oferta, demanda, filas_afectadas, columnas_afectadas).
+    """
+    convertir = convertir or (lambda v: v)
+    costos = list(costos)
+    oferta = list(oferta)
+    demanda = list(demanda)
+    filas = set()
+    columnas = set()
+    copiadas = set()
+    for i, j, c in cambios.get("costos", ()):
+        if i not in copiadas:
+            costos[i] = list(costos[i])
+            copiadas.add(i)
+        costos[i][j] = convertir(c)
+        filas.add(i)
+        columnas.add(j)
+    for i, valor in cambios.get("oferta", ()):
+        oferta[i] = convertir(valor)
+        filas.add(i)
+    for j, valor in cambios.get("demanda", ()):
+        demanda[j] = convertir(valor)
+        columnas.add(j)
+    return costos, oferta, demanda, filas, columnas
+
+
+def verificar_asignaciones(asignaciones, oferta_b, demanda_b, tolerancia=0, costos_b=None):
+    """
+    Comprueba que unas asignaciones recibidas correspondan al problema balanceado:
+    dimensiones, cantidades no negativas, sumas por fila y columna y, con
+    `costos_b`, que no haya flujo en rutas prohibidas. Devuelve un mensaje de
+    error o None.
+    """
+    if len(asignaciones) != len(oferta_b) or any(len(fila) != len(demanda_b) for fila in asignaciones):
+        return (f"'asignaciones' debe ser de {len(oferta_b)}x{len(demanda_b)} "
+                f"(el problema balanceado, con la línea ficticia si la hay).")
+    if any(min(fila, default=0) < 0 for fila in asignaciones):
+        return "'asignaciones' no puede tener cantidades negativas."
+    for nombre, sumas, totales in (("fila", map(sum, asignaciones), oferta_b),
+                                   ("columna", map(sum, zip(*asignaciones)), demanda_b)):
+        for k, (suma, total) in enumerate(zip(sumas, totales)):
+            if abs(suma - total) > tolerancia:
+                return f"'asignaciones' no coincide con el problema: la {nombre} {k} suma {suma} y debería sumar {total}."
+    if costos_b is not None:
+        for i, fila in enumerate(asignaciones):
+            for j, x in enumerate(fila):
+                if x and costos_b[i][j] is None:
+                    return f"'asignaciones' tiene flujo en la ruta prohibida ({i}, {j})."
+    return None
+
+
+def _lineas_ficticias(meta, filas, columnas):
+    """(índice de fila ficticia, índice de columna ficticia) del problema balanceado; None si no hay."""
+    return (filas if meta["tipo"] == "fila_ficticia" else None,
+            columnas if meta["tipo"] == "columna_ficticia" else None)
+
+
+def _nodo_a_celda(x, y, filas):
+    return (x, y - filas) if x < filas else (y, x - filas)
+
+
+def _camino(vecinos, origen, destino):
+    """Nodos del camino entre origen y destino en el bosque de celdas básicas, o None si no están conectados."""
+    padre = {origen: None}
+    cola = deque([origen])
+    while cola:
+        x = cola.popleft()
+        if x == destino:
+            camino = []
+            while x is not None:
+                camino.append(x)
+                x = padre[x]
+            return camino[::-1]
+        for y in vecinos.get(x, ()):
+            if y not in padre:
+                padre[y] = x
+                cola.append(y)
+    return None
+
+
+def _costo(c):
+    # una ruta prohibida (None) que el solver usó igualmente es lo primero que conviene vaciar
+    return math.inf if c is None else c
+
+
+def basificar(costos, asignaciones, base, nuevas, tolerancia=0):
+    """
+    Deshace los ciclos que las celdas `nuevas` forman con las celdas `base` (que
+    entre sí no forman ninguno). Por cada ciclo se mueve flujo con signos alternos
+    en el sentido que no aumenta el costo, hasta que una celda llega a 0: la
+    oferta y la demanda no cambian y la solución queda básica. Modifica
+    `asignaciones` en sitio; devuelve cuántos ciclos se deshicieron.
+    """
+    filas = len(asignaciones)
+    vecinos = {}
+
+    def unir(i, j):
+        vecinos.setdefault(i, set()).add(filas + j)
+        vecinos.setdefault(filas + j, set()).add(i)
+
+    def separar(i, j):
+        vecinos[i].discard(filas + j)
+        vecinos[filas + j].discard(i)
+
+    for i, j in base:
+        unir(i, j)
+
+    ciclos = 0
+    for i, j in nuevas:
+        if filas + j in vecinos.get(i, ()):
+            continue  # celda conservada que además recibió flujo del subproblema
+        nodos = _camino(vecinos, i, filas + j)
+        if nodos is None:
+            unir(i, j)
+            continue
+
+        # la nueva es +, la primera celda del camino -, la segunda +, ...
+        camino = [_nodo_a_celda(x, y, filas) for x, y in zip(nodos, nodos[1:])]
+        menos = camino[0::2]
+        mas = camino[1::2]
+        delta = (_costo(costos[i][j]) - sum(_costo(costos[p][q]) for p, q in menos)
+                 + sum(_costo(costos[p][q]) for p, q in mas))
+        if delta > 0:
+            # aumentar la nueva encarece: se reduce, y con ella las celdas "+"
+            menos, mas = mas + [(i, j)], menos
+        else:
+            mas = mas + [(i, j)]
+        theta = min(asignaciones[p][q] for p, q in menos)
+        for p, q in mas:
+            asignaciones[p][q] += theta
+        for p, q in menos:
+            asignaciones[p][q] -= theta
+            if asignaciones[p][q] <= tolerancia:
+                asignaciones[p][q] -= asignaciones[p][q]
+        for p, q in camino:
+            if not asignaciones[p][q]:
+                separar(p, q)
+        if asignaciones[i][j]:
+            unir(i, j)
+        ciclos += 1
+    return ciclos
+
+
+def reparar(costos_b, oferta_b, demanda_b, previas, meta_prev, meta, filas_afectadas, columnas_afectadas,
+            metodo="vogel", modo="auto", tolerancia=None):
+    """
+    Repara `previas` (asignaciones del problema balanceado anterior) para el problema
+    balanceado nuevo. Devuelve (asignaciones, info) o (None, info) si el subproblema
+    no se pudo resolver (p. ej. rutas prohibidas que sólo se sortean moviendo
+    asignaciones conservadas); entonces conviene resolver el problema completo.
+    """
+    filas = len(oferta_b) - (meta["tipo"] == "fila_ficticia")
+    columnas = len(demanda_b) - (meta["tipo"] == "columna_ficticia")
+    fila_fict, col_fict = _lineas_ficticias(meta, filas, columnas)
+    fila_fict_prev, col_fict_prev = _lineas_ficticias(meta_prev, filas, columnas)
+
+    # la línea ficticia anterior sólo se conserva si sigue existiendo con la misma cantidad
+    filas_afectadas = set(filas_afectadas)
+    columnas_afectadas = set(columnas_afectadas)
+    misma_ficticia = meta["tipo"] == meta_prev["tipo"] and meta["diferencia"] == meta_prev["diferencia"]
+    if fila_fict_prev is not None and not misma_ficticia:
+        filas_afectadas.add(fila_fict_prev)
+    if col_fict_prev is not None and not misma_ficticia:
+        columnas_afectadas.add(col_fict_prev)
+    if fila_fict is not None and not misma_ficticia:
+        filas_afectadas.add(fila_fict)
+    if col_fict is not None and not misma_ficticia:
+        columnas_afectadas.add(col_fict)
+
+    m = len(oferta_b)
+    n = len(demanda_b)
+    asignaciones = [[0] * n for _ in range(m)]
+    resto_o = list(oferta_b)
+    resto_d = list(demanda_b)
+    base = []
+    for i, fila in enumerate(previas):
+        if i in filas_afectadas or i >= m:
+            continue
+        for j, x in enumerate(fila):
+            if x and j not in columnas_afectadas and j < n:
+                asignaciones[i][j] = x
+                resto_o[i] -= x
+                resto_d[j] -= x
+                base.append((i, j))
+
+    # oferta y demanda pendientes: el subproblema
+    tol = tolerancia_absoluta(oferta_b + demanda_b, tolerancia)
+    sub_filas = [i for i in range(m) if resto_o[i] > tol]
+    sub_cols = [j for j in range(n) if resto_d[j] > tol]
+    info = {
+        "filas_afectadas": len(filas_afectadas),
+        "columnas_afectadas": len(columnas_afectadas),
+        "celdas_conservadas": len(base),
+        "subproblema": [len(sub_filas), len(sub_cols)],
+        "ciclos_deshechos": 0,
+        "completa": False
+    }
+    if not sub_filas or not sub_cols:
+        return asignaciones, info
+
+    sub_costos = [[costos_b[i][j] for j in sub_cols] for i in sub_filas]
+    solver = FABRICAS[metodo](sub_costos, [resto_o[i] for i in sub_filas], [resto_d[j] for j in sub_cols],
+                              modo, "ninguno", tolerancia)
+    resultado = solver.resolver()
+    if resultado.get("error"):
+        info["error_subproblema"] = resultado["error"]
+        return None, info
+
+    nuevas = []
+    for k, fila in enumerate(resultado["asignaciones"]):
+        i = sub_filas[k]
+        for l, x in enumerate(fila):
+            if x:
+                j = sub_cols[l]
+                asignaciones[i][j] += x
+                nuevas.append((i, j))
+    info["ciclos_deshechos"] = basificar(costos_b, asignaciones, base, nuevas, tol)
+    return asignaciones, info
+
+
+def reresolver(costos, oferta, demanda, previas, cambios, metodo="vogel", modo="auto", tolerancia=None,
+               convertir=None):
+    """
+    Aplica `cambios` al problema (costos, oferta, demanda) sin balancear y repara
+    `previas`, sus asignaciones balanceadas. Devuelve
+    (costos_nuevos, oferta_nueva, demanda_nueva, costos_b, asignaciones, meta, info);
+    si la reparación no es posible se resuelve el problema completo (info["completa"]).
+    """
+    _, _, _, meta_prev = balancear(costos, oferta, demanda, tolerancia)
+    costos_n, oferta_n, demanda_n, filas_af, cols_af = aplicar_cambios(costos, oferta, demanda, cambios, convertir)
+    costos_b, oferta_b, demanda_b, meta = balancear(costos_n, oferta_n, demanda_n, tolerancia)
+
+    asignaciones, info = reparar(costos_b, oferta_b, demanda_b, previas, meta_prev, meta, filas_af, cols_af,
+                                 metodo, modo, tolerancia)
+    if asignaciones is None:
+        resultado = FABRICAS[metodo](costos_b, oferta_b, demanda_b, modo, "ninguno", tolerancia).resolver()
+        asignaciones = resultado["asignaciones"]
+        info["completa"] = True
+        if resultado.get("error"):
+            info["error_solver"] = resultado["error"]
+    return costos_n, oferta_n, demanda_n, costos_b, asignaciones, meta, info
@@ -0,0 +1,67 @@
+# app/logic/comparar.py
+
+from time import perf_counter
+from app.logic.lote import FABRICAS, _error_item
+from app.logic.bitacora import error_resultado
+from app.logic.modi import costo_total
+import time
+import traceback
+
+# orden de envío al pool: primero los métodos más baratos, para que con un plazo
+# corto (o pocos procesos) al menos éstos lleguen a terminar
+ORDEN_METODOS = ("noroeste", "costo_minimo", "russell", "vogel")
+
+# con plazo, cada cuántos pasos el solver mira si se agotó el tiempo
+INTERVALO_PLAZO = 16
+
+
+def resolver_metodo(nombre, costos_b, oferta_b, demanda_b, modo="auto", limite=None, tolerancia=None):
+    """
+    Resuelve el problema ya balanceado con un método y devuelve su costo, tiempo y
+    asignaciones. Nunca lanza. Con `limite` (instante time.time() del plazo) el
+    solver se abandona en cuanto lo supera y devuelve status "cancelado": así los
+    métodos rezagados liberan su proceso del pool sin tener que matarlo.
+    Es una función de módulo para poder enviarse a un pool de procesos.
+    """
+    inicio = perf_counter()
+    try:
+        if limite is None:
+            solver = FABRICAS[nombre](costos_b, oferta_b, demanda_b, modo, "ninguno", tolerancia)
+            resultado = solver.resolver()
+        else:
+            # sin registro iterar() sigue avanzando paso a paso (un None por asignación)
+            solver = FABRICAS[nombre](costos_b, oferta_b, demanda_b, modo, "ninguno", tolerancia)
+            for k, _ in enumerate(solver.iterar(guardar=False), start=1):
+                if k % INTERVALO_PLAZO == 0 and time.time() > limite:
+                    return {"metodo": nombre, "status": "cancelado", "tiempo_s": perf_counter() - inicio}
+            resultado = solver.resultado()
+
+        item = {
+            "metodo": nombre,
+            "status": "ok",
+            "costo_total": costo_total(costos_b, resultado["asignaciones"]),
+            "tiempo_s": perf_counter() - inicio,
+            "num_pasos": resultado["num_pasos"],
+            "asignaciones": resultado["asignaciones"]
+        }
+        error = error_resultado(resultado)
+        if error:
+            item["error_solver"] = error
+        return item
+    except Exception:
+        tb = traceback.format_exc()
+        item = _error_item(f"Error interno al resolver {nombre}", 500, detalle=tb)
+        item["metodo"] = nombre
+        return item
+
+
+def marcar_mejor(resultados):
+    """Marca con "mejor": True el resultado terminado de menor costo (en empate, el primero); devuelve su nombre."""
+    terminados = [r for r in resultados if r["status"] == "ok" and "error_solver" not in r]
+    for r in resultados:
+        r["mejor"] = False
+    if not terminados:
+        return None
+    mejor = min(terminados, key=lambda r: r["costo_total"])
+    mejor["mejor"] = True
+    return mejor["metodo"]
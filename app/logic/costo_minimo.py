@@ -0,0 +1,43 @@
+# app/logic/costo_minimo.py
+
+import heapq
+from app.logic.nucleo import NucleoTransporte
+from app.logic.dispersa import celdas_por_fila
+
+
+class MetodoCostoMinimo(NucleoTransporte):
+    """
+    Método del costo mínimo: en cada paso se asigna en la celda viva más barata
+    (en empate, la de menor fila y luego menor columna).
+
+    Las celdas permitidas están en un montículo por (costo, fila, columna). Como
+    una fila o columna retirada nunca vuelve a estar viva, las celdas muertas no
+    se quitan al retirar la línea sino al llegar a la cima (borrado perezoso):
+    cada celda sale del montículo a lo sumo una vez, O(m·n·log(m·n)) en total
+    en el peor caso, y heapify evita ordenar la matriz completa de entrada.
+    """
+
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        super().__init__(costos, oferta, demanda, registro, tolerancia)
+        fila_viva = self.fila_viva
+        col_viva = self.col_viva
+        self._monticulo = [
+            (c, i, j)
+            for i, celdas in enumerate(celdas_por_fila(self.costos)) if fila_viva[i]
+            for j, c in celdas if col_viva[j]
+        ]
+        heapq.heapify(self._monticulo)
+
+    def _elegir_celda(self):
+        monticulo = self._monticulo
+        while monticulo:
+            _, i, j = monticulo[0]
+            if self.fila_viva[i] and self.col_viva[j]:
+                # no se extrae: tras asignar, su fila o su columna queda retirada
+                return i, j, ()
+            heapq.heappop(monticulo)
+        return None
+
+    def _explicar(self, fila, col, cantidad, extra):
+        return (f"Menor costo disponible = {self.costos[fila][col]} en la celda ({fila},{col}). "
+                f"Se asignan {cantidad} unidades.")
@@ -0,0 +1,228 @@
+# app/logic/dispersa.py
+
+from app.logic.numerico import TOLERANCIA_RELATIVA
+
+
+def _es_numero(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+class FilaDispersa(dict):
+    """Fila de costos: columna -> costo. Una ruta ausente (prohibida) se lee como None."""
+
+    def __missing__(self, j):
+        return None
+
+
+class FilaAsignaciones(dict):
+    """Fila de asignaciones: columna -> cantidad. Una celda sin asignar se lee como 0."""
+
+    def __missing__(self, j):
+        return 0
+
+
+class MatrizDispersa:
+    """
+    Matriz de costos con sólo las rutas permitidas.
+
+    costos[i][j] devuelve el costo o None (ruta prohibida) igual que la matriz
+    densa, así que los solvers leen celdas sueltas sin distinguir el formato; lo
+    que recorre todas las celdas permitidas (motor de penalizaciones, montículo
+    de costo mínimo, balanceo, factibilidad) usa celdas_por_fila /
+    celdas_por_columna y cuesta O(rutas) en lugar de O(m·n).
+    """
+
+    def __init__(self, filas, columnas):
+        self.num_filas = filas
+        self.num_columnas = columnas
+        self.filas = [FilaDispersa() for _ in range(filas)]
+
+    def __len__(self):
+        return self.num_filas
+
+    def __getitem__(self, i):
+        return self.filas[i]
+
+    def __iter__(self):
+        return iter(self.filas)
+
+    def num_rutas(self):
+        return sum(len(fila) for fila in self.filas)
+
+    def rutas(self):
+        """Rutas permitidas como (fila, columna, costo), por fila y columna crecientes."""
+        for i, fila in enumerate(self.filas):
+            for j in sorted(fila):
+                yield i, j, fila[j]
+
+    def copia(self):
+        otra = MatrizDispersa(self.num_filas, self.num_columnas)
+        otra.filas = [FilaDispersa(fila) for fila in self.filas]
+        return otra
+
+    def agregar_fila(self, costo=0):
+        """Fila nueva con todas las rutas permitidas (fila ficticia del balanceo)."""
+        self.filas.append(FilaDispersa((j, costo) for j in range(self.num_columnas)))
+        self.num_filas += 1
+
+    def agregar_columna(self, costo=0):
+        """Columna nueva con todas las rutas permitidas (columna ficticia del balanceo)."""
+        j = self.num_columnas
+        for fila in self.filas:
+            fila[j] = costo
+        self.num_columnas += 1
+
+    # --- entrada ---
+
+    @classmethod
+    def desde_json(cls, datos, filas, columnas):
+        """
+        Construye la matriz a partir de `costos_dispersos`: una lista de rutas
+        [fila, columna, costo] o un dict CSR {"indptr", "indices", "valores"}.
+        Lanza ValueError con un mensaje para el usuario si el formato es inválido.
+        """
+        if isinstance(datos, dict):
+            indptr = datos.get("indptr")
+            indices = datos.get("indices")
+            valores = datos.get("valores")
+            if not all(isinstance(x, list) for x in (indptr, indices, valores)):
+                raise ValueError("costos_dispersos en CSR debe tener las listas 'indptr', 'indices' y 'valores'.")
+            if len(indptr) != filas + 1 or len(indices) != len(valores):
+                raise ValueError("CSR inválido: 'indptr' debe tener len(oferta)+1 elementos "
+                                 "e 'indices' y 'valores' el mismo largo.")
+            if indptr[0] != 0 or indptr[-1] != len(indices) or any(
+                    not isinstance(a, int) or not isinstance(b, int) or a > b for a, b in zip(indptr, indptr[1:])):
+                raise ValueError("CSR inválido: 'indptr' debe ser creciente, empezar en 0 y terminar en len(indices).")
+            rutas = ((i, indices[k], valores[k]) for i in range(filas) for k in range(indptr[i], indptr[i + 1]))
+        elif isinstance(datos, list):
+            for ruta in datos:
+                if not isinstance(ruta, list) or len(ruta) != 3:
+                    raise ValueError("Cada ruta de costos_dispersos debe ser [fila, columna, costo].")
+            rutas = datos
+        else:
+            raise ValueError("costos_dispersos debe ser una lista de rutas [fila, columna, costo] o un dict CSR.")
+
+        matriz = cls(filas, columnas)
+        for i, j, c in rutas:
+            if not isinstance(i, int) or isinstance(i, bool) or not 0 <= i < filas:
+                raise ValueError(f"Fila fuera de rango en costos_dispersos: {i}.")
+            if not isinstance(j, int) or isinstance(j, bool) or not 0 <= j < columnas:
+                raise ValueError(f"Columna fuera de rango en costos_dispersos: {j}.")
+            if not _es_numero(c):
+                raise ValueError(f"Costo no numérico en la ruta ({i}, {j}).")
+            if j in matriz.filas[i]:
+                raise ValueError(f"Ruta repetida en costos_dispersos: ({i}, {j}).")
+            matriz.filas[i][j] = c
+        return matriz
+
+
+def es_dispersa(costos):
+    return isinstance(costos, MatrizDispersa)
+
+
+def celdas_por_fila(costos):
+    """Por fila, las rutas permitidas como lista de (columna, costo)."""
+    if es_dispersa(costos):
+        return [list(fila.items()) for fila in costos.filas]
+    return [[(j, c) for j, c in enumerate(fila) if c is not None] for fila in costos]
+
+
+def celdas_por_columna(costos, columnas):
+    """Por columna, las rutas permitidas como lista de (fila, costo)."""
+    por_columna = [[] for _ in range(columnas)]
+    filas = costos.filas if es_dispersa(costos) else costos
+    for i, fila in enumerate(filas):
+        celdas = fila.items() if es_dispersa(costos) else enumerate(fila)
+        for j, c in celdas:
+            if c is not None:
+                por_columna[j].append((i, c))
+    return por_columna
+
+
+def matriz_asignaciones(costos, filas, columnas):
+    """Matriz de asignaciones vacía: densa (listas) o, con costos dispersos, una FilaAsignaciones por fila."""
+    if es_dispersa(costos):
+        return [FilaAsignaciones() for _ in range(filas)]
+    return [[0 for _ in range(columnas)] for _ in range(filas)]
+
+
+def asignaciones_a_rutas(asignaciones):
+    """Asignaciones dispersas como lista [fila, columna, cantidad] (sólo cantidades positivas)."""
+    return [[i, j, fila[j]] for i, fila in enumerate(asignaciones) for j in sorted(fila) if fila[j]]
+
+
+def componentes(costos, filas, columnas):
+    """
+    Componentes conexas del grafo bipartito de rutas permitidas, como lista de
+    (filas, columnas). Con union-find: O(rutas) para matrices dispersas.
+    """
+    padre = list(range(filas + columnas))
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for i, celdas in enumerate(celdas_por_fila(costos)):
+        for j, _ in celdas:
+            a, b = raiz(i), raiz(filas + j)
+            if a != b:
+                padre[a] = b
+
+    grupos = {}
+    for x in range(filas + columnas):
+        grupos.setdefault(raiz(x), ([], []))[0 if x < filas else 1].append(x if x < filas else x - filas)
+    return list(grupos.values())
+
+
+def _resumen(indices, limite=5):
+    texto = ", ".join(str(k) for k in indices[:limite])
+    return texto + (", ..." if len(indices) > limite else "")
+
+
+def hay_prohibidas(costos):
+    """True con costos dispersos o si alguna celda de la matriz densa es None (ruta prohibida)."""
+    if es_dispersa(costos):
+        return True
+    return any(None in fila for fila in costos)
+
+
+def verificar_factibilidad(costos, oferta, demanda):
+    """
+    Comprueba, antes de resolver un problema balanceado, condiciones necesarias de
+    factibilidad con rutas prohibidas: toda fila con oferta y toda columna con
+    demanda tienen al menos una ruta, y en cada componente conexa de rutas la
+    oferta iguala a la demanda (el flujo no puede cruzar de un componente a otro).
+    Devuelve un mensaje de error o None. Cuesta O(rutas); no sustituye a un
+    flujo máximo, así que un caso raro que las cumple puede seguir siendo infactible
+    (el solver lo informa entonces como error_solver).
+    """
+    filas = len(oferta)
+    columnas = len(demanda)
+    por_fila = celdas_por_fila(costos)
+    for i in range(filas):
+        if oferta[i] > 0 and not por_fila[i]:
+            return f"Problema infactible: la fila {i} tiene oferta {oferta[i]} pero ninguna ruta permitida."
+    con_ruta = [False] * columnas
+    for celdas in por_fila:
+        for j, _ in celdas:
+            con_ruta[j] = True
+    for j in range(columnas):
+        if demanda[j] > 0 and not con_ruta[j]:
+            return f"Problema infactible: la columna {j} tiene demanda {demanda[j]} pero ninguna ruta permitida."
+
+    for filas_c, cols_c in componentes(costos, filas, columnas):
+        total_o = sum(oferta[i] for i in filas_c)
+        total_d = sum(demanda[j] for j in cols_c)
+        if abs(total_o - total_d) > TOLERANCIA_RELATIVA * max(1, abs(total_o), abs(total_d)):
+            return (f"Problema infactible: las filas [{_resumen(filas_c)}] y columnas [{_resumen(cols_c)}] "
+                    f"sólo se conectan entre sí; su oferta ({total_o}) no coincide con su demanda ({total_d}).")
+    return None
+
+
+def num_celdas(costos):
+    """Celdas que recorre un solver: las rutas permitidas (dispersa) o m·n (densa)."""
+    if es_dispersa(costos):
+        return costos.num_rutas()
+    return len(costos) * (len(costos[0]) if costos else 0)
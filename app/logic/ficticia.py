@@ -0,0 +1,74 @@
+# app/logic/ficticia.py
+
+from itertools import chain
+
+
+class FilaConFicticia:
+    """Fila de costos seguida de la columna ficticia, sin copiar la fila original."""
+
+    __slots__ = ("base", "costo")
+
+    def __init__(self, base, costo=0):
+        self.base = base
+        self.costo = costo
+
+    def __len__(self):
+        return len(self.base) + 1
+
+    def __getitem__(self, j):
+        n = len(self.base)
+        if j < 0:
+            j += n + 1
+        if j == n:
+            return self.costo
+        return self.base[j]
+
+    def __iter__(self):
+        return chain(self.base, (self.costo,))
+
+
+class MatrizConFicticia:
+    """
+    Matriz balanceada como vista sobre la matriz original: la fila o columna
+    ficticia (costo 0) no se materializa. Con columna ficticia cada fila es una
+    FilaConFicticia que lee la fila original; con fila ficticia las filas son
+    las originales más una sola fila de ceros. Indexar, iterar y len() se
+    comportan como en la lista de filas balanceada, así que los solvers y las
+    tablas HTML la usan sin distinguirla; el balanceo cuesta O(m) en lugar de
+    copiar m·n celdas.
+    """
+
+    def __init__(self, base, columnas, fila_ficticia=False, columna_ficticia=False, costo=0):
+        self.base = base
+        self.fila_ficticia = fila_ficticia
+        self.columna_ficticia = columna_ficticia
+        self.costo = costo
+        self.num_filas = len(base) + fila_ficticia
+        self.num_columnas = columnas + columna_ficticia
+        if columna_ficticia:
+            self.filas = [FilaConFicticia(fila, costo) for fila in base]
+        else:
+            self.filas = list(base)
+        if fila_ficticia:
+            self.filas.append([costo] * columnas)
+
+    def __len__(self):
+        return self.num_filas
+
+    def __getitem__(self, i):
+        return self.filas[i]
+
+    def __iter__(self):
+        return iter(self.filas)
+
+    def __array__(self, dtype=None, copy=None):
+        # np.array(matriz): se convierte la matriz original y se agrega la línea ficticia
+        import numpy as np
+        filas = len(self.base)
+        columnas = self.num_columnas - self.columna_ficticia
+        C = np.array(self.base, dtype=dtype).reshape(filas, columnas)
+        return np.pad(C, ((0, int(self.fila_ficticia)), (0, int(self.columna_ficticia))), constant_values=self.costo)
+
+
+def es_ficticia(costos):
+    return isinstance(costos, MatrizConFicticia)
@@ -0,0 +1,121 @@
+# app/logic/lote.py
+
+from app.logic.vectorizado import crear_vogel, crear_noroeste, MODOS
+from app.logic.costo_minimo import MetodoCostoMinimo
+from app.logic.russell import MetodoRussell
+from app.logic.modi import optimizar_solucion, costo_total
+from app.logic.bitacora import FORMATOS_PASOS, registro_para, error_resultado
+from app.logic.bloques import resolver_por_bloques
+from app.models.input_schema import validar_problema, ErrorEntrada
+from app.utils.balanceador import balancear
+from app.utils.errores import registrar_error
+import uuid
+import traceback
+
+
+def _solo_python(clase):
+    # fábrica con la firma de crear_vogel para métodos sin variante NumPy (modo se ignora)
+    def crear(costos, oferta, demanda, modo="auto", registro="expandido", tolerancia=None):
+        return clase(costos, oferta, demanda, registro, tolerancia)
+    return crear
+
+
+# métodos disponibles en el lote y su fábrica
+FABRICAS = {
+    "vogel": crear_vogel,
+    "noroeste": crear_noroeste,
+    "costo_minimo": _solo_python(MetodoCostoMinimo),
+    "russell": _solo_python(MetodoRussell),
+}
+
+# el lote no genera tablas HTML: como mucho devuelve el registro de pasos
+NIVELES_LOTE = ("ninguno", "resumen", "pasos")
+
+
+def _error_item(message, status=400, detalle=None):
+    # mismo formato que _error_response de los controladores, pero como dict por problema
+    error_id = str(uuid.uuid4())[:8]
+    payload = {"status": "error", "http_status": status, "error": message, "code": error_id}
+    if detalle is not None:
+        payload["detalle"] = str(detalle)
+        registrar_error(error_id, detalle)
+    return payload
+
+
+def _validar(problema):
+    """Mensaje de error de validación de las opciones del problema, o None si son válidas."""
+    if not isinstance(problema, dict):
+        return "Cada problema debe ser un objeto JSON."
+    metodo = problema.get("metodo", "vogel")
+    if metodo not in FABRICAS:
+        return f"metodo debe ser uno de {list(FABRICAS)}."
+    if problema.get("modo", "auto") not in MODOS:
+        return f"modo debe ser uno de {list(MODOS)}."
+    if problema.get("formato_pasos", "expandido") not in FORMATOS_PASOS:
+        return f"formato_pasos debe ser uno de {list(FORMATOS_PASOS)}."
+    if problema.get("detalle", "resumen") not in NIVELES_LOTE:
+        return f"detalle debe ser uno de {list(NIVELES_LOTE)}."
+    return None
+
+
+def resolver_problema(problema, mapa=map):
+    """
+    Resuelve un problema del lote (balanceo + método + MODI opcional). Nunca lanza:
+    los errores se devuelven como dict con el mismo formato que las respuestas de error.
+    Es una función de módulo para poder enviarse a un pool de procesos.
+
+    Con "descomponer": true cada componente conexo de rutas permitidas se resuelve
+    por separado (ver app/logic/bloques.py), repartidos con `mapa` (p. ej. el map
+    de un pool de procesos).
+    """
+    mensaje = _validar(problema)
+    if mensaje is not None:
+        return _error_item(mensaje, 400)
+    try:
+        # los datos normalizados (Fraction con numerico == "fraccion")
+        costos, oferta, demanda = validar_problema(problema, dispersos=False)
+    except ErrorEntrada as e:
+        return _error_item(str(e), 400)
+
+    metodo = problema.get("metodo", "vogel")
+    try:
+        detalle = problema.get("detalle", "resumen")
+        formato_pasos = problema.get("formato_pasos", "expandido")
+        tolerancia = problema.get("tolerancia")
+        registro = registro_para(detalle, formato_pasos)
+        if problema.get("descomponer"):
+            costos_b, oferta_b, demanda_b, meta, resultado = resolver_por_bloques(
+                costos, oferta, demanda, metodo, problema.get("modo", "auto"), registro, tolerancia, mapa)
+        else:
+            costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda, tolerancia)
+            solver = FABRICAS[metodo](costos_b, oferta_b, demanda_b, problema.get("modo", "auto"), registro, tolerancia)
+            resultado = solver.resolver()
+
+        item = {
+            "status": "ok",
+            "metodo": metodo,
+            "asignaciones": resultado["asignaciones"],
+            "meta_balance": meta
+        }
+        if detalle != "ninguno":
+            item["num_pasos"] = resultado["num_pasos"]
+        if detalle == "pasos":
+            if formato_pasos == "compacto":
+                item["bitacora"] = resultado["bitacora"].a_dict()
+            else:
+                item["pasos"] = resultado["pasos"]
+        elif resultado.get("error"):
+            item["error_solver"] = resultado["error"]
+        if "componentes" in resultado:
+            item["componentes"] = resultado["componentes"]
+
+        if problema.get("optimizar"):
+            item["asignaciones"], item["optimizacion"], item["costo_total"] = optimizar_solucion(
+                costos_b, resultado["asignaciones"], error_resultado(resultado))
+            del item["optimizacion"]["pasos"]
+        else:
+            item["costo_total"] = costo_total(costos_b, item["asignaciones"])
+        return item
+    except Exception:
+        tb = traceback.format_exc()
+        return _error_item(f"Error interno al resolver {metodo.capitalize()}", 500, detalle=tb)
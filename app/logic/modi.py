@@ -0,0 +1,287 @@
+# app/logic/modi.py
+
+from collections import deque
+from app.logic.dispersa import es_dispersa
+
+try:
+    import numpy as np
+except ImportError:  # sin NumPy el pricing se hace con bucles Python
+    np = None
+
+
+def costo_total(costos, asignaciones):
+    """
+    Suma costo * cantidad de las celdas con asignación. Con una MatrizDispersa,
+    `asignaciones` es la lista [fila, columna, cantidad]. Flujo en una ruta
+    prohibida (costo None) no tiene costo definido: ValueError.
+    """
+    total = 0
+    if es_dispersa(costos):
+        celdas = ((i, j, a) for i, j, a in asignaciones if a)
+    else:
+        celdas = ((i, j, a) for i, fila_a in enumerate(asignaciones) for j, a in enumerate(fila_a) if a)
+    for i, j, a in celdas:
+        c = costos[i][j]
+        if c is None:
+            raise ValueError(f"Hay flujo ({a}) en la ruta prohibida ({i}, {j}).")
+        total += c * a
+    return total
+
+
+class MetodoModi:
+    """
+    Método de distribución modificada (potenciales u-v + ciclos stepping-stone).
+
+    Parte de una solución básica factible (la que devuelven Vogel o Noroeste) y
+    pivota hasta que ningún costo reducido c_ij - u_i - v_j es negativo.
+
+    La base se guarda como árbol generador sobre el grafo bipartito
+    filas/columnas (nodos 0..m-1 filas, m..m+n-1 columnas). Con el árbol
+    enraizado (padre + profundidad) los potenciales salen de un recorrido y el
+    ciclo de cada celda entrante es el camino entre sus dos nodos en el árbol.
+    Si la solución inicial es degenerada se completan m+n-1 celdas básicas con
+    celdas épsilon (asignación 0) que unen componentes sin formar ciclos.
+    Las rutas prohibidas (None) se tratan con costo M grande.
+    """
+
+    def __init__(self, costos, asignaciones, tolerancia=1e-9, max_iter=None):
+        self.costos = costos
+        self.filas = len(asignaciones)
+        self.columnas = len(asignaciones[0]) if asignaciones else 0
+        self.asignaciones = [fila[:] for fila in asignaciones]
+        self.tolerancia = tolerancia
+        self.max_iter = max_iter if max_iter is not None else max(1000, 10 * self.filas * self.columnas)
+
+        permitidos = [abs(c) for fila in costos for c in fila if c is not None]
+        max_c = max(permitidos, default=0)
+        # costo M para rutas prohibidas: mayor que cualquier ahorro posible por un ciclo
+        self.M = (max_c + 1) * 2 * (self.filas + self.columnas + 1)
+
+        self.pasos = []
+        self.celdas_epsilon = []
+        self.base = set()
+        self.vecinos = [set() for _ in range(self.filas + self.columnas)]
+
+    def _c(self, i, j):
+        c = self.costos[i][j]
+        return self.M if c is None else c
+
+    # --- árbol de la base ---
+
+    def _agregar_basica(self, i, j):
+        self.base.add((i, j))
+        self.vecinos[i].add(self.filas + j)
+        self.vecinos[self.filas + j].add(i)
+
+    def _quitar_basica(self, i, j):
+        self.base.discard((i, j))
+        self.vecinos[i].discard(self.filas + j)
+        self.vecinos[self.filas + j].discard(i)
+
+    def _construir_base(self):
+        padre = list(range(self.filas + self.columnas))
+
+        def raiz(x):
+            while padre[x] != x:
+                padre[x] = padre[padre[x]]
+                x = padre[x]
+            return x
+
+        def unir(i, j):
+            a, b = raiz(i), raiz(self.filas + j)
+            if a == b:
+                return False
+            padre[a] = b
+            return True
+
+        for i in range(self.filas):
+            for j in range(self.columnas):
+                if self.asignaciones[i][j]:
+                    if not unir(i, j):
+                        raise ValueError("La solución inicial no es básica (las celdas asignadas forman un ciclo).")
+                    self._agregar_basica(i, j)
+
+        objetivo = self.filas + self.columnas - 1
+        if len(self.base) < objetivo:
+            # degeneración: completar con celdas épsilon, primero las más baratas
+            candidatas = sorted(
+                ((self._c(i, j), i, j) for i in range(self.filas) for j in range(self.columnas)
+                 if (i, j) not in self.base),
+                key=lambda t: (t[0], t[1], t[2])
+            )
+            for _, i, j in candidatas:
+                if len(self.base) == objetivo:
+                    break
+                if unir(i, j):
+                    self._agregar_basica(i, j)
+                    self.celdas_epsilon.append((i, j))
+
+    def _arbol(self):
+        """Enraiza el árbol en la fila 0: devuelve (padre, profundidad, u, v)."""
+        total = self.filas + self.columnas
+        padre = [-1] * total
+        prof = [0] * total
+        pot = [0] * total
+        visto = [False] * total
+        visto[0] = True
+        cola = deque([0])
+        while cola:
+            x = cola.popleft()
+            for y in self.vecinos[x]:
+                if visto[y]:
+                    continue
+                visto[y] = True
+                padre[y] = x
+                prof[y] = prof[x] + 1
+                i, j = (x, y - self.filas) if x < self.filas else (y, x - self.filas)
+                # u_i + v_j = c_ij
+                pot[y] = self._c(i, j) - pot[x]
+                cola.append(y)
+        return padre, prof, pot[:self.filas], pot[self.filas:]
+
+    # --- pricing ---
+
+    def _celda_entrante(self, u, v):
+        """Celda no básica con costo reducido más negativo, o None si la base es óptima."""
+        if self._C is not None:
+            red = self._C - np.array(u, dtype=np.float64)[:, None] - np.array(v, dtype=np.float64)[None, :]
+            for (i, j) in self.base:
+                red[i, j] = 0
+            k = int(np.argmin(red))
+            i, j = divmod(k, self.columnas)
+            d = red[i, j]
+            return ((i, j), float(d)) if d < -self.tolerancia else (None, 0)
+
+        mejor, mejor_d = None, -self.tolerancia
+        for i in range(self.filas):
+            ui = u[i]
+            for j in range(self.columnas):
+                if (i, j) in self.base:
+                    continue
+                d = self._c(i, j) - ui - v[j]
+                if d < mejor_d:
+                    mejor, mejor_d = (i, j), d
+        return mejor, mejor_d
+
+    def _ciclo(self, padre, prof, p, q):
+        """Camino en el árbol desde la columna q hasta la fila p, como lista de celdas (i, j)."""
+        a, b = self.filas + q, p
+        lado_a, lado_b = [a], [b]
+        while prof[a] > prof[b]:
+            a = padre[a]
+            lado_a.append(a)
+        while prof[b] > prof[a]:
+            b = padre[b]
+            lado_b.append(b)
+        while a != b:
+            a = padre[a]
+            b = padre[b]
+            lado_a.append(a)
+            lado_b.append(b)
+        nodos = lado_a + lado_b[-2::-1]
+        celdas = []
+        for x, y in zip(nodos, nodos[1:]):
+            celdas.append((x, y - self.filas) if x < self.filas else (y, x - self.filas))
+        return celdas
+
+    def _costo(self):
+        """(costo total, hay flujo en rutas prohibidas); con flujo en una ruta prohibida el costo es None."""
+        infactible = any(
+            self.asignaciones[i][j] and self.costos[i][j] is None
+            for i in range(self.filas) for j in range(self.columnas)
+        )
+        return (None if infactible else costo_total(self.costos, self.asignaciones)), infactible
+
+    def resolver(self):
+        costo_inicial, _ = self._costo()
+        self._construir_base()
+
+        self._C = None
+        numericos = all(isinstance(c, (int, float)) for fila in self.costos for c in fila if c is not None)
+        if np is not None and numericos and self.filas and self.columnas:
+            C = np.array(self.costos, dtype=np.float64)
+            C[np.isnan(C)] = self.M
+            self._C = C
+
+        iteraciones = 0
+        while self.filas and self.columnas and iteraciones < self.max_iter:
+            padre, prof, u, v = self._arbol()
+            entrante, reducido = self._celda_entrante(u, v)
+            if entrante is None:
+                break
+            p, q = entrante
+            camino = self._ciclo(padre, prof, p, q)
+
+            # signos alternos: la entrante es +, la primera del camino -, ...
+            menos = camino[0::2]
+            mas = camino[1::2]
+            saliente = min(menos, key=lambda c: self.asignaciones[c[0]][c[1]])
+            theta = self.asignaciones[saliente[0]][saliente[1]]
+
+            self.asignaciones[p][q] += theta
+            for i, j in mas:
+                self.asignaciones[i][j] += theta
+            for i, j in menos:
+                self.asignaciones[i][j] -= theta
+
+            self._quitar_basica(*saliente)
+            self._agregar_basica(p, q)
+            iteraciones += 1
+            self.pasos.append({
+                "iteracion": iteraciones,
+                "celda_entrante": (p, q),
+                "celda_saliente": saliente,
+                "costo_reducido": reducido,
+                "theta": theta,
+                "largo_ciclo": len(camino) + 1
+            })
+
+        # flujo que ni con costo M sale de las rutas prohibidas: las permitidas no bastan
+        costo_final, infactible = self._costo()
+        resultado = {
+            "asignaciones": self.asignaciones,
+            "costo_inicial": costo_inicial,
+            "costo_final": costo_final,
+            "iteraciones": iteraciones,
+            "optimo": iteraciones < self.max_iter and not infactible,
+            "celdas_epsilon": self.celdas_epsilon,
+            "pasos": self.pasos
+        }
+        if infactible:
+            resultado["motivo"] = "Queda flujo en rutas prohibidas: las rutas permitidas no bastan."
+        elif iteraciones >= self.max_iter:
+            resultado["motivo"] = f"Se alcanzó el máximo de {self.max_iter} iteraciones."
+        return resultado
+
+
+def optimizar_solucion(costos, asignaciones, error=None):
+    """
+    Fase MODI opcional sobre la solución inicial de un método. Devuelve
+    (asignaciones, optimizacion, costo): el dict "optimizacion" de las respuestas
+    (con los "pasos" de MODI) y el costo total final, None si quedó flujo en rutas
+    prohibidas. Si el método se detuvo con `error` la solución inicial está
+    incompleta (oferta o demanda sin asignar) y MODI no aplica: se devuelve tal
+    cual, con optimo false y el motivo.
+    """
+    if error:
+        optimizacion = {
+            "iteraciones": 0,
+            "optimo": False,
+            "motivo": f"La solución inicial está incompleta, no se optimiza: {error}",
+            "pasos": []
+        }
+        return asignaciones, optimizacion, costo_total(costos, asignaciones)
+
+    opt = MetodoModi(costos, asignaciones).resolver()
+    optimizacion = {
+        "costo_inicial": opt["costo_inicial"],
+        "costo_final": opt["costo_final"],
+        "iteraciones": opt["iteraciones"],
+        "optimo": opt["optimo"],
+        "celdas_epsilon": opt["celdas_epsilon"],
+        "asignaciones_iniciales": asignaciones,
+        "pasos": opt["pasos"]
+    }
+    if "motivo" in opt:
+        optimizacion["motivo"] = opt["motivo"]
+    return opt["asignaciones"], optimizacion, opt["costo_final"]
@@ -1,88 +1,98 @@
 # app/logic/noroeste.py
 
-class MetodoNoroeste:
-    def __init__(self, costos, oferta, demanda):
-        self.costos = [fila[:] for fila in costos]
-        self.oferta = oferta[:]
-        self.demanda = demanda[:]
-        self.filas = len(oferta)
-        self.columnas = len(demanda)
-
-        self.asignaciones = [
-            [0 for _ in range(self.columnas)]
-            for _ in range(self.filas)
-        ]
-
-        self.pasos = []  # Registro de todos los pasos
-
-    def resolver(self):
-        i = 0
-        j = 0
+from app.logic.nucleo import NucleoTransporte
+
+class MetodoNoroeste(NucleoTransporte):
+    # la inicialización, resolver() y resultado() vienen de NucleoTransporte (y el
+    # bucle sin registro o compacto); aquí la elección de la esquina noroeste y el
+    # registro expandido, que guarda el estado después de cada paso
+
+    def _celda_permitida(self, i, j):
+        """
+        Celda viva con ruta permitida más al noroeste: la primera columna viva
+        permitida (desde j) de la primera fila viva (desde i) que tenga alguna.
+        Las filas anteriores a i y las columnas anteriores a j ya están agotadas.
+        Devuelve (fila, columna) o None si no queda ruta permitida con saldo.
+        """
+        for r in range(i, self.filas):
+            if not self.fila_viva[r]:
+                continue
+            fila = self.costos[r]
+            columnas = sorted(c for c in fila if c >= j) if self.disperso else range(j, self.columnas)
+            for c in columnas:
+                if self.col_viva[c] and fila[c] is not None:
+                    return r, c
+        return None
+
+    def _elegir_celda(self):
+        """
+        Esquina noroeste de lo que queda: primera fila y primera columna vivas (el
+        recorrido sólo avanza hacia el sureste) o, si esa ruta está prohibida, la
+        celda permitida más al noroeste. (fila, columna, ()) o None.
+        """
+        while not self.fila_viva[self._fila]:
+            self._fila += 1
+        while not self.col_viva[self._col]:
+            self._col += 1
+        i, j = self._fila, self._col
+        if self.costos[i][j] is not None:
+            return i, j, ()
+        celda = self._celda_permitida(i, j)
+        if celda is None:
+            return None
+        return celda[0], celda[1], ()
+
+    def iterar(self, guardar=True):
+        """
+        Generador con el bucle de resolución: produce cada registro de paso en cuanto
+        se genera (tupla de la bitácora si registro == "compacto"; None por asignación
+        si "ninguno").
+        Con guardar=False los pasos no se acumulan en self.pasos (streaming).
+        """
+        # esquina de partida del recorrido (ver _elegir_celda)
+        self._fila = 0
+        self._col = 0
+        if self.registro != "expandido":
+            # la bitácora compacta no lleva campos propios: basta el bucle genérico
+            yield from super().iterar(guardar)
+            return
 
         # contador de seguridad para evitar loops infinitos
         iteraciones = 0
-        max_iter = (self.filas + self.columnas) * 100
+        max_iter = max(1000, (self.filas * self.columnas) * 50)
 
-        while i < self.filas and j < self.columnas:
-            # seguridad: evitar bucle si algo quedó en 0 y no avanzamos
+        while self.filas_vivas and self.cols_vivas:
+            eleccion = None
             if iteraciones > max_iter:
-                # registrar paso de error/escape y romper
-                self.pasos.append({
-                    "error": "Límite de iteraciones alcanzado - posible estado inconsistente",
-                    "oferta_restante": self.oferta[:],
-                    "demanda_restante": self.demanda[:]
-                })
+                mensaje = "Límite de iteraciones alcanzado - posible estado inconsistente"
+            else:
+                eleccion = self._elegir_celda()
+                mensaje = "No se encontró celda válida para asignar"
+            if eleccion is None:
+                error = self._registrar_error(mensaje, guardar)
+                yield error
                 break
 
-            # saltar filas/columnas agotadas para avanzar correctamente
-            if self.oferta[i] == 0:
-                i += 1
-                iteraciones += 1
-                continue
-            if self.demanda[j] == 0:
-                j += 1
-                iteraciones += 1
-                continue
-
-            asignar = min(self.oferta[i], self.demanda[j])
-
-            # en caso anómalo de asignación 0, avanzar para evitar estancamiento
-            if asignar <= 0:
-                if self.oferta[i] == 0:
-                    i += 1
-                if self.demanda[j] == 0:
-                    j += 1
-                iteraciones += 1
-                continue
-
-            self.asignaciones[i][j] = asignar
+            fila, col, _ = eleccion
+            asignar = min(self.oferta[fila], self.demanda[col])
 
             # Registrar paso (guardar estado después de la asignación para claridad)
-            self.pasos.append({
-                "celda": (i, j),
-                "costo": self.costos[i][j],
+            paso_reg = {
+                "celda": (fila, col),
+                "costo": self.costos[fila][col],
                 "asignacion": asignar,
                 "oferta_restante": None,  # se rellenará tras la actualización
                 "demanda_restante": None
-            })
-
-            # Actualizar oferta y demanda
-            self.oferta[i] -= asignar
-            self.demanda[j] -= asignar
+            }
 
-            # actualizar los últimos pasos registrados con el estado real
-            self.pasos[-1]["oferta_restante"] = self.oferta[:]
-            self.pasos[-1]["demanda_restante"] = self.demanda[:]
+            # Actualizar asignaciones, oferta y demanda
+            self._aplicar(fila, col, asignar)
 
-            # Avanzar fila o columna
-            if self.oferta[i] == 0:
-                i += 1
-            if self.demanda[j] == 0:
-                j += 1
+            # actualizar el paso registrado con el estado real
+            paso_reg["oferta_restante"] = self.oferta[:]
+            paso_reg["demanda_restante"] = self.demanda[:]
+            if guardar:
+                self.pasos.append(paso_reg)
 
             iteraciones += 1
-
-        return {
-            "asignaciones": self.asignaciones,
-            "pasos": self.pasos
-        }
+            yield paso_reg
@@ -0,0 +1,205 @@
+# app/logic/nucleo.py
+
+from app.logic.bitacora import BitacoraCompacta, linea_retirada
+from app.logic.dispersa import es_dispersa, matriz_asignaciones, asignaciones_a_rutas
+from app.logic.numerico import tolerancia_absoluta
+from abc import ABC, abstractmethod
+
+
+class NucleoTransporte(ABC):
+    """
+    Contabilidad común de los métodos de solución inicial: copia de oferta y
+    demanda, filas/columnas vivas, registro de asignaciones y registro de pasos
+    ("expandido", "compacto" o "ninguno").
+
+    Las subclases sólo deciden qué celda se asigna en cada paso: implementan
+    _elegir_celda() (y, si mantienen estructuras propias, extienden
+    _retirar_lineas) y heredan el bucle de iterar(). Vogel y Noroeste tienen su
+    propio bucle para el registro expandido (y Vogel para el compacto) porque su
+    formato es histórico; sin registro usan también el bucle genérico.
+    """
+
+    # campos adicionales por paso en la bitácora compacta (y en el paso expandido)
+    CAMPOS_EXTRA = ()
+
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        # los costos son de sólo lectura para los solvers y llegan ya validados y
+        # balanceados: no se copian. Con MatrizDispersa las asignaciones son un dict
+        # por fila, así que nada ocupa ni recorre m·n celdas
+        self.disperso = es_dispersa(costos)
+        self.costos = costos
+        self.oferta = oferta[:]
+        self.demanda = demanda[:]
+        self.filas = len(oferta)
+        self.columnas = len(demanda)
+
+        self.asignaciones = matriz_asignaciones(costos, self.filas, self.columnas)
+
+        # resto de oferta/demanda que cuenta como agotado: 0 con int o Fraction; con
+        # float, `tolerancia` (relativa, ver app/logic/numerico.py) por la mayor cantidad
+        self.tolerancia = tolerancia_absoluta(self.oferta + self.demanda, tolerancia)
+
+        # líneas con oferta/demanda pendiente; una línea retirada no vuelve a estar viva
+        self.fila_viva = [o > self.tolerancia for o in self.oferta]
+        self.col_viva = [d > self.tolerancia for d in self.demanda]
+        self.filas_vivas = sum(self.fila_viva)
+        self.cols_vivas = sum(self.col_viva)
+
+        self.pasos = []
+        # "expandido": pasos con estado completo; "compacto": BitacoraCompacta (sólo diferencias);
+        # "ninguno": sólo asignaciones (sin registro por paso)
+        self.registro = registro
+        self.bitacora = None
+        self.num_pasos = 0
+        self.error = None
+
+    def resolver(self):
+        for _ in self.iterar():
+            pass
+        return self.resultado()
+
+    def resultado(self):
+        resultado = {
+            # con costos dispersos, lista de [fila, columna, cantidad]
+            "asignaciones": asignaciones_a_rutas(self.asignaciones) if self.disperso else self.asignaciones,
+            "pasos": self.pasos,
+            "num_pasos": self.num_pasos
+        }
+        if self.bitacora is not None:
+            resultado["bitacora"] = self.bitacora
+        if self.error is not None:
+            resultado["error"] = self.error
+        return resultado
+
+    def reproducir(self, pasos):
+        """
+        Aplica sin registrarlas asignaciones ya decididas, en orden: tuplas que
+        empiezan por (fila, columna, cantidad), como los pasos de una
+        BitacoraCompacta. iterar() sigue después desde ese estado.
+        """
+        for fila, col, cantidad in (paso[:3] for paso in pasos):
+            self._aplicar(fila, col, cantidad)
+
+    # --- contabilidad ---
+
+    def _aplicar(self, fila, col, cantidad):
+        """
+        Asigna `cantidad` en (fila, col), descuenta oferta y demanda y retira las
+        líneas agotadas. Devuelve la línea retirada ("fila", "columna", "ambas" o None).
+        Un resto dentro de la tolerancia es un residuo de redondeo: se deja en 0.
+        """
+        self.asignaciones[fila][col] = cantidad
+        self.oferta[fila] -= cantidad
+        self.demanda[col] -= cantidad
+        fila_agotada = self.oferta[fila] <= self.tolerancia
+        col_agotada = self.demanda[col] <= self.tolerancia
+        if fila_agotada:
+            self.oferta[fila] -= self.oferta[fila]  # 0 del mismo tipo (0.0 con float)
+        if col_agotada:
+            self.demanda[col] -= self.demanda[col]
+        if fila_agotada or col_agotada:
+            self._retirar_lineas(fila if fila_agotada else None, col if col_agotada else None)
+        self.num_pasos += 1
+        return linea_retirada(fila_agotada, col_agotada)
+
+    def _retirar_lineas(self, fila=None, col=None):
+        """Marca como retiradas la fila y/o columna dadas (None = no se retira)."""
+        if fila is not None and self.fila_viva[fila]:
+            self.fila_viva[fila] = False
+            self.filas_vivas -= 1
+        if col is not None and self.col_viva[col]:
+            self.col_viva[col] = False
+            self.cols_vivas -= 1
+
+    # --- bucle genérico ---
+
+    @abstractmethod
+    def _elegir_celda(self):
+        """(fila, columna, extra) de la próxima asignación, o None si no queda celda válida."""
+
+    def _registrar_error(self, mensaje, guardar=True, **campos):
+        """
+        Guarda el error que corta el bucle donde corresponde al registro (bitácora,
+        self.error o lista de pasos). Devuelve el paso de error a producir con
+        registro "expandido" y None en otro caso.
+        """
+        error = {"error": mensaje, **campos, "oferta_restante": self.oferta[:], "demanda_restante": self.demanda[:]}
+        if self.registro == "compacto":
+            self.bitacora.error = error
+        elif self.registro == "ninguno":
+            self.error = mensaje
+        else:
+            if guardar:
+                self.pasos.append(error)
+            return error
+        return None
+
+    def _explicar(self, fila, col, cantidad, extra):
+        return f"Se elige la celda ({fila},{col}). Se asignan {cantidad} unidades."
+
+    def iterar(self, guardar=True):
+        """
+        Generador con el bucle de resolución: produce cada registro de paso en cuanto
+        se genera (dict expandido, tupla de la bitácora si registro == "compacto";
+        None por asignación si "ninguno", para poder informar progreso y cancelar).
+        Con guardar=False los pasos no se acumulan en self.pasos.
+        El paso expandido tiene las mismas claves que BitacoraCompacta.paso_expandido.
+        """
+        compacto = self.registro == "compacto"
+        sin_registro = self.registro == "ninguno"
+        if compacto:
+            self.bitacora = BitacoraCompacta(self.oferta, self.demanda, extra=self.CAMPOS_EXTRA)
+
+        # contador de seguridad: cada paso retira al menos una línea, así que sólo una
+        # subclase que elija celdas ya retiradas puede llegar al límite
+        iteraciones = 0
+        max_iter = max(1000, (self.filas * self.columnas) * 50)
+
+        while self.filas_vivas and self.cols_vivas:
+            if iteraciones > max_iter:
+                eleccion = None
+                mensaje = "Límite de iteraciones alcanzado - posible estado inconsistente"
+            else:
+                eleccion = self._elegir_celda()
+                mensaje = "No se encontró celda válida para asignar"
+            if eleccion is None:
+                error = self._registrar_error(mensaje, guardar)
+                if error is not None:
+                    yield error
+                break
+
+            iteraciones += 1
+            fila, col, extra = eleccion
+            cantidad = min(self.oferta[fila], self.demanda[col])
+
+            if sin_registro:
+                self._aplicar(fila, col, cantidad)
+                yield None
+                continue
+
+            if compacto:
+                retira = self._aplicar(fila, col, cantidad)
+                self.bitacora.registrar(fila, col, cantidad, retira, *extra)
+                yield self.bitacora.pasos[-1]
+                continue
+
+            oferta_antes = self.oferta[:]
+            demanda_antes = self.demanda[:]
+            explicacion = self._explicar(fila, col, cantidad, extra)
+            retira = self._aplicar(fila, col, cantidad)
+            paso_reg = {
+                "paso_num": self.num_pasos,
+                "celda_elegida": (fila, col),
+                "costo_celda": self.costos[fila][col],
+                "asignacion_realizada": cantidad,
+                "retira": retira,
+                "oferta_restante": oferta_antes,    # estado ANTES
+                "demanda_restante": demanda_antes,  # estado ANTES
+                "oferta_posterior": self.oferta[:],
+                "demanda_posterior": self.demanda[:],
+                "explicacion": explicacion
+            }
+            paso_reg.update(zip(self.CAMPOS_EXTRA, extra))
+            if guardar:
+                self.pasos.append(paso_reg)
+            yield paso_reg
@@ -0,0 +1,61 @@
+# app/logic/numerico.py
+#
+# Comparaciones de cantidades según su tipo. Con int y Fraction la aritmética es
+# exacta: una fila o columna se agota cuando su resto es exactamente 0. Con float
+# las restas sucesivas dejan residuos (0.3 - 0.1 - 0.2 != 0), así que los restos,
+# las sumas del balanceo y los empates de penalización se comparan con una
+# tolerancia absoluta proporcional a la escala de los datos.
+
+from fractions import Fraction
+
+# "auto": los números tal cual llegan (int exactos, float con tolerancia);
+# "fraccion": todo se convierte a Fraction y los resultados son exactos
+MODOS_NUMERICOS = ("auto", "fraccion")
+
+# tolerancia relativa por defecto (se multiplica por el mayor valor absoluto)
+TOLERANCIA_RELATIVA = 1e-9
+
+
+def tolerancia_absoluta(valores, relativa=None):
+    """
+    Tolerancia para comparar valores del orden de `valores`: 0 si ninguno es float
+    (aritmética exacta); si no, `relativa` (TOLERANCIA_RELATIVA por defecto) por el
+    mayor valor absoluto.
+    """
+    valores = valores if isinstance(valores, list) else list(valores)
+    if float not in set(map(type, valores)):
+        return 0
+    if relativa is None:
+        relativa = TOLERANCIA_RELATIVA
+    return relativa * max(map(abs, valores), default=0)
+
+
+def a_fraccion(v):
+    """Fraction del número tal como se escribió (0.1 -> 1/10, no el binario del float); None e int no cambian."""
+    if type(v) is float:
+        return Fraction(repr(v))
+    return v
+
+
+def convertir_fraccion(costos, oferta, demanda):
+    """
+    (costos, oferta, demanda) con los float convertidos a Fraction. La matriz densa
+    se copia; una MatrizDispersa (recién construida desde la entrada) se convierte en sitio.
+    """
+    if isinstance(costos, list):
+        costos = [list(map(a_fraccion, fila)) for fila in costos]
+    else:
+        for fila in costos.filas:
+            for j, c in fila.items():
+                fila[j] = a_fraccion(c)
+    return costos, list(map(a_fraccion, oferta)), list(map(a_fraccion, demanda))
+
+
+def valor_json(o):
+    """
+    Función `default` de json.dumps para Fraction: entero si lo es y, si no, el
+    texto exacto "p/q" (un float perdería la exactitud que se pidió).
+    """
+    if isinstance(o, Fraction):
+        return o.numerator if o.denominator == 1 else str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
@@ -0,0 +1,149 @@
+# app/logic/penalizaciones.py
+
+from app.logic.dispersa import celdas_por_fila, celdas_por_columna
+from app.logic.numerico import tolerancia_absoluta
+
+class MotorPenalizaciones:
+    """
+    Mantiene de forma incremental las penalizaciones de Vogel por fila y columna.
+
+    Cada fila/columna guarda sus celdas ordenadas por (costo, índice) y dos
+    punteros a las dos celdas vivas más baratas. Como una fila o columna retirada
+    nunca vuelve a estar disponible, los punteros sólo avanzan: el costo total de
+    mantenerlos durante toda la resolución es O(m·n), en lugar de recalcular y
+    ordenar todo en cada iteración.
+    """
+
+    def __init__(self, costos, oferta, demanda, tolerancia=0, relativa=None):
+        # tolerancia: resto de oferta/demanda que cuenta como agotado (el del solver);
+        # relativa: la de los costos, para comparar penalizaciones (ver tolerancia_costos)
+        self.filas = len(oferta)
+        self.columnas = len(demanda)
+        self.fila_viva = [o > tolerancia for o in oferta]
+        self.col_viva = [d > tolerancia for d in demanda]
+
+        # celdas permitidas (costo no None) ordenadas por (costo, índice); con
+        # costos dispersos sólo se recorren las rutas existentes
+        self._orden_filas = [sorted((c, j) for j, c in celdas) for celdas in celdas_por_fila(costos)]
+        self._orden_cols = [sorted((c, i) for i, c in celdas) for celdas in celdas_por_columna(costos, self.columnas)]
+
+        # diferencia bajo la cual dos penalizaciones o costos se consideran empatados
+        # (0 con costos exactos; con float evita que un residuo decida el desempate)
+        self.tolerancia_costos = tolerancia_absoluta([c for orden in self._orden_filas for c, _ in orden], relativa)
+
+        # punteros a la primera y segunda celda viva de cada línea
+        self._p1_filas = [0] * self.filas
+        self._p2_filas = [0] * self.filas
+        self._p1_cols = [0] * self.columnas
+        self._p2_cols = [0] * self.columnas
+
+        self.penal_filas = [-1] * self.filas
+        self.penal_cols = [-1] * self.columnas
+
+        for i in range(self.filas):
+            self._p1_filas[i] = self._siguiente_vivo(self._orden_filas[i], 0, self.col_viva)
+            self._p2_filas[i] = self._siguiente_vivo(self._orden_filas[i], self._p1_filas[i] + 1, self.col_viva)
+            self._actualizar_penal_fila(i)
+        for j in range(self.columnas):
+            self._p1_cols[j] = self._siguiente_vivo(self._orden_cols[j], 0, self.fila_viva)
+            self._p2_cols[j] = self._siguiente_vivo(self._orden_cols[j], self._p1_cols[j] + 1, self.fila_viva)
+            self._actualizar_penal_col(j)
+
+    @staticmethod
+    def _siguiente_vivo(orden, k, vivas):
+        # avanza k hasta la siguiente entrada cuya línea opuesta siga viva
+        n = len(orden)
+        while k < n and not vivas[orden[k][1]]:
+            k += 1
+        return k
+
+    @staticmethod
+    def _penal(orden, p1, p2):
+        if p1 >= len(orden):
+            return -1
+        if p2 >= len(orden):
+            return orden[p1][0]
+        return orden[p2][0] - orden[p1][0]
+
+    def _actualizar_penal_fila(self, i):
+        if self.fila_viva[i]:
+            self.penal_filas[i] = self._penal(self._orden_filas[i], self._p1_filas[i], self._p2_filas[i])
+        else:
+            self.penal_filas[i] = -1
+
+    def _actualizar_penal_col(self, j):
+        if self.col_viva[j]:
+            self.penal_cols[j] = self._penal(self._orden_cols[j], self._p1_cols[j], self._p2_cols[j])
+        else:
+            self.penal_cols[j] = -1
+
+    def retirar_fila(self, i):
+        """Marca la fila i como agotada y actualiza sólo las columnas que la tenían entre sus dos mínimos."""
+        if not self.fila_viva[i]:
+            return
+        self.fila_viva[i] = False
+        self.penal_filas[i] = -1
+        # sólo las columnas con ruta en la fila i pueden tenerla entre sus mínimos
+        for _, j in self._orden_filas[i]:
+            if not self.col_viva[j]:
+                continue
+            orden = self._orden_cols[j]
+            p1 = self._p1_cols[j]
+            p2 = self._p2_cols[j]
+            if p1 < len(orden) and orden[p1][1] == i:
+                # la segunda pasa a ser la primera; buscar una nueva segunda
+                p1 = p2
+                p2 = self._siguiente_vivo(orden, p1 + 1, self.fila_viva)
+            elif p2 < len(orden) and orden[p2][1] == i:
+                p2 = self._siguiente_vivo(orden, p2 + 1, self.fila_viva)
+            else:
+                continue
+            self._p1_cols[j] = p1
+            self._p2_cols[j] = p2
+            self._actualizar_penal_col(j)
+
+    def retirar_columna(self, j):
+        """Marca la columna j como agotada y actualiza sólo las filas que la tenían entre sus dos mínimos."""
+        if not self.col_viva[j]:
+            return
+        self.col_viva[j] = False
+        self.penal_cols[j] = -1
+        for _, i in self._orden_cols[j]:
+            if not self.fila_viva[i]:
+                continue
+            orden = self._orden_filas[i]
+            p1 = self._p1_filas[i]
+            p2 = self._p2_filas[i]
+            if p1 < len(orden) and orden[p1][1] == j:
+                p1 = p2
+                p2 = self._siguiente_vivo(orden, p1 + 1, self.col_viva)
+            elif p2 < len(orden) and orden[p2][1] == j:
+                p2 = self._siguiente_vivo(orden, p2 + 1, self.col_viva)
+            else:
+                continue
+            self._p1_filas[i] = p1
+            self._p2_filas[i] = p2
+            self._actualizar_penal_fila(i)
+
+    def penalizaciones(self):
+        """Devuelve las penalizaciones actuales en formato [(penal, idx), ...] para filas y columnas."""
+        return (
+            [(p, i) for i, p in enumerate(self.penal_filas)],
+            [(p, j) for j, p in enumerate(self.penal_cols)],
+        )
+
+    def min_fila(self, i):
+        """Celda viva más barata de la fila i como (costo, columna), o None."""
+        orden = self._orden_filas[i]
+        p1 = self._p1_filas[i]
+        if not self.fila_viva[i] or p1 >= len(orden):
+            return None
+        return orden[p1]
+
+    def min_columna(self, j):
+        """Celda viva más barata de la columna j como (costo, fila), o None."""
+        orden = self._orden_cols[j]
+        p1 = self._p1_cols[j]
+        if not self.col_viva[j] or p1 >= len(orden):
+            return None
+        return orden[p1]
@@ -0,0 +1,126 @@
+# app/logic/russell.py
+
+from app.logic.nucleo import NucleoTransporte
+from app.logic.dispersa import celdas_por_fila, celdas_por_columna
+
+
+class MetodoRussell(NucleoTransporte):
+    """
+    Método de aproximación de Russell: con u_i el mayor costo vivo de la fila i y
+    v_j el de la columna j, se asigna en la celda viva con Δ = c_ij - u_i - v_j más
+    negativo (en empate, menor costo, luego menor fila y menor columna).
+
+    Nada se recalcula sobre toda la matriz en cada paso:
+    - u y v salen de las celdas de cada línea ordenadas de mayor a menor costo y un
+      puntero a la primera viva, que sólo avanza (como en MotorPenalizaciones).
+    - Para cada fila se guarda su mejor celda según c_ij - v_j (u_i es común a toda
+      la fila). Al retirar una línea sólo se recalculan las filas cuya mejor celda
+      estaba en la columna retirada o en una columna cuyo v bajó; un cambio de u_i
+      no altera la mejor celda de la fila i.
+    Elegir la celda es así O(m) por paso en lugar de O(m·n), y cada actualización
+    recorre sólo las rutas de las líneas afectadas (útil con costos dispersos).
+    """
+
+    CAMPOS_EXTRA = ("delta",)
+
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        super().__init__(costos, oferta, demanda, registro, tolerancia)
+
+        # celdas permitidas (costo no None) de mayor a menor costo
+        self._orden_filas = [sorted(((c, j) for j, c in celdas), reverse=True)
+                             for celdas in celdas_por_fila(self.costos)]
+        self._orden_cols = [sorted(((c, i) for i, c in celdas), reverse=True)
+                            for celdas in celdas_por_columna(self.costos, self.columnas)]
+        self._p_filas = [self._siguiente_vivo(orden, 0, self.col_viva) for orden in self._orden_filas]
+        self._p_cols = [self._siguiente_vivo(orden, 0, self.fila_viva) for orden in self._orden_cols]
+        self.u = [self._maximo(orden, p) for orden, p in zip(self._orden_filas, self._p_filas)]
+        self.v = [self._maximo(orden, p) for orden, p in zip(self._orden_cols, self._p_cols)]
+
+        # mejor celda viva de cada fila como (c_ij - v_j, c_ij, j), o None
+        self._mejor = [None] * self.filas
+        for i in range(self.filas):
+            if self.fila_viva[i]:
+                self._recalcular_fila(i)
+
+    @staticmethod
+    def _siguiente_vivo(orden, k, vivas):
+        # avanza k hasta la siguiente entrada cuya línea opuesta siga viva
+        n = len(orden)
+        while k < n and not vivas[orden[k][1]]:
+            k += 1
+        return k
+
+    @staticmethod
+    def _maximo(orden, p):
+        return orden[p][0] if p < len(orden) else None
+
+    def _recalcular_fila(self, i):
+        v = self.v
+        col_viva = self.col_viva
+        mejor = None
+        for c, j in self._orden_filas[i]:
+            if not col_viva[j]:
+                continue
+            clave = (c - v[j], c, j)
+            if mejor is None or clave < mejor:
+                mejor = clave
+        self._mejor[i] = mejor
+
+    def _retirar_lineas(self, fila=None, col=None):
+        super()._retirar_lineas(fila, col)
+
+        # columnas cuya mejor celda de fila hay que revisar
+        cambiadas = set()
+        if col is not None:
+            cambiadas.add(col)
+            # filas cuyo máximo estaba en la columna retirada: nuevo u_i
+            for _, i in self._orden_cols[col]:
+                if not self.fila_viva[i]:
+                    continue
+                orden = self._orden_filas[i]
+                p = self._p_filas[i]
+                if p < len(orden) and orden[p][1] == col:
+                    p = self._siguiente_vivo(orden, p, self.col_viva)
+                    self._p_filas[i] = p
+                    self.u[i] = self._maximo(orden, p)
+        if fila is not None:
+            # columnas cuyo máximo estaba en la fila retirada: nuevo v_j (nunca mayor)
+            for _, j in self._orden_filas[fila]:
+                if not self.col_viva[j]:
+                    continue
+                orden = self._orden_cols[j]
+                p = self._p_cols[j]
+                if p < len(orden) and orden[p][1] == fila:
+                    p = self._siguiente_vivo(orden, p, self.fila_viva)
+                    self._p_cols[j] = p
+                    nuevo = self._maximo(orden, p)
+                    if nuevo != self.v[j]:
+                        cambiadas.add(j)
+                    self.v[j] = nuevo
+
+        # un v_j menor sólo empeora las celdas de la columna j: basta revisar las filas
+        # cuya mejor celda estaba en una columna cambiada (o retirada), que tienen ruta en ella
+        for j in cambiadas:
+            for _, i in self._orden_cols[j]:
+                mejor = self._mejor[i]
+                if self.fila_viva[i] and mejor is not None and mejor[2] == j:
+                    self._recalcular_fila(i)
+
+    def _elegir_celda(self):
+        u = self.u
+        mejor = None
+        for i in range(self.filas):
+            m = self._mejor[i]
+            if m is None or not self.fila_viva[i]:
+                continue
+            clave = (m[0] - u[i], m[1], i, m[2])
+            if mejor is None or clave < mejor:
+                mejor = clave
+        if mejor is None:
+            return None
+        delta, _, i, j = mejor
+        return i, j, (delta,)
+
+    def _explicar(self, fila, col, cantidad, extra):
+        return (f"Δ = c - u - v = {self.costos[fila][col]} - {self.u[fila]} - {self.v[col]} = {extra[0]} "
+                f"es el más negativo; se elige la celda ({fila},{col}). Se asignan {cantidad} unidades.")
@@ -0,0 +1,566 @@
+# app/logic/vectorizado.py
+#
+# Variantes de Vogel y Noroeste respaldadas por arreglos NumPy para matrices grandes.
+# Producen exactamente las mismas asignaciones y pasos que las versiones en Python puro
+# (app/logic/vogel.py y app/logic/noroeste.py).
+
+from time import perf_counter
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él sólo existe el modo "python"
+    np = None
+
+from app.logic.vogel import MetodoVogel, elegir_candidato
+from app.logic.noroeste import MetodoNoroeste
+from app.logic.bitacora import BitacoraCompacta, linea_retirada
+from app.logic.dispersa import es_dispersa
+from app.logic.ficticia import es_ficticia
+from app.logic.numerico import tolerancia_absoluta, TOLERANCIA_RELATIVA
+
+MODOS = ("auto", "python", "numpy")
+
+# a partir de este número de celdas el modo "auto" usa NumPy
+UMBRAL_NUMPY = 40000
+
+# enteros mayores que esto no se representan exactamente en float64
+_MAX_ENTERO_EXACTO = 2 ** 53
+
+
+def numpy_disponible():
+    return np is not None
+
+
+def _es_numero(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _tipos_costos(costos):
+    """
+    Tipos de las celdas de costos. Los de una matriz decodificada de un arreglo
+    (MatrizDecodificada en app/utils/formatters.py) se conocen sin recorrerla,
+    también bajo la vista con línea ficticia del balanceo.
+    """
+    base = costos.base if es_ficticia(costos) else costos
+    tipos = getattr(base, "tipos", None)
+    if tipos is None:
+        return {type(c) for fila in costos for c in fila}
+    if es_ficticia(costos):
+        return tipos | {type(costos.costo)}
+    return tipos
+
+
+def _preparar(costos, oferta, demanda):
+    """
+    Convierte las listas a arreglos si es posible hacerlo sin perder exactitud.
+    Devuelve (C, permitido, oferta_arr, demanda_arr, enteros, costos_float) o None si hay que usar Python.
+    """
+    valores = list(oferta) + list(demanda)
+    if not all(_es_numero(v) and v >= 0 for v in valores):
+        return None
+    tipos = _tipos_costos(costos)
+    if not tipos <= {int, float, type(None)}:
+        return None
+
+    enteros = float not in tipos and all(isinstance(v, int) for v in valores)
+    # np.array convierte None en nan con dtype float64 (una MatrizDecodificada, desde su arreglo)
+    C = np.array(costos, dtype=np.float64).reshape(len(oferta), len(demanda))
+    permitido = ~np.isnan(C)
+    C[~permitido] = np.inf
+    if enteros:
+        if np.abs(C[permitido]).max(initial=0) >= _MAX_ENTERO_EXACTO:
+            return None
+        if max(valores, default=0) >= 2 ** 62:
+            return None
+        oferta_arr = np.array(oferta, dtype=np.int64)
+        demanda_arr = np.array(demanda, dtype=np.int64)
+    else:
+        oferta_arr = np.array(oferta, dtype=np.float64)
+        demanda_arr = np.array(demanda, dtype=np.float64)
+    return C, permitido, oferta_arr, demanda_arr, enteros, float in tipos
+
+
+def usar_numpy(filas, columnas, modo="auto"):
+    """Decide si se usa la variante NumPy según el modo pedido y el tamaño."""
+    if modo not in MODOS:
+        raise ValueError(f"modo desconocido: {modo}")
+    if modo == "python" or np is None:
+        return False
+    if modo == "numpy":
+        return True
+    return filas * columnas >= UMBRAL_NUMPY
+
+
+# con costos dispersos siempre se usa Python: los arreglos densos ocuparían m·n celdas
+
+def crear_vogel(costos, oferta, demanda, modo="auto", registro="expandido", tolerancia=None):
+    if not es_dispersa(costos) and usar_numpy(len(oferta), len(demanda), modo):
+        return MetodoVogelNumpy(costos, oferta, demanda, registro, tolerancia)
+    return MetodoVogel(costos, oferta, demanda, registro, tolerancia)
+
+
+def crear_noroeste(costos, oferta, demanda, modo="auto", registro="expandido", tolerancia=None):
+    if not es_dispersa(costos) and usar_numpy(len(oferta), len(demanda), modo):
+        return MetodoNoroesteNumpy(costos, oferta, demanda, registro, tolerancia)
+    return MetodoNoroeste(costos, oferta, demanda, registro, tolerancia)
+
+
+class MetodoVogelNumpy:
+    """
+    Vogel sobre arreglos: la matriz de costos no se modifica nunca; las filas y
+    columnas retiradas se enmascaran con fila_viva / col_viva. Para cada línea se
+    guardan el menor costo vivo (y su índice) y el segundo menor; al retirar una
+    línea sólo se recalculan, con reducciones vectorizadas, las líneas opuestas
+    cuyo costo en la línea retirada era <= a su segundo mínimo.
+    """
+
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        self.costos = costos  # sólo lectura (para costo_celda con el tipo original)
+        self.filas = len(oferta)
+        self.columnas = len(demanda)
+        self.pasos = []
+        self.registro = registro
+        self.bitacora = None
+        self.error = None
+        self.num_pasos = 0
+        self._t_penal = 0.0
+
+        preparado = _preparar(costos, oferta, demanda)
+        self._respaldo = None
+        if preparado is None:
+            # tipos no representables exactamente: delegar en la versión Python
+            self._respaldo = MetodoVogel(costos, oferta, demanda, registro, tolerancia)
+            return
+
+        self.C, self.permitido, self.oferta, self.demanda, self._enteros, costos_float = preparado
+        self.asignaciones = np.zeros((self.filas, self.columnas), dtype=self.oferta.dtype)
+
+        # mismas tolerancias que MetodoVogel (0 con cantidades o costos enteros)
+        self.tolerancia = tolerancia_absoluta(list(oferta) + list(demanda), tolerancia)
+        self.tolerancia_costos = 0
+        if costos_float:
+            relativa = TOLERANCIA_RELATIVA if tolerancia is None else tolerancia
+            self.tolerancia_costos = relativa * float(np.abs(self.C[self.permitido]).max(initial=0))
+
+        self.fila_viva = self.oferta > self.tolerancia
+        self.col_viva = self.demanda > self.tolerancia
+
+        # mínimo, índice del mínimo y segundo mínimo por fila / columna
+        self.min1_f = np.full(self.filas, np.inf)
+        self.idx1_f = np.zeros(self.filas, dtype=np.int64)
+        self.min2_f = np.full(self.filas, np.inf)
+        self.min1_c = np.full(self.columnas, np.inf)
+        self.idx1_c = np.zeros(self.columnas, dtype=np.int64)
+        self.min2_c = np.full(self.columnas, np.inf)
+
+        self._recalcular_filas(np.arange(self.filas))
+        self._recalcular_columnas(np.arange(self.columnas))
+
+    # --- mantenimiento de mínimos ---
+
+    @staticmethod
+    def _dos_minimos(sub):
+        # sub: matriz k x n con inf en celdas no vivas; devuelve (min1, idx1, min2)
+        idx1 = np.argmin(sub, axis=1)  # primera ocurrencia -> menor índice en empate
+        min1 = sub[np.arange(sub.shape[0]), idx1]
+        if sub.shape[1] >= 2:
+            min2 = np.partition(sub, 1, axis=1)[:, 1]
+        else:
+            min2 = np.full(sub.shape[0], np.inf)
+        return min1, idx1, min2
+
+    def _recalcular_filas(self, filas):
+        if filas.size == 0 or self.columnas == 0:
+            return
+        mascara = self.permitido[filas] & self.col_viva
+        sub = np.where(mascara, self.C[filas], np.inf)
+        self.min1_f[filas], self.idx1_f[filas], self.min2_f[filas] = self._dos_minimos(sub)
+
+    def _recalcular_columnas(self, cols):
+        if cols.size == 0 or self.filas == 0:
+            return
+        mascara = self.permitido[:, cols].T & self.fila_viva
+        sub = np.where(mascara, self.C[:, cols].T, np.inf)
+        self.min1_c[cols], self.idx1_c[cols], self.min2_c[cols] = self._dos_minimos(sub)
+
+    def _retirar_fila(self, i):
+        t = perf_counter()
+        self.fila_viva[i] = False
+        afectadas = np.nonzero(self.col_viva & self.permitido[i] & (self.C[i] <= self.min2_c))[0]
+        self._recalcular_columnas(afectadas)
+        self._t_penal += perf_counter() - t
+
+    def _retirar_columna(self, j):
+        t = perf_counter()
+        self.col_viva[j] = False
+        afectadas = np.nonzero(self.fila_viva & self.permitido[:, j] & (self.C[:, j] <= self.min2_f))[0]
+        self._recalcular_filas(afectadas)
+        self._t_penal += perf_counter() - t
+
+    def _agotar(self, fila, col):
+        # retira las líneas cuyo resto quedó dentro de la tolerancia (y lo deja en 0)
+        fila_agotada = bool(self.oferta[fila] <= self.tolerancia)
+        col_agotada = bool(self.demanda[col] <= self.tolerancia)
+        if fila_agotada:
+            self.oferta[fila] = 0
+            self._retirar_fila(fila)
+        if col_agotada:
+            self.demanda[col] = 0
+            self._retirar_columna(col)
+        return fila_agotada, col_agotada
+
+    @property
+    def tiempo_penalizaciones(self):
+        """Segundos acumulados en mantener y seleccionar penalizaciones (instrumentación)."""
+        if self._respaldo is not None:
+            return self._respaldo.tiempo_penalizaciones
+        return self._t_penal
+
+    @staticmethod
+    def _penalizaciones(vivas, min1, min2):
+        with np.errstate(invalid="ignore"):
+            pen = np.where(np.isinf(min2), min1, min2 - min1)
+        return np.where(vivas & ~np.isinf(min1), pen, -1.0)
+
+    def _valor(self, v):
+        # convierte un costo/penalización float64 al tipo que produciría la versión Python
+        if self._enteros and v != np.inf:
+            return int(v)
+        return v
+
+    def _lista_penal(self, pen, pen_prev, lista_prev, clave):
+        if pen_prev is None:
+            valores = pen.astype(np.int64).tolist() if self._enteros else pen.tolist()
+            return [{clave: k, "penal": p} for k, p in enumerate(valores)]
+        lista = lista_prev[:]
+        cambios = np.nonzero(pen != pen_prev)[0]
+        valores = pen[cambios]
+        valores = valores.astype(np.int64).tolist() if self._enteros else valores.tolist()
+        for k, p in zip(cambios.tolist(), valores):
+            lista[k] = {clave: k, "penal": p}
+        return lista
+
+    # --- selección ---
+
+    def _mayor_penalizacion(self, pf, pc, detalle=True):
+        t = perf_counter()
+        try:
+            return self._seleccionar(pf, pc, detalle)
+        finally:
+            self._t_penal += perf_counter() - t
+
+    def _seleccionar(self, pf, pc, detalle):
+        tol = self.tolerancia_costos
+        max_pen = max(pf.max(initial=-np.inf), pc.max(initial=-np.inf))
+        cand_f = np.nonzero(pf >= max_pen - tol)[0]
+        cand_c = np.nonzero(pc >= max_pen - tol)[0]
+        minc_f = np.where(self.fila_viva[cand_f], self.min1_f[cand_f], np.inf)
+        minc_c = np.where(self.col_viva[cand_c], self.min1_c[cand_c], np.inf)
+
+        # orden (min_cost, índice, fila antes que columna), igual que MetodoVogel
+        minc = np.concatenate([minc_f, minc_c])
+        idx = np.concatenate([cand_f, cand_c])
+        es_col = np.concatenate([np.zeros(cand_f.size, dtype=np.int8), np.ones(cand_c.size, dtype=np.int8)])
+        orden = np.lexsort((es_col, idx, minc))
+        if tol:
+            # con tolerancia el desempate no es un orden total: el elegido sale del
+            # mismo recorrido que MetodoVogel y se pone primero
+            elegido = elegir_candidato(zip(es_col.tolist(), idx.tolist(), minc.tolist()), tol)
+            orden = np.concatenate(([elegido], orden[orden != elegido]))
+
+        if not detalle:
+            k = orden[0]
+            return ("columna" if es_col[k] else "fila"), int(idx[k]), None, max_pen
+
+        minc = minc[orden]
+        if self._enteros and not np.isinf(minc).any():
+            minc_list = minc.astype(np.int64).tolist()
+        else:
+            minc_list = [self._valor(v) for v in minc.tolist()]
+        candidatos = [
+            ("columna" if c else "fila", i, v)
+            for c, i, v in zip(es_col[orden].tolist(), idx[orden].tolist(), minc_list)
+        ]
+        tipo, pos, _ = candidatos[0]
+        tie_info = {"tie": len(candidatos) > 1, "reason": "min_cost_then_index", "candidates": candidatos}
+        return tipo, pos, tie_info, max_pen
+
+    def _mejor_celda(self, tipo, pos):
+        if tipo == "fila":
+            if not self.fila_viva[pos] or np.isinf(self.min1_f[pos]):
+                return None, None
+            return pos, int(self.idx1_f[pos])
+        if not self.col_viva[pos] or np.isinf(self.min1_c[pos]):
+            return None, None
+        return int(self.idx1_c[pos]), pos
+
+    def resolver(self):
+        """Mismo contrato que MetodoVogel.resolver (asignaciones y pasos idénticos)."""
+        if self._respaldo is not None:
+            return self._respaldo.resolver()
+        for _ in self.iterar():
+            pass
+        return self.resultado()
+
+    def resultado(self):
+        if self._respaldo is not None:
+            return self._respaldo.resultado()
+        resultado = {
+            "asignaciones": self.asignaciones.tolist(),
+            "pasos": self.pasos,
+            "num_pasos": self.num_pasos
+        }
+        if self.bitacora is not None:
+            resultado["bitacora"] = self.bitacora
+        if self.error is not None:
+            resultado["error"] = self.error
+        return resultado
+
+    def iterar(self, guardar=True):
+        """Generador de pasos con el mismo contrato que MetodoVogel.iterar."""
+        if self._respaldo is not None:
+            yield from self._respaldo.iterar(guardar)
+            return
+
+        iteraciones = 0
+        max_iter = max(1000, (self.filas * self.columnas) * 50)
+        conv = int if self._enteros else float
+        pf_prev = pc_prev = None
+        pen_filas_list = pen_cols_list = None
+        compacto = self.registro == "compacto"
+        sin_registro = self.registro == "ninguno"
+        if compacto:
+            self.bitacora = BitacoraCompacta(self.oferta.tolist(), self.demanda.tolist(), extra=("tipo", "posicion"))
+
+        while self.fila_viva.any() and self.col_viva.any():
+            if iteraciones > max_iter:
+                error = {
+                    "error": "Límite de iteraciones alcanzado - posible estado inconsistente",
+                    "oferta_restante": self.oferta.tolist(),
+                    "demanda_restante": self.demanda.tolist()
+                }
+                if compacto:
+                    self.bitacora.error = error
+                elif sin_registro:
+                    self.error = error["error"]
+                else:
+                    if guardar:
+                        self.pasos.append(error)
+                    yield error
+                break
+
+            if compacto or sin_registro:
+                pf = self._penalizaciones(self.fila_viva, self.min1_f, self.min2_f)
+                pc = self._penalizaciones(self.col_viva, self.min1_c, self.min2_c)
+                tipo, pos, _, _ = self._mayor_penalizacion(pf, pc, detalle=False)
+                fila, col = self._mejor_celda(tipo, pos)
+                if fila is None or col is None:
+                    if compacto:
+                        self.bitacora.error = {
+                            "error": "No se encontró celda válida para asignar",
+                            "tipo_penalizacion": tipo,
+                            "posicion": pos
+                        }
+                    else:
+                        self.error = "No se encontró celda válida para asignar"
+                    break
+                asignacion = conv(min(self.oferta[fila], self.demanda[col]))
+                self.asignaciones[fila, col] = asignacion
+                self.oferta[fila] -= asignacion
+                self.demanda[col] -= asignacion
+                fila_agotada, col_agotada = self._agotar(fila, col)
+                self.num_pasos += 1
+                iteraciones += 1
+                if compacto:
+                    self.bitacora.registrar(fila, col, asignacion, linea_retirada(fila_agotada, col_agotada), tipo, pos)
+                    yield self.bitacora.pasos[-1]
+                else:
+                    yield None
+                continue
+
+            oferta_before = self.oferta.tolist()
+            demanda_before = self.demanda.tolist()
+
+            pf = self._penalizaciones(self.fila_viva, self.min1_f, self.min2_f)
+            pc = self._penalizaciones(self.col_viva, self.min1_c, self.min2_c)
+            # sólo se crean entradas nuevas para las líneas cuya penalización cambió;
+            # el resto se comparte con el paso anterior (nadie muta estos dicts)
+            pen_filas_list = self._lista_penal(pf, pf_prev, pen_filas_list, "fila")
+            pen_cols_list = self._lista_penal(pc, pc_prev, pen_cols_list, "columna")
+            pf_prev, pc_prev = pf, pc
+
+            tipo, pos, tie_info, max_pen = self._mayor_penalizacion(pf, pc)
+            fila, col = self._mejor_celda(tipo, pos)
+
+            if fila is None or col is None:
+                error = {
+                    "error": "No se encontró celda válida para asignar",
+                    "tipo_penalizacion": tipo,
+                    "posicion": pos,
+                    "penalizaciones_filas": pen_filas_list,
+                    "penalizaciones_columnas": pen_cols_list,
+                    "tie_info": tie_info,
+                    "oferta_restante": oferta_before,
+                    "demanda_restante": demanda_before,
+                    "explicacion": "No se encontró celda válida (todas las celdas disponibles están agotadas o marcadas)."
+                }
+                if guardar:
+                    self.pasos.append(error)
+                yield error
+                break
+
+            asignacion = conv(min(self.oferta[fila], self.demanda[col]))
+
+            explicacion_pre = f"Penalización mayor = {self._valor(max_pen)}. Se elige {tipo} {pos}, celda de menor costo en esa {tipo} -> ({fila},{col}). Se asignan {asignacion} unidades."
+
+            paso_reg = {
+                "paso_num": self.num_pasos + 1,
+                "tipo_penalizacion": tipo,
+                "posicion": pos,
+                "penalizaciones_filas": pen_filas_list,
+                "penalizaciones_columnas": pen_cols_list,
+                "tie_info": tie_info,
+                "celda_elegida": (fila, col),
+                "costo_celda": self.costos[fila][col],
+                "asignacion_realizada": asignacion,
+                "oferta_restante": oferta_before,
+                "demanda_restante": demanda_before,
+                "explicacion": explicacion_pre
+            }
+
+            self.asignaciones[fila, col] = asignacion
+            self.oferta[fila] -= asignacion
+            self.demanda[col] -= asignacion
+
+            self._agotar(fila, col)
+
+            oferta_after = self.oferta.tolist()
+            demanda_after = self.demanda.tolist()
+            paso_reg["explicacion"] += f" Estado después: oferta={oferta_after} demanda={demanda_after}."
+            paso_reg["oferta_posterior"] = oferta_after
+            paso_reg["demanda_posterior"] = demanda_after
+
+            if guardar:
+                self.pasos.append(paso_reg)
+            self.num_pasos += 1
+            iteraciones += 1
+            yield paso_reg
+
+
+class MetodoNoroesteNumpy:
+    """
+    Noroeste sin bucle celda a celda: el recorrido de la esquina noroeste equivale a
+    intersecar los intervalos acumulados de oferta y demanda, así que las celdas,
+    cantidades y estados de cada paso salen de np.cumsum / np.searchsorted.
+    Sólo se usa con cantidades enteras (con floats el acumulado no reproduce las
+    restas sucesivas y se delega en MetodoNoroeste). Si el recorrido pasa por una
+    ruta prohibida (costo None) también se delega: MetodoNoroeste la salta.
+    """
+
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        self.costos = costos
+        self.filas = len(oferta)
+        self.columnas = len(demanda)
+        self.pasos = []
+        self.registro = registro
+        self.bitacora = None
+
+        # el recorrido sólo depende de oferta/demanda; los costos se leen por celda
+        self._respaldo = None
+        enteros = all(isinstance(v, int) and not isinstance(v, bool) and 0 <= v < 2 ** 62 for v in list(oferta) + list(demanda))
+        if not (self.filas and self.columnas and enteros):
+            self._respaldo = MetodoNoroeste(costos, oferta, demanda, registro, tolerancia)
+            return
+        self.oferta = np.array(oferta, dtype=np.int64)
+        self.demanda = np.array(demanda, dtype=np.int64)
+        self._entrada = (oferta, demanda, tolerancia)
+
+    def resolver(self):
+        if self._respaldo is not None:
+            return self._respaldo.resolver()
+        for _ in self.iterar():
+            pass
+        return self.resultado()
+
+    def resultado(self):
+        if self._respaldo is not None:
+            return self._respaldo.resultado()
+        resultado = {
+            "asignaciones": self.asignaciones.tolist(),
+            "pasos": self.pasos,
+            "num_pasos": self.num_pasos
+        }
+        if self.bitacora is not None:
+            resultado["bitacora"] = self.bitacora
+        return resultado
+
+    def iterar(self, guardar=True):
+        """Generador de pasos con el mismo contrato que MetodoNoroeste.iterar."""
+        if self._respaldo is not None:
+            yield from self._respaldo.iterar(guardar)
+            return
+
+        oferta = self.oferta
+        demanda = self.demanda
+        acum_o = np.cumsum(oferta)
+        acum_d = np.cumsum(demanda)
+        total = min(acum_o[-1], acum_d[-1])
+
+        # puntos de corte de ambos acumulados; cada intervalo positivo es una asignación
+        cortes = np.union1d(np.concatenate(([0], acum_o)), acum_d)
+        cortes = cortes[cortes <= total]
+        ini = cortes[:-1]
+        fin = cortes[1:]
+        filas = np.searchsorted(acum_o, ini, side="right")
+        cols = np.searchsorted(acum_d, ini, side="right")
+        cantidades = fin - ini
+
+        # O(m + n): sólo se miran las celdas del recorrido
+        costos = self.costos
+        if any(costos[i][j] is None for i, j in zip(filas.tolist(), cols.tolist())):
+            oferta_l, demanda_l, tolerancia = self._entrada
+            self._respaldo = MetodoNoroeste(costos, oferta_l, demanda_l, self.registro, tolerancia)
+            yield from self._respaldo.iterar(guardar)
+            return
+
+        self.asignaciones = np.zeros((self.filas, self.columnas), dtype=np.int64)
+        self.asignaciones[filas, cols] = cantidades
+        self.num_pasos = int(filas.size)
+
+        if self.registro == "ninguno":
+            # el recorrido ya está hecho, pero el contrato de iterar es un None por asignación
+            yield from repeat(None, self.num_pasos)
+            return
+
+        resto_o = (acum_o[filas] - fin).tolist()
+        resto_d = (acum_d[cols] - fin).tolist()
+        filas = filas.tolist()
+        cols = cols.tolist()
+        cantidades = cantidades.tolist()
+
+        if self.registro == "compacto":
+            self.bitacora = BitacoraCompacta(oferta.tolist(), demanda.tolist())
+            self.bitacora.pasos = [
+                (i, j, a, linea_retirada(ro == 0, rd == 0))
+                for i, j, a, ro, rd in zip(filas, cols, cantidades, resto_o, resto_d)
+            ]
+            yield from self.bitacora.pasos
+            return
+
+        # estado tras cada paso: filas anteriores agotadas, la actual con lo que resta, el resto intacto
+        oferta_l = oferta.tolist()
+        demanda_l = demanda.tolist()
+        for i, j, a, ro, rd in zip(filas, cols, cantidades, resto_o, resto_d):
+            est_o = [0] * i + [ro] + oferta_l[i + 1:]
+            est_d = [0] * j + [rd] + demanda_l[j + 1:]
+            paso_reg = {
+                "celda": (i, j),
+                "costo": self.costos[i][j],
+                "asignacion": a,
+                "oferta_restante": est_o,
+                "demanda_restante": est_d
+            }
+            if guardar:
+                self.pasos.append(paso_reg)
+            yield paso_reg
@@ -1,25 +1,34 @@
 # app/logic/vogel.py
 
-class MetodoVogel:
-    def __init__(self, costos, oferta, demanda):
-        self.costos = [fila[:] for fila in costos]  # copia profunda
-        self.oferta = oferta[:]
-        self.demanda = demanda[:]
-        self.filas = len(oferta)
-        self.columnas = len(demanda)
-        
-        self.asignaciones = [
-            [0 for _ in range(self.columnas)]
-            for _ in range(self.filas)
-        ]
-        
-        self.pasos = []  # lista de pasos explicados
-
-    def _is_available(self, i, j):
-        # Celda disponible si costo no es None y oferta/demanda siguen > 0
-        if self.costos[i][j] is None: 
-            return False
-        return (self.oferta[i] > 0) and (self.demanda[j] > 0)
+from time import perf_counter
+from app.logic.penalizaciones import MotorPenalizaciones
+from app.logic.bitacora import BitacoraCompacta
+from app.logic.nucleo import NucleoTransporte
+
+
+def elegir_candidato(candidatos, tol=0):
+    """
+    Posición en `candidatos` ((tipo, idx, min_cost), filas y luego columnas en orden
+    creciente) del elegido: menor min_cost y, en empate, menor índice (la fila gana
+    a la columna del mismo índice). Costos a no más de `tol` cuentan como empate.
+    """
+    mejor = None
+    for k, (_, idx, c) in enumerate(candidatos):
+        if mejor is None:
+            mejor, mejor_idx, mejor_c = k, idx, c
+        elif c < mejor_c - tol or (c <= mejor_c + tol and idx < mejor_idx):
+            mejor, mejor_idx, mejor_c = k, idx, c
+    return mejor
+
+
+class MetodoVogel(NucleoTransporte):
+    def __init__(self, costos, oferta, demanda, registro="expandido", tolerancia=None):
+        super().__init__(costos, oferta, demanda, registro, tolerancia)
+        # segundos acumulados en cálculo/selección de penalizaciones (instrumentación)
+        self.tiempo_penalizaciones = 0.0
+
+        # penalizaciones mantenidas incrementalmente
+        self.motor = MotorPenalizaciones(self.costos, self.oferta, self.demanda, self.tolerancia, tolerancia)
 
     def calcular_penalizaciones(self):
         """
@@ -27,41 +36,12 @@ class MetodoVogel:
         Penalización = diferencia entre los dos costos más bajos disponibles.
         Ignora entradas None y filas/columnas con oferta/demanda == 0.
         Devuelve listas: [(penal, idx), ...] para filas y columnas.
+        Los valores salen del motor incremental (no se recorre la matriz).
         """
-        penal_filas = []
-        penal_columnas = []
-
-        # Penalizaciones por fila
-        for i in range(self.filas):
-            if self.oferta[i] > 0:
-                costos_validos = [self.costos[i][j] for j in range(self.columnas) if self._is_available(i, j)]
-                costos_validos = [c for c in costos_validos if c is not None]
-                if len(costos_validos) >= 2:
-                    costos_validos.sort()
-                    penal_filas.append((costos_validos[1] - costos_validos[0], i))
-                elif len(costos_validos) == 1:
-                    penal_filas.append((costos_validos[0], i))
-                else:
-                    penal_filas.append((-1, i))
-            else:
-                penal_filas.append((-1, i))
-
-        # Penalizaciones por columna
-        for j in range(self.columnas):
-            if self.demanda[j] > 0:
-                costos_validos = [self.costos[i][j] for i in range(self.filas) if self._is_available(i, j)]
-                costos_validos = [c for c in costos_validos if c is not None]
-                if len(costos_validos) >= 2:
-                    costos_validos.sort()
-                    penal_columnas.append((costos_validos[1] - costos_validos[0], j))
-                elif len(costos_validos) == 1:
-                    penal_columnas.append((costos_validos[0], j))
-                else:
-                    penal_columnas.append((-1, j))
-            else:
-                penal_columnas.append((-1, j))
-
-        return penal_filas, penal_columnas
+        t = perf_counter()
+        penalizaciones = self.motor.penalizaciones()
+        self.tiempo_penalizaciones += perf_counter() - t
+        return penalizaciones
 
     def mayor_penalizacion(self, penal_filas, penal_columnas):
         """
@@ -72,26 +52,35 @@ class MetodoVogel:
         REGLA: elegir la penalización más alta; si hay empate entre varias,
                escoger el candidato (fila o columna) cuyo menor costo disponible sea el menor.
                Si sigue empate, elegir el candidato con menor índice numérico.
+        Con costos float, penalizaciones y costos que difieren en no más de
+        motor.tolerancia_costos cuentan como empatados.
         """
+        t = perf_counter()
+        try:
+            return self._mayor_penalizacion(penal_filas, penal_columnas)
+        finally:
+            self.tiempo_penalizaciones += perf_counter() - t
+
+    def _mayor_penalizacion(self, penal_filas, penal_columnas):
         # obtener valor máximo de penal
         max_fila_pen = max([p for p, _ in penal_filas])
         max_col_pen = max([p for p, _ in penal_columnas])
         max_pen = max(max_fila_pen, max_col_pen)
 
-        # candidatos filas/columnas con esa penalización
-        cand_filas = [i for p, i in penal_filas if p == max_pen]
-        cand_cols = [j for p, j in penal_columnas if p == max_pen]
+        # candidatos filas/columnas con esa penalización (con costos float, a no más
+        # de la tolerancia: un residuo de redondeo no rompe el empate)
+        tol = self.motor.tolerancia_costos
+        cand_filas = [i for p, i in penal_filas if p >= max_pen - tol]
+        cand_cols = [j for p, j in penal_columnas if p >= max_pen - tol]
 
-        # función para obtener el menor costo disponible dentro de una fila/col
+        # menor costo disponible dentro de una fila/col (leído del motor)
         def min_cost_in_row(i):
-            vals = [self.costos[i][j] for j in range(self.columnas) if self._is_available(i, j)]
-            vals = [v for v in vals if v is not None]
-            return min(vals) if vals else float("inf")
+            celda = self.motor.min_fila(i)
+            return celda[0] if celda is not None else float("inf")
 
         def min_cost_in_col(j):
-            vals = [self.costos[i][j] for i in range(self.filas) if self._is_available(i, j)]
-            vals = [v for v in vals if v is not None]
-            return min(vals) if vals else float("inf")
+            celda = self.motor.min_columna(j)
+            return celda[0] if celda is not None else float("inf")
 
         # construir lista de candidatos (tipo, idx, min_cost, tie_index)
         candidates = []
@@ -102,8 +91,10 @@ class MetodoVogel:
 
         # si hay candidatos, elegir el que tiene min(min_cost); si empate, min(tie_index)
         if candidates:
+            elegido = candidates[elegir_candidato([c[:3] for c in candidates], tol)]
             # ordenar por min_cost asc, then tie_index asc, tipo (fila before columna) to be deterministic
-            candidates.sort(key=lambda x: (x[2], x[3], 0 if x[0]=="fila" else 1))
+            # (el elegido primero: con tolerancia puede no ser el de menor min_cost exacto)
+            candidates.sort(key=lambda x: (x is not elegido, x[2], x[3], 0 if x[0]=="fila" else 1))
             tipo, pos, minc, _ = candidates[0]
             tie_info = {"tie": len(candidates) > 1, "reason": "min_cost_then_index", "candidates": [(c[0], c[1], c[2]) for c in candidates]}
             return tipo, pos, tie_info
@@ -114,81 +105,158 @@ class MetodoVogel:
         else:
             return "columna", penal_columnas[0][1], {"tie": False}
 
+    def _elegir_linea(self):
+        """
+        Igual que mayor_penalizacion (misma regla de desempate) pero leyendo
+        directamente los vectores del motor, sin construir listas ni tie_info.
+        """
+        t = perf_counter()
+        pen_f = self.motor.penal_filas
+        pen_c = self.motor.penal_cols
+        tol = self.motor.tolerancia_costos
+        umbral = max(max(pen_f), max(pen_c)) - tol
+        inf = float("inf")
+        mejor_tipo = mejor_pos = mejor_c = None
+        # misma regla que elegir_candidato, sin construir la lista de candidatos
+        for i in range(self.filas):
+            if pen_f[i] < umbral:
+                continue
+            celda = self.motor.min_fila(i)
+            c = celda[0] if celda is not None else inf
+            if mejor_tipo is None or c < mejor_c - tol or (c <= mejor_c + tol and i < mejor_pos):
+                mejor_tipo, mejor_pos, mejor_c = "fila", i, c
+        for j in range(self.columnas):
+            if pen_c[j] < umbral:
+                continue
+            celda = self.motor.min_columna(j)
+            c = celda[0] if celda is not None else inf
+            # en empate total (mismo costo e índice) gana la fila
+            if mejor_tipo is None or c < mejor_c - tol or (c <= mejor_c + tol and j < mejor_pos):
+                mejor_tipo, mejor_pos, mejor_c = "columna", j, c
+        self.tiempo_penalizaciones += perf_counter() - t
+        return mejor_tipo, mejor_pos
+
+    def _elegir_celda(self):
+        """
+        Celda de menor costo de la línea de mayor penalización, para el bucle genérico
+        (registro == "ninguno"): (fila, columna, (tipo, posicion)) o None.
+        """
+        tipo, pos = self._elegir_linea()
+        fila, col = self.mejor_celda(tipo, pos)
+        if fila is None or col is None:
+            return None
+        return fila, col, (tipo, pos)
+
     def mejor_celda(self, tipo, pos):
         """
         Selecciona la celda de menor costo en la fila o columna seleccionada.
         Devuelve (fila, columna) o (None, None) si no hay celda válida.
+        En empate de costo gana el menor índice (orden (costo, idx) del motor).
         """
         if tipo == "fila":
-            fila = pos
-            min_valor = float("inf")
-            min_col = None
-            for j in range(self.columnas):
-                if self._is_available(fila, j) and self.costos[fila][j] < min_valor:
-                    min_valor = self.costos[fila][j]
-                    min_col = j
-            return (fila, min_col) if min_col is not None else (None, None)
+            celda = self.motor.min_fila(pos)
+            return (pos, celda[1]) if celda is not None else (None, None)
 
         else:  # tipo columna
-            col = pos
-            min_valor = float("inf")
-            min_fila = None
-            for i in range(self.filas):
-                if self._is_available(i, col) and self.costos[i][col] < min_valor:
-                    min_valor = self.costos[i][col]
-                    min_fila = i
-            return (min_fila, col) if min_fila is not None else (None, None)
+            celda = self.motor.min_columna(pos)
+            return (celda[1], pos) if celda is not None else (None, None)
+
+    def _retirar_lineas(self, fila=None, col=None):
+        super()._retirar_lineas(fila, col)
+        self._eliminar_fila_o_col_si_cero(i_changed=fila, j_changed=col)
 
     def _eliminar_fila_o_col_si_cero(self, i_changed=None, j_changed=None):
         """
-        Si una oferta llega a 0 -> marcar fila i con None (no borramos estructura).
-        Si una demanda llega a 0 -> marcar columna j con None.
-        Al marcar con None, esas celdas se ignoran para penalizaciones y selección.
+        Si una oferta llega a 0 -> retirar la fila i del motor de penalizaciones.
+        Si una demanda llega a 0 -> retirar la columna j.
+        Sólo se recalculan las líneas que tenían la fila/columna retirada
+        entre sus dos costos más bajos.
         """
-        if i_changed is not None and self.oferta[i_changed] == 0:
-            for j in range(self.columnas):
-                self.costos[i_changed][j] = None
-        if j_changed is not None and self.demanda[j_changed] == 0:
-            for i in range(self.filas):
-                self.costos[i][j_changed] = None
-
-    def resolver(self):
+        t = perf_counter()
+        if i_changed is not None and self.oferta[i_changed] <= self.tolerancia:
+            self.motor.retirar_fila(i_changed)
+        if j_changed is not None and self.demanda[j_changed] <= self.tolerancia:
+            self.motor.retirar_columna(j_changed)
+        self.tiempo_penalizaciones += perf_counter() - t
+
+    def iterar(self, guardar=True):
         """
-        Método principal que resuelve usando VAM paso a paso.
-        Registra paso a paso con estado ANTES y DESPUÉS y explicación textual.
+        Generador con el bucle de resolución (resolver() lo agota): produce cada
+        registro de paso (dict expandido con estado ANTES y DESPUÉS y explicación, o
+        tupla de la bitácora si registro == "compacto"; None por asignación si
+        "ninguno") en cuanto se genera. Con guardar=False los pasos expandidos no se acumulan en
+        self.pasos, para poder emitirlos en streaming sin retenerlos en memoria.
+        Al terminar, resultado() tiene las asignaciones finales.
         """
+        if self.registro == "ninguno":
+            # sin registro por paso basta el bucle genérico de NucleoTransporte
+            yield from super().iterar(guardar)
+            return
+
         iteraciones = 0
+        # los pasos ya aplicados con reproducir() cuentan en la numeración
+        registros = self.num_pasos
         max_iter = max(1000, (self.filas * self.columnas) * 50)
+        compacto = self.registro == "compacto"
+        if compacto:
+            self.bitacora = BitacoraCompacta(self.oferta, self.demanda, extra=("tipo", "posicion"))
 
-        while sum(self.oferta) > 0 and sum(self.demanda) > 0:
+        while self.filas_vivas and self.cols_vivas:
             if iteraciones > max_iter:
-                self.pasos.append({
+                error = {
                     "error": "Límite de iteraciones alcanzado - posible estado inconsistente",
                     "oferta_restante": self.oferta[:],
                     "demanda_restante": self.demanda[:]
-                })
+                }
+                if compacto:
+                    self.bitacora.error = error
+                else:
+                    if guardar:
+                        self.pasos.append(error)
+                    yield error
                 break
 
-            # Estado antes de la asignación
-            oferta_before = self.oferta[:]
-            demanda_before = self.demanda[:]
+            if compacto:
+                tipo, pos = self._elegir_linea()
+                fila, col = self.mejor_celda(tipo, pos)
+                if fila is None or col is None:
+                    self.bitacora.error = {
+                        "error": "No se encontró celda válida para asignar",
+                        "tipo_penalizacion": tipo,
+                        "posicion": pos
+                    }
+                    break
+                asignacion = min(self.oferta[fila], self.demanda[col])
+                if asignacion <= 0:
+                    self.bitacora.error = {"error": "Asignación no positiva detectada", "celda": (fila, col)}
+                    iteraciones += 1
+                    continue
+                retira = self._aplicar(fila, col, asignacion)
+                self.bitacora.registrar(fila, col, asignacion, retira, tipo, pos)
+                iteraciones += 1
+                yield self.bitacora.pasos[-1]
+                continue
 
             # calcular penalizaciones en este estado
             penal_filas, penal_columnas = self.calcular_penalizaciones()
 
-            # representar penalizaciones legibles
-            pen_filas_list = [{"fila": i, "penal": p} for p, i in penal_filas]
-            pen_cols_list = [{"columna": j, "penal": p} for p, j in penal_columnas]
-
             # decidir tipo/posicion con información de desempate
             tipo, pos, tie_info = self.mayor_penalizacion(penal_filas, penal_columnas)
 
             # encontrar mejor celda en la fila/columna elegida
             fila, col = self.mejor_celda(tipo, pos)
 
+            # Estado antes de la asignación
+            oferta_before = self.oferta[:]
+            demanda_before = self.demanda[:]
+
+            # representar penalizaciones legibles
+            pen_filas_list = [{"fila": i, "penal": p} for p, i in penal_filas]
+            pen_cols_list = [{"columna": j, "penal": p} for p, j in penal_columnas]
+
             # si no existe celda válida, registrar y salir
             if fila is None or col is None:
-                self.pasos.append({
+                error = {
                     "error": "No se encontró celda válida para asignar",
                     "tipo_penalizacion": tipo,
                     "posicion": pos,
@@ -198,7 +266,10 @@ class MetodoVogel:
                     "oferta_restante": oferta_before,
                     "demanda_restante": demanda_before,
                     "explicacion": "No se encontró celda válida (todas las celdas disponibles están agotadas o marcadas)."
-                })
+                }
+                if guardar:
+                    self.pasos.append(error)
+                yield error
                 break
 
             asignacion = min(self.oferta[fila], self.demanda[col])
@@ -206,7 +277,7 @@ class MetodoVogel:
             # seguridad: si asignación inválida (0 o negativa), intentar avanzar o romper
             if asignacion <= 0:
                 # registrar paso anomalía y continuar
-                self.pasos.append({
+                error = {
                     "error": "Asignación no positiva detectada",
                     "celda": (fila, col),
                     "penalizaciones_filas": pen_filas_list,
@@ -215,8 +286,12 @@ class MetodoVogel:
                     "oferta_restante": oferta_before,
                     "demanda_restante": demanda_before,
                     "explicacion": "La celda elegida resultó en asignación 0; se intenta continuar."
-                })
+                }
+                registros += 1
+                if guardar:
+                    self.pasos.append(error)
                 iteraciones += 1
+                yield error
                 continue
 
             # Explicación textual clara antes de aplicar
@@ -224,7 +299,7 @@ class MetodoVogel:
 
             # Registrar paso con estado antes (para construir tabla anterior), y datos de la decisión
             paso_reg = {
-                "paso_num": len(self.pasos) + 1,
+                "paso_num": registros + 1,
                 "tipo_penalizacion": tipo,
                 "posicion": pos,
                 "penalizaciones_filas": pen_filas_list,
@@ -238,14 +313,9 @@ class MetodoVogel:
                 "explicacion": explicacion_pre
             }
 
-            # Realizar asignación (actualizar matriz de asignaciones y oferta/demanda)
-            self.asignaciones[fila][col] = asignacion
-            self.oferta[fila] -= asignacion
-            self.demanda[col] -= asignacion
-
-            # marcar filas/columnas que llegaron a 0 (eliminarlas lógicamente)
-            self._eliminar_fila_o_col_si_cero(i_changed=fila if self.oferta[fila]==0 else None,
-                                              j_changed=col if self.demanda[col]==0 else None)
+            # Realizar asignación (matriz de asignaciones y oferta/demanda) y
+            # retirar lógicamente las filas/columnas que llegaron a 0
+            self._aplicar(fila, col, asignacion)
 
             # Actualizar explicación con el estado posterior
             explicacion_post = f" Estado después: oferta={self.oferta[:]} demanda={self.demanda[:]}."
@@ -254,11 +324,9 @@ class MetodoVogel:
             paso_reg["demanda_posterior"] = self.demanda[:]
 
             # Guardar el paso completo
-            self.pasos.append(paso_reg)
+            registros += 1
+            if guardar:
+                self.pasos.append(paso_reg)
 
             iteraciones += 1
-
-        return {
-            "asignaciones": self.asignaciones,
-            "pasos": self.pasos
-        }
+            yield paso_reg
@@ -1,17 +1,82 @@
 
 from flask import Flask ,render_template
+from flask.json.provider import DefaultJSONProvider
+from app.logic.numerico import valor_json
+from app.utils.cache import crear_cache_desde_entorno
+from app.utils.trabajos import crear_gestor_desde_entorno
+from app.utils.soluciones import crear_almacen_desde_entorno
+from app.utils.metricas import RegistroMetricas, instrumentar, fuente_cache
+from app.utils.serializacion import instalar_compresion
+from app.utils.errores import configurar_logs
+import os
+
+
+class ProveedorJSON(DefaultJSONProvider):
+    """jsonify con soporte de Fraction (modo numerico "fraccion")."""
+
+    @staticmethod
+    def default(o):
+        try:
+            return valor_json(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
 
 def create_app():
+    # errores a errors.<pid>.log rotado, escrito desde un hilo de fondo (una vez por proceso)
+    configurar_logs()
     app = Flask(__name__)
+    app.json = ProveedorJSON(app)
     @app.route("/")
     def home():
         return render_template("resolver.html")
 
+    # cache de resultados compartida por los blueprints (None si está desactivada)
+    app.extensions["cache_resultados"] = crear_cache_desde_entorno()
+    # trabajos asíncronos (persistidos en instance/trabajos salvo TRABAJOS_DIR)
+    app.extensions["trabajos"] = crear_gestor_desde_entorno(os.path.join(app.instance_path, "trabajos"))
+    # soluciones para re-resolver con cambios (/resolver/cambios)
+    app.extensions["soluciones"] = crear_almacen_desde_entorno()
+
+    # métricas por proceso en /metrics (METRICAS=0 las desactiva)
+    endpoints = {
+        "resolver.resolver_vogel": "vogel",
+        "noroeste.resolver_noroeste": "noroeste",
+        "metodos.resolver_costo_minimo": "costo_minimo",
+        "metodos.resolver_russell": "russell",
+        "lote.resolver_batch": "batch",
+        "comparar.resolver_comparar": "comparar",
+        "trabajos.crear_trabajo": "trabajos",
+        "cambios.resolver_cambios": "cambios",
+        "resolver.pasos_resultado": "pasos"
+    }
+    registro = None
+    if os.environ.get("METRICAS", "1") != "0":
+        registro = RegistroMetricas()
+        registro.agregar_fuente(fuente_cache(app.extensions["cache_resultados"]))
+        app.extensions["metricas"] = registro
+        instrumentar(app, registro, endpoints)
+    # gzip/deflate según Accept-Encoding (COMPRESION=0 la desactiva); después de
+    # instrumentar para que su etapa entre en Server-Timing
+    if os.environ.get("COMPRESION", "1") != "0":
+        instalar_compresion(app, registro, endpoints)
 
     # Importar controladores
     from app.controllers.resolver_controller import resolver_bp
     app.register_blueprint(resolver_bp)
     from app.controllers.noroeste_controller import noroeste_bp
     app.register_blueprint(noroeste_bp)
+    from app.controllers.metodos_controller import metodos_bp
+    app.register_blueprint(metodos_bp)
+    from app.controllers.lote_controller import lote_bp
+    app.register_blueprint(lote_bp)
+    from app.controllers.comparar_controller import comparar_bp
+    app.register_blueprint(comparar_bp)
+    from app.controllers.trabajos_controller import trabajos_bp
+    app.register_blueprint(trabajos_bp)
+    from app.controllers.cambios_controller import cambios_bp
+    app.register_blueprint(cambios_bp)
+    from app.controllers.metricas_controller import metricas_bp
+    app.register_blueprint(metricas_bp)
 
     return app
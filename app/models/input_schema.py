@@ -0,0 +1,379 @@
+# app/models/input_schema.py
+#
+# Lectura del problema desde la petición. Además del JSON habitual se aceptan
+# formatos compactos para matrices grandes (decodificados en app/utils/formatters.py):
+#
+#   - cuerpo application/octet-stream o application/x-transporte: binario crudo con
+#     costos, oferta y demanda; las opciones van en la query string.
+#   - cuerpo application/x-npy o text/csv: la matriz de costos; oferta, demanda y
+#     opciones en la query string (?oferta=[...]&demanda=[...]&detalle=resumen).
+#   - multipart/form-data: archivo "costos" (binario, .npy o CSV, según su contenido);
+#     oferta y demanda como campos JSON o archivos .npy/CSV y el resto de opciones
+#     como campos. Werkzeug vuelca los archivos grandes a un temporal, que se mapea
+#     en memoria en lugar de leerse.
+#
+# Siempre se devuelve el mismo dict que el cuerpo JSON, así los controladores
+# validan, cachean y resuelven igual sea cual sea el formato de entrada.
+#
+# leer_archivo() hace lo mismo con archivos en disco (CLI, ver cli.py): JSON (un
+# problema o una lista), CSV con la tabla de transporte completa o el texto de
+# app/tes.txt. Este módulo no importa Flask.
+#
+# validar_problema() comprueba y normaliza costos, oferta y demanda en una sola
+# pasada; los errores son ErrorEntrada con el campo y la posición culpables. Con
+# "numerico": "fraccion" los números se convierten a Fraction (resultados exactos);
+# "tolerancia" fija la tolerancia relativa con la que se comparan cantidades float.
+#
+# validar_cambios() y validar_asignaciones() comprueban la re-resolución en caliente
+# (/resolver/cambios): los cambios sobre un problema ya resuelto y la solución previa.
+
+import json
+import math
+import os
+import re
+from fractions import Fraction
+from app.logic.dispersa import MatrizDispersa
+from app.logic.numerico import MODOS_NUMERICOS, convertir_fraccion, a_fraccion
+from app.utils.formatters import formato_archivo, decodificar_binario, decodificar_npy, decodificar_csv
+
+MIMETYPES_BINARIO = ("application/octet-stream", "application/x-transporte")
+MIMETYPES_NPY = ("application/x-npy",)
+MIMETYPES_CSV = ("text/csv",)
+
+_DECODIFICADORES = {"npy": decodificar_npy, "csv": decodificar_csv}
+
+# extensiones que se buscan al recorrer un directorio de problemas
+EXTENSIONES_ARCHIVO = (".json", ".csv", ".txt")
+
+_NOMBRES_TEXTO = ("costos", "oferta", "demanda")
+_ESPACIO = re.compile(r"\s*")
+_ETIQUETA = re.compile(r"\s*([A-Za-z_]*)")
+
+_NUMEROS = {int, float}
+_COSTOS = {int, float, type(None)}  # None = ruta prohibida
+
+
+class ErrorEntrada(ValueError):
+    """Entrada inválida: mensaje para el usuario, campo y posición ([fila, columna] o índice) del error."""
+
+    def __init__(self, mensaje, campo=None, posicion=None, status=400):
+        super().__init__(mensaje)
+        self.campo = campo
+        self.posicion = posicion
+        self.status = status
+
+    def a_dict(self):
+        """Campos adicionales de la respuesta de error."""
+        datos = {}
+        if self.campo is not None:
+            datos["campo"] = self.campo
+        if self.posicion is not None:
+            datos["posicion"] = self.posicion
+        return datos
+
+
+def _valor_campo(texto):
+    """Valor de un campo de formulario o de la query string: JSON si lo es, si no el texto tal cual."""
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def _opciones(campos):
+    return {clave: _valor_campo(valor) for clave, valor in campos.items()}
+
+
+def _vector(fuente, nombre):
+    """Oferta o demanda desde un archivo .npy o CSV (una fila o una columna)."""
+    formato = formato_archivo(fuente)
+    if formato == "binario":
+        raise ValueError(f"'{nombre}' debe subirse como .npy o CSV; el binario crudo ya incluye oferta y demanda.")
+    valores = _DECODIFICADORES[formato](fuente)
+    if valores and isinstance(valores[0], list):
+        if len(valores) != 1 and any(len(fila) != 1 for fila in valores):
+            raise ValueError(f"'{nombre}' debe tener una sola fila o una sola columna.")
+        valores = [v for fila in valores for v in fila]
+    return valores
+
+
+def _costos(fuente, data):
+    formato = formato_archivo(fuente)
+    if formato == "binario":
+        data["costos"], data["oferta"], data["demanda"] = decodificar_binario(fuente)
+    else:
+        data["costos"] = _DECODIFICADORES[formato](fuente)
+
+
+def leer_problema(req):
+    """
+    Dict del problema (costos, oferta, demanda y opciones) a partir de la petición,
+    sea JSON, binaria o multipart (None si no hay cuerpo). Lanza ErrorEntrada si un
+    archivo no se puede decodificar o si el JSON no es un objeto.
+    """
+    try:
+        data = _leer(req)
+    except ErrorEntrada:
+        raise
+    except ValueError as e:
+        raise ErrorEntrada(str(e))
+    if data is not None and not isinstance(data, dict):
+        raise ErrorEntrada("El cuerpo debe ser un objeto JSON.")
+    return data
+
+
+def _leer(req):
+    mimetype = req.mimetype
+    if mimetype == "multipart/form-data":
+        data = _opciones(req.form)
+        archivo = req.files.get("costos")
+        if archivo is not None:
+            _costos(archivo.stream, data)
+        for nombre in ("oferta", "demanda"):
+            if nombre in req.files:
+                data[nombre] = _vector(req.files[nombre].stream, nombre)
+        return data
+
+    if mimetype in MIMETYPES_BINARIO + MIMETYPES_NPY + MIMETYPES_CSV:
+        data = _opciones(req.args)
+        cuerpo = req.get_data(cache=False)
+        if mimetype in MIMETYPES_BINARIO:
+            data["costos"], data["oferta"], data["demanda"] = decodificar_binario(cuerpo)
+        elif mimetype in MIMETYPES_NPY:
+            data["costos"] = decodificar_npy(cuerpo)
+        else:
+            data["costos"] = decodificar_csv(cuerpo)
+        return data
+
+    # silent: un JSON mal formado o un Content-Type desconocido no deben llegar al
+    # controlador como excepción de Flask (acabarían en un 500)
+    data = req.get_json(silent=True)
+    if data is None and req.get_data():
+        if not req.is_json:
+            raise ErrorEntrada(f"Content-Type no admitido ({mimetype or 'ninguno'}): se espera JSON, binario, "
+                               ".npy, CSV o multipart.", status=415)
+        raise ErrorEntrada("El cuerpo no es un objeto JSON válido.")
+    return data
+
+
+def _tabla_csv(filas):
+    """
+    Tabla de transporte en CSV: una fila por origen con sus costos y la oferta en
+    la última columna, y una última fila con la demanda de cada destino.
+    """
+    if len(filas) < 2:
+        raise ValueError("El CSV debe tener las filas de costos (con la oferta al final) y la fila de demanda.")
+    *cuerpo, demanda = filas
+    while demanda and demanda[-1] is None:  # celda vacía bajo la columna de oferta
+        demanda.pop()
+    return {"costos": [fila[:-1] for fila in cuerpo], "oferta": [fila[-1] for fila in cuerpo], "demanda": demanda}
+
+
+def _texto_etiquetado(texto):
+    """
+    Formato de app/tes.txt: listas JSON, cada una seguida opcionalmente de su nombre
+    (costos, oferta o demanda); las que no lo llevan se toman en ese orden.
+    """
+    decodificador = json.JSONDecoder()
+    pendientes = list(_NOMBRES_TEXTO)
+    data = {}
+    pos = 0
+    while True:
+        pos = _ESPACIO.match(texto, pos).end()
+        if pos == len(texto):
+            return data
+        try:
+            valor, pos = decodificador.raw_decode(texto, pos)
+        except ValueError:
+            raise ValueError(f"Texto inválido en la posición {pos}: se esperaba una lista JSON.")
+        etiqueta = _ETIQUETA.match(texto, pos)
+        pos = etiqueta.end()
+        nombre = etiqueta.group(1) or (pendientes[0] if pendientes else "")
+        if nombre not in pendientes:
+            raise ValueError(f"Nombre inesperado o repetido en el texto: {nombre!r}; se esperan {list(_NOMBRES_TEXTO)}.")
+        pendientes.remove(nombre)
+        data[nombre] = valor
+
+
+def leer_archivo(ruta):
+    """
+    Problemas de un archivo como lista de (entrada, dict del problema). La entrada
+    es la ruta, con "#k" si el archivo JSON trae una lista de problemas. Lanza
+    ErrorEntrada si el archivo no se puede leer o decodificar.
+    """
+    try:
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == ".json":
+            with open(ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+            if isinstance(datos, list):
+                return [(f"{ruta}#{k}", problema) for k, problema in enumerate(datos)]
+            return [(ruta, datos)]
+        if extension == ".csv":
+            with open(ruta, "rb") as f:
+                return [(ruta, _tabla_csv(decodificar_csv(f)))]
+        with open(ruta, encoding="utf-8") as f:
+            return [(ruta, _texto_etiquetado(f.read()))]
+    except ErrorEntrada:
+        raise
+    except (OSError, ValueError) as e:
+        raise ErrorEntrada(f"{ruta}: {e}")
+
+
+def _valor_invalido(valores, tipos):
+    """Índice y mensaje del primer valor no válido (camino lento, sólo para informar el error)."""
+    for k, v in enumerate(valores):
+        if type(v) not in tipos:
+            return k, f"valor no numérico {v!r}"
+        if v is not None and not math.isfinite(v):
+            return k, f"valor no finito {v!r}"
+        if v is not None and v < 0 and tipos is _NUMEROS:
+            return k, f"valor negativo {v!r}"
+    return None
+
+
+def _validar_vector(valores, campo):
+    if not isinstance(valores, list):
+        raise ErrorEntrada(f"'{campo}' debe ser una lista.", campo)
+    # set(map(type, ...)), min y sum recorren la lista en C; NaN o inf hacen no finita la suma
+    tipos = set(map(type, valores))
+    if not tipos <= _NUMEROS or min(valores, default=0) < 0 or (float in tipos and not math.isfinite(sum(valores))):
+        invalido = _valor_invalido(valores, _NUMEROS)
+        if invalido is not None:  # None: la suma sólo desbordó
+            k, motivo = invalido
+            raise ErrorEntrada(f"'{campo}' debe contener números no negativos: {motivo} en la posición {k}.", campo, k)
+    if sum(valores) <= 0:
+        raise ErrorEntrada(f"El total de '{campo}' debe ser positivo.", campo)
+
+
+def _validar_costos(costos, filas, columnas):
+    if not isinstance(costos, list):
+        raise ErrorEntrada("'costos' debe ser una lista de filas.", "costos")
+    if len(costos) != filas:
+        raise ErrorEntrada("Las filas de 'costos' deben coincidir con el tamaño de 'oferta'.", "costos")
+    for i, fila in enumerate(costos):
+        if not isinstance(fila, list) or len(fila) != columnas:
+            raise ErrorEntrada("Todas las filas de 'costos' deben coincidir con el tamaño de 'demanda'.", "costos", i)
+        tipos = set(map(type, fila))
+        # filter(None, ...) descarta None (y ceros, que no cambian la suma)
+        if not tipos <= _COSTOS or (float in tipos and not math.isfinite(sum(filter(None, fila)))):
+            invalido = _valor_invalido(fila, _COSTOS)
+            if invalido is not None:
+                j, motivo = invalido
+                raise ErrorEntrada(f"'costos' debe contener números o null: {motivo} en la celda ({i}, {j}).",
+                                   "costos", [i, j])
+
+
+def validar_problema(data, dispersos=True):
+    """
+    Valida en una pasada las dimensiones, los tipos numéricos (bool y texto no son
+    números), que oferta y demanda sean no negativas con total positivo y que los
+    costos sean finitos o null. Devuelve (costos, oferta, demanda) en la
+    representación de los solvers: las mismas listas recibidas (sin copiar) o, con
+    `costos_dispersos` (si dispersos=True), una MatrizDispersa. Lanza ErrorEntrada.
+
+    Los costos pueden ser negativos (p. ej. para maximizar con costos negados).
+    Con numerico == "fraccion" los float se devuelven como Fraction.
+    """
+    numerico = data.get("numerico", "auto")
+    if numerico not in MODOS_NUMERICOS:
+        raise ErrorEntrada(f"numerico debe ser uno de {list(MODOS_NUMERICOS)}.", "numerico")
+    tolerancia = data.get("tolerancia")
+    if tolerancia is not None and (type(tolerancia) not in _NUMEROS or not 0 <= tolerancia < 1):
+        raise ErrorEntrada("'tolerancia' debe ser un número en [0, 1) (relativa a la mayor cantidad).", "tolerancia")
+
+    oferta = data.get("oferta")
+    demanda = data.get("demanda")
+    _validar_vector(oferta, "oferta")
+    _validar_vector(demanda, "demanda")
+
+    costos_dispersos = data.get("costos_dispersos") if dispersos else None
+    if costos_dispersos is not None:
+        try:
+            costos = MatrizDispersa.desde_json(costos_dispersos, len(oferta), len(demanda))
+        except ValueError as e:
+            raise ErrorEntrada(str(e), "costos_dispersos")
+    else:
+        costos = data.get("costos")
+        _validar_costos(costos, len(oferta), len(demanda))
+    if numerico == "fraccion":
+        return convertir_fraccion(costos, oferta, demanda)
+    return costos, oferta, demanda
+
+
+def _indice(valor, limite):
+    return type(valor) is int and 0 <= valor < limite
+
+
+def validar_cambios(cambios, oferta, demanda):
+    """
+    Valida los cambios de /resolver/cambios sobre el problema de `oferta` y `demanda`
+    ya validados: {"costos": [[fila, columna, costo o null]], "oferta": [[fila, valor]],
+    "demanda": [[columna, valor]]}, todas las claves opcionales. Lanza ErrorEntrada
+    con la clave y la posición (índice dentro de esa lista) del cambio inválido, o si
+    tras los cambios el total de oferta o de demanda deja de ser positivo.
+    """
+    filas = len(oferta)
+    columnas = len(demanda)
+    if not isinstance(cambios, dict):
+        raise ErrorEntrada("'cambios' debe ser un objeto con 'costos', 'oferta' y/o 'demanda'.", "cambios")
+    desconocidas = set(cambios) - {"costos", "oferta", "demanda"}
+    if desconocidas:
+        raise ErrorEntrada(f"Claves desconocidas en 'cambios': {sorted(desconocidas)}.", "cambios")
+
+    for nombre, campos in (("costos", "[fila, columna, costo]"), ("oferta", "[fila, valor]"),
+                           ("demanda", "[columna, valor]")):
+        if not isinstance(cambios.get(nombre, []), list):
+            raise ErrorEntrada(f"'cambios.{nombre}' debe ser una lista de {campos}.", f"cambios.{nombre}")
+
+    for k, cambio in enumerate(cambios.get("costos", [])):
+        if not isinstance(cambio, list) or len(cambio) != 3:
+            raise ErrorEntrada("Cada cambio de 'costos' debe ser [fila, columna, costo].", "cambios.costos", k)
+        i, j, costo = cambio
+        if not _indice(i, filas) or not _indice(j, columnas):
+            raise ErrorEntrada(f"Celda ({i}, {j}) fuera del problema de {filas}x{columnas}.", "cambios.costos", k)
+        if _valor_invalido([costo], _COSTOS) is not None:
+            raise ErrorEntrada(f"El costo debe ser un número finito o null: {costo!r}.", "cambios.costos", k)
+
+    for nombre, valores in (("oferta", oferta), ("demanda", demanda)):
+        limite = len(valores)
+        for k, cambio in enumerate(cambios.get(nombre, [])):
+            if not isinstance(cambio, list) or len(cambio) != 2:
+                raise ErrorEntrada(f"Cada cambio de '{nombre}' debe ser [índice, valor].", f"cambios.{nombre}", k)
+            indice, valor = cambio
+            if not _indice(indice, limite):
+                raise ErrorEntrada(f"Índice {indice!r} fuera de '{nombre}' (tamaño {limite}).", f"cambios.{nombre}", k)
+            if _valor_invalido([valor], _NUMEROS) is not None:
+                raise ErrorEntrada(f"'{nombre}' debe ser un número no negativo: {valor!r}.", f"cambios.{nombre}", k)
+        # el último cambio de cada índice es el que vale
+        nuevos = dict(cambios.get(nombre, []))
+        if sum(valores) + sum(v - valores[k] for k, v in nuevos.items()) <= 0:
+            raise ErrorEntrada(f"Con los cambios, el total de '{nombre}' debe seguir siendo positivo.", f"cambios.{nombre}")
+
+
+def validar_asignaciones(asignaciones, numerico="auto"):
+    """
+    Tipos de las asignaciones de una solución previa: lista de filas de números no
+    negativos. Con numerico == "fraccion" se aceptan también los textos "p/q" que
+    devuelve la API y todo se convierte a Fraction. Devuelve las asignaciones (una
+    copia: la reparación las modifica). Las dimensiones y sumas se comprueban contra
+    el problema balanceado (ver app/logic/cambios.py).
+    """
+    if not isinstance(asignaciones, list) or not all(isinstance(fila, list) for fila in asignaciones):
+        raise ErrorEntrada("'asignaciones' debe ser una lista de filas.", "asignaciones")
+    copia = []
+    for i, fila in enumerate(asignaciones):
+        if numerico == "fraccion":
+            try:
+                fila = [Fraction(v) if type(v) is str else a_fraccion(v) for v in fila]
+            except (ValueError, ZeroDivisionError):
+                raise ErrorEntrada("'asignaciones' tiene un texto que no es una fracción \"p/q\".", "asignaciones", i)
+            tipos = _NUMEROS | {Fraction}
+        else:
+            tipos = _NUMEROS
+        for j, v in enumerate(fila):
+            if type(v) not in tipos or not math.isfinite(v) or v < 0:
+                raise ErrorEntrada(f"'asignaciones' debe contener números no negativos: {v!r} en la celda ({i}, {j}).",
+                                   "asignaciones", [i, j])
+        copia.append(list(fila))
+    return copia
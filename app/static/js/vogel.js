@@ -19,7 +19,9 @@ async function ejecutarResolucion() {
 	const metodo = document.getElementById("metodo").value;
 	const endpointMap = {
 		"vogel": "/resolver/vogel",
-		"noroeste": "/resolver/noroeste"
+		"noroeste": "/resolver/noroeste",
+		"costo_minimo": "/resolver/costo_minimo",
+		"russell": "/resolver/russell"
 	};
 	const endpoint = endpointMap[metodo];
 
@@ -32,15 +34,27 @@ async function ejecutarResolucion() {
 	const timeoutMs = 30000; // 30s
 	const timeoutId = setTimeout(() => controller.abort(), timeoutMs);
 
+	// Streaming: los pasos se muestran a medida que el backend los produce (NDJSON)
+	const streaming = !!(document.getElementById("stream") || {}).checked;
+	const peticion = {costos, oferta, demanda, optimizar: !!(document.getElementById("optimizar") || {}).checked};
+	if (streaming) peticion.stream = "ndjson";
+	// Vogel sin streaming: los pasos quedan en el servidor y se piden por páginas
+	else if (metodo === "vogel") peticion.pasos_en_servidor = true;
+
 	try {
 		const res = await fetch(endpoint, {
 			method: "POST",
 			headers: {"Content-Type":"application/json"},
-			body: JSON.stringify({costos, oferta, demanda}),
+			body: JSON.stringify(peticion),
 			signal: controller.signal
 		});
 		clearTimeout(timeoutId);
 
+		if (streaming && res.ok) {
+			await consumirStream(res, costos, oferta, demanda);
+			return;
+		}
+
 		let data;
 		try {
 			data = await res.json();
@@ -53,34 +67,11 @@ async function ejecutarResolucion() {
 		resultadoDiv.innerHTML = "";
 
 		if (!res.ok) {
-			const msg = data.error || 'Error';
-			const code = data.code ? ` (Código: ${data.code})` : '';
-			const detalleHtml = data.detalle ? `<pre style="color:#ddd;background:#222;padding:8px;border-radius:6px;margin-top:8px;">${String(data.detalle)}</pre>` : '';
-			resultadoDiv.innerHTML = `<p style="color:red">❌ Backend${code}: ${msg}</p>${detalleHtml}`;
+			mostrarErrorBackend(data);
 			return;
 		}
 
-		// Si hubo balanceo, avisar al usuario
-		if (data.meta_balance && data.meta_balance.tipo !== "balanceado") {
-			const info = document.createElement("p");
-			info.style.color = "#7a5cff";
-			info.innerHTML = `ℹ️ Se aplicó balanceo automático: <strong>${data.meta_balance.tipo}</strong> (se añadió ${data.meta_balance.diferencia}).`;
-			resultadoDiv.appendChild(info);
-		}
-
-		// Crear tabla visual con posibles labels ficticias
-		const tablaDiv = document.getElementById("tabla-visual");
-		tablaDiv.innerHTML = "";
-		const costosBalanceados = reconstruirCostosBalanceados(costos, data.meta_balance);
-		const ofertaBalanceada = reconstruirArrayBalanceado(oferta, data.meta_balance, "oferta");
-		const demandaBalanceada = reconstruirArrayBalanceado(demanda, data.meta_balance, "demanda");
-
-		// Pasamos también las asignaciones recibidas para que la tabla muestre "cómo quedó" todo
-		const tabla = crearTablaVisual(costosBalanceados, ofertaBalanceada, demandaBalanceada, data.meta_balance, data.asignaciones);
-		tablaDiv.appendChild(tabla);
-
-		// Mostrar pasos y resaltar según el flujo ya existente
-		mostrarPasos(data, costosBalanceados);
+		renderRespuesta(data, costos, oferta, demanda);
 	} catch (err) {
 		clearTimeout(timeoutId);
 		if (err.name === 'AbortError') {
@@ -96,6 +87,95 @@ async function ejecutarResolucion() {
 	}
 }
 
+function mostrarErrorBackend(data) {
+	const resultadoDiv = document.getElementById("resultado");
+	const msg = data.error || 'Error';
+	const code = data.code ? ` (Código: ${data.code})` : '';
+	const detalleHtml = data.detalle ? `<pre style="color:#ddd;background:#222;padding:8px;border-radius:6px;margin-top:8px;">${String(data.detalle)}</pre>` : '';
+	resultadoDiv.innerHTML = `<p style="color:red">❌ Backend${code}: ${msg}</p>${detalleHtml}`;
+}
+
+// --- lectura progresiva de la respuesta NDJSON: un evento JSON por línea ---
+async function consumirStream(res, costos, oferta, demanda) {
+	const resultadoDiv = document.getElementById("resultado");
+	resultadoDiv.innerHTML = "";
+	const progreso = document.createElement("div");
+	progreso.id = "pasos-detallados";
+	progreso.style.marginTop = "12px";
+	resultadoDiv.appendChild(progreso);
+
+	// se acumulan pasos y HTML para el render final con el flujo de siempre
+	const data = { pasos: [], pasos_html: [] };
+	const procesar = (linea) => {
+		if (!linea.trim()) return;
+		const evento = JSON.parse(linea);
+		if (evento.tipo === "paso") {
+			data.pasos.push(evento.paso);
+			if (evento.html) {
+				data.pasos_html.push(evento.html);
+				const wrapper = document.createElement("div");
+				wrapper.innerHTML = evento.html;
+				progreso.appendChild(wrapper);
+			} else {
+				progreso.textContent = `Pasos recibidos: ${data.pasos.length}`;
+			}
+		} else if (evento.tipo === "fin") {
+			Object.assign(data, evento);
+			renderRespuesta(data, costos, oferta, demanda);
+		} else if (evento.tipo === "error") {
+			mostrarErrorBackend(evento);
+		}
+	};
+
+	const reader = res.body.getReader();
+	const decoder = new TextDecoder();
+	let buffer = "";
+	while (true) {
+		const { value, done } = await reader.read();
+		if (done) break;
+		buffer += decoder.decode(value, { stream: true });
+		const lineas = buffer.split("\n");
+		buffer = lineas.pop();
+		lineas.forEach(procesar);
+	}
+	procesar(buffer + decoder.decode());
+}
+
+// --- render de la respuesta completa (JSON normal o trailer "fin" del stream) ---
+function renderRespuesta(data, costos, oferta, demanda) {
+	const resultadoDiv = document.getElementById("resultado");
+
+	// Si hubo balanceo, avisar al usuario
+	if (data.meta_balance && data.meta_balance.tipo !== "balanceado") {
+		const info = document.createElement("p");
+		info.style.color = "#7a5cff";
+		info.innerHTML = `ℹ️ Se aplicó balanceo automático: <strong>${data.meta_balance.tipo}</strong> (se añadió ${data.meta_balance.diferencia}).`;
+		resultadoDiv.appendChild(info);
+	}
+
+	// Si se pidió optimización MODI, mostrar costo antes / después
+	if (data.optimizacion) {
+		const opt = document.createElement("p");
+		opt.style.color = "#2e7d32";
+		opt.innerHTML = `✔️ Optimización MODI: costo inicial <strong>${data.optimizacion.costo_inicial}</strong> → costo final <strong>${data.optimizacion.costo_final}</strong> (${data.optimizacion.iteraciones} iteraciones).`;
+		resultadoDiv.appendChild(opt);
+	}
+
+	// Crear tabla visual con posibles labels ficticias
+	const tablaDiv = document.getElementById("tabla-visual");
+	tablaDiv.innerHTML = "";
+	const costosBalanceados = reconstruirCostosBalanceados(costos, data.meta_balance);
+	const ofertaBalanceada = reconstruirArrayBalanceado(oferta, data.meta_balance, "oferta");
+	const demandaBalanceada = reconstruirArrayBalanceado(demanda, data.meta_balance, "demanda");
+
+	// Pasamos también las asignaciones recibidas para que la tabla muestre "cómo quedó" todo
+	const tabla = crearTablaVisual(costosBalanceados, ofertaBalanceada, demandaBalanceada, data.meta_balance, data.asignaciones);
+	tablaDiv.appendChild(tabla);
+
+	// Mostrar pasos y resaltar según el flujo ya existente
+	mostrarPasos(data, costosBalanceados);
+}
+
 // --- helpers para reconstruir localmente (si no quieres solicitarlos al backend) ---
 function reconstruirCostosBalanceados(costos, meta) {
     // Hace copia y añade fila/col de ceros si meta indica balanceo
@@ -731,6 +811,12 @@ function mostrarPasos(data, costos) {
         renderDistribucionVisual(costos || [], data.asignaciones, data.meta_balance || null);
     }
 
+    // pasos guardados en el servidor: se piden por páginas a medida que se necesitan
+    if (data && data.id_solucion) {
+        mostrarPasosPaginados(data, costos, resultadoDiv);
+        return;
+    }
+
     // 1) Mostrar tablas HTML detalladas por paso (las genera el backend en pasos_html)
     if (data && Array.isArray(data.pasos_html) && data.pasos_html.length > 0) {
         const pasosContainer = document.createElement("div");
@@ -781,6 +867,71 @@ function mostrarPasos(data, costos) {
     }
 }
 
+// ===== Pasos por páginas (/resolver/<id>/pasos) =====
+const PASOS_POR_PAGINA = 20;
+
+async function cargarPaginaPasos(id, desde, formato) {
+    const hasta = desde + PASOS_POR_PAGINA - 1;
+    const res = await fetch(`/resolver/${id}/pasos?desde=${desde}&hasta=${hasta}&formato=${formato}`);
+    if (!res.ok) throw await res.json();
+    return formato === "html" ? res.text() : res.json();
+}
+
+function mostrarPasosPaginados(data, costos, resultadoDiv) {
+    const pasosContainer = document.createElement("div");
+    pasosContainer.id = "pasos-detallados";
+    pasosContainer.style.marginTop = "12px";
+    const seq = document.createElement("div");
+    seq.classList.add("steps-sequence");
+    const boton = document.createElement("button");
+    boton.type = "button";
+    resultadoDiv.appendChild(pasosContainer);
+    resultadoDiv.appendChild(boton);
+    resultadoDiv.appendChild(seq);
+
+    if (!data.num_pasos) {
+        boton.style.display = "none";
+        pasosContainer.innerHTML = '<p style="color:#666">No hay pasos a mostrar.</p>';
+        return;
+    }
+
+    // data.pasos crece con cada página: el overlay recorre los pasos ya cargados
+    data.pasos = [];
+    let siguiente = 1;
+    const cargar = async () => {
+        boton.disabled = true;
+        try {
+            const [html, pagina] = await Promise.all([
+                cargarPaginaPasos(data.id_solucion, siguiente, "html"),
+                cargarPaginaPasos(data.id_solucion, siguiente, "json")
+            ]);
+            const wrapper = document.createElement("div");
+            wrapper.innerHTML = html;
+            pasosContainer.appendChild(wrapper);
+            const primera = data.pasos.length === 0;
+            data.pasos.push(...pagina.pasos);
+            siguiente = pagina.hasta + 1;
+            if (primera) {
+                const maxSteps = Math.min(8, data.pasos.length);
+                for (let k = 0; k < maxSteps; k++) {
+                    seq.appendChild(renderStepVisual(data.pasos[k], costos || [], data.meta_balance || null, k + 1));
+                }
+                openStepOverlay(data.pasos, costos, data.meta_balance);
+            }
+        } catch (err) {
+            const msg = document.createElement("p");
+            msg.style.color = "red";
+            msg.textContent = `❌ No se pudieron cargar los pasos${err && err.code ? ` (Código: ${err.code})` : ''}: ${(err && (err.error || err.message)) || err}`;
+            pasosContainer.appendChild(msg);
+        }
+        boton.disabled = false;
+        boton.textContent = `Cargar más pasos (${siguiente - 1} de ${data.num_pasos})`;
+        boton.style.display = siguiente > data.num_pasos ? "none" : "";
+    };
+    boton.addEventListener("click", cargar);
+    cargar();
+}
+
 // ===== Nuevo: render preview de la matriz ingresada (formato C1..Cn, P1..Pm, OF., DEM, Penal Col) =====
 function renderInputPreview(rawCostos, rawOferta, rawDemanda) {
     const preview = document.getElementById("input-preview");
@@ -1,37 +1,59 @@
 # app/utils/balanceador.py
 
-def balancear(costos, oferta, demanda):
+from app.logic.dispersa import es_dispersa
+from app.logic.ficticia import MatrizConFicticia
+from app.logic.numerico import tolerancia_absoluta
+
+
+def balancear(costos, oferta, demanda, tolerancia=None):
     """
     Balancea el problema de transporte agregando una fila o columna ficticia
     con costo 0 si la suma de oferta y demanda no coincide.
 
+    La matriz densa no se copia: con línea ficticia se devuelve una
+    MatrizConFicticia (vista de la original con la fila o columna de ceros
+    virtual) y, si ya está balanceada, la misma lista. Los solvers no escriben
+    en los costos. Con una MatrizDispersa la línea ficticia se agrega como
+    rutas (todas permitidas) sobre una copia que cuesta O(rutas), no O(m·n).
+
+    Con cantidades float, totales que difieren en no más de la tolerancia
+    (`tolerancia` relativa, ver app/logic/numerico.py) se consideran iguales: una
+    línea ficticia por un residuo de redondeo sólo agregaría pasos espurios.
+
     Devuelve: (costos_nuevos, oferta_nueva, demanda_nueva, meta_info)
     meta_info: dict con keys:
       - tipo: "balanceado", "columna_ficticia", "fila_ficticia"
       - diferencia: cantidad añadida (0 si balanceado)
     """
-    # Hacer copias para no mutar entradas externas
-    costos = [fila[:] for fila in costos]
+    # oferta y demanda se copian para no mutar las entradas (los solvers las consumen)
+    disperso = es_dispersa(costos)
     oferta = oferta[:]
     demanda = demanda[:]
 
     sum_oferta = sum(oferta)
     sum_demanda = sum(demanda)
+    tol = tolerancia_absoluta(oferta + demanda, tolerancia)
 
-    if sum_oferta > sum_demanda:
+    if sum_oferta - sum_demanda > tol:
         diferencia = sum_oferta - sum_demanda
         # agregar columna ficticia (costos 0)
-        for fila in costos:
-            fila.append(0)
+        if disperso:
+            costos = costos.copia()
+            costos.agregar_columna(0)
+        else:
+            costos = MatrizConFicticia(costos, len(demanda), columna_ficticia=True)
         demanda.append(diferencia)
         meta = {"tipo": "columna_ficticia", "diferencia": diferencia}
         return costos, oferta, demanda, meta
 
-    elif sum_demanda > sum_oferta:
+    elif sum_demanda - sum_oferta > tol:
         diferencia = sum_demanda - sum_oferta
         # agregar fila ficticia (costos 0)
-        nueva_fila = [0] * len(demanda)
-        costos.append(nueva_fila)
+        if disperso:
+            costos = costos.copia()
+            costos.agregar_fila(0)
+        else:
+            costos = MatrizConFicticia(costos, len(demanda), fila_ficticia=True)
         oferta.append(diferencia)
         meta = {"tipo": "fila_ficticia", "diferencia": diferencia}
         return costos, oferta, demanda, meta
@@ -0,0 +1,199 @@
+# app/utils/cache.py
+
+from collections import OrderedDict
+from flask import Response
+from app.logic.numerico import valor_json
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def clave_problema(metodo, costos, oferta, demanda, **opciones):
+    """
+    Hash canónico del problema: mismo método, datos y opciones de respuesta dan la
+    misma clave sin importar el orden de las claves ni los espacios del JSON recibido.
+    """
+    canonico = json.dumps(
+        {"metodo": metodo, "costos": costos, "oferta": oferta, "demanda": demanda, "opciones": opciones},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=valor_json
+    )
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+
+class BackendSQLite:
+    """
+    Almacén compartido en un archivo SQLite local, para que varios workers de gunicorn
+    vean los mismos resultados. Aplica su propio límite LRU (por último uso).
+    """
+
+    def __init__(self, ruta, max_entradas=1024, max_bytes=256 * 1024 * 1024):
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " clave TEXT PRIMARY KEY, valor BLOB NOT NULL, tam INTEGER NOT NULL,"
+                " expira REAL, usado REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS resultados_usado ON resultados(usado)")
+
+    def _conectar(self):
+        # una conexión por operación: sqlite3 no comparte conexiones entre hilos
+        return sqlite3.connect(self.ruta, timeout=5)
+
+    def obtener(self, clave):
+        ahora = time.time()
+        with self._conectar() as con:
+            fila = con.execute("SELECT valor, expira FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                return None
+            valor, expira = fila
+            if expira is not None and expira <= ahora:
+                con.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                return None
+            con.execute("UPDATE resultados SET usado = ? WHERE clave = ?", (ahora, clave))
+            return valor, expira
+
+    def guardar(self, clave, valor, expira=None):
+        with self._conectar() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO resultados (clave, valor, tam, expira, usado) VALUES (?, ?, ?, ?, ?)",
+                (clave, sqlite3.Binary(valor), len(valor), expira, time.time())
+            )
+            self._expulsar(con)
+
+    def _expulsar(self, con):
+        con.execute("DELETE FROM resultados WHERE expira IS NOT NULL AND expira <= ?", (time.time(),))
+        entradas, total = con.execute("SELECT COUNT(*), COALESCE(SUM(tam), 0) FROM resultados").fetchone()
+        if entradas <= self.max_entradas and total <= self.max_bytes:
+            return
+        # borrar las menos usadas hasta volver a los límites
+        sobrantes = []
+        for clave, tam in con.execute("SELECT clave, tam FROM resultados ORDER BY usado"):
+            if entradas <= self.max_entradas and total <= self.max_bytes:
+                break
+            sobrantes.append((clave,))
+            entradas -= 1
+            total -= tam
+        con.executemany("DELETE FROM resultados WHERE clave = ?", sobrantes)
+
+    def limpiar(self):
+        with self._conectar() as con:
+            con.execute("DELETE FROM resultados")
+
+
+class CacheResultados:
+    """
+    Cache LRU en memoria de respuestas ya serializadas (bytes JSON), acotada por número
+    de entradas y por bytes, con TTL opcional. Si se da un `backend` compartido
+    (BackendSQLite) se consulta cuando falla la memoria local y se escribe en ambos.
+    """
+
+    def __init__(self, max_entradas=256, max_bytes=64 * 1024 * 1024, ttl=None, backend=None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend
+        self._datos = OrderedDict()  # clave -> (valor, expira)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave):
+        ahora = time.time()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None:
+                valor, expira = entrada
+                if expira is None or expira > ahora:
+                    self._datos.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                self._quitar(clave)
+
+        if self.backend is not None:
+            entrada = self.backend.obtener(clave)
+            if entrada is not None:
+                valor, expira = entrada
+                valor = bytes(valor)
+                with self._lock:
+                    self.aciertos += 1
+                    self._insertar(clave, valor, expira)
+                return valor
+
+        with self._lock:
+            self.fallos += 1
+        return None
+
+    def guardar(self, clave, valor):
+        """Guarda `valor` bajo `clave`; devuelve False si no se guardó."""
+        # una respuesta mayor que todo el presupuesto de memoria no se cachea
+        if len(valor) > self.max_bytes:
+            return False
+        expira = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._insertar(clave, valor, expira)
+        if self.backend is not None:
+            self.backend.guardar(clave, valor, expira)
+        return True
+
+    def _insertar(self, clave, valor, expira):
+        if clave in self._datos:
+            self._quitar(clave)
+        self._datos[clave] = (valor, expira)
+        self._bytes += len(valor)
+        while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+            antigua = next(iter(self._datos))
+            self._quitar(antigua)
+            self.expulsiones += 1
+
+    def _quitar(self, clave):
+        valor, _ = self._datos.pop(clave)
+        self._bytes -= len(valor)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+        if self.backend is not None:
+            self.backend.limpiar()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+                "compartido": self.backend is not None
+            }
+
+
+def crear_cache_desde_entorno():
+    """
+    Cache configurada por variables de entorno:
+    CACHE_RESULTADOS=0 la desactiva; CACHE_MAX_ENTRADAS, CACHE_MAX_MB y CACHE_TTL
+    (segundos) fijan los límites; CACHE_SQLITE=<ruta> activa el almacén compartido.
+    """
+    if os.environ.get("CACHE_RESULTADOS", "1") in ("0", "false", "False"):
+        return None
+    max_entradas = int(os.environ.get("CACHE_MAX_ENTRADAS", 256))
+    max_bytes = int(float(os.environ.get("CACHE_MAX_MB", 64)) * 1024 * 1024)
+    ttl = float(os.environ["CACHE_TTL"]) if os.environ.get("CACHE_TTL") else None
+    backend = None
+    if os.environ.get("CACHE_SQLITE"):
+        backend = BackendSQLite(os.environ["CACHE_SQLITE"], max_entradas * 4, max_bytes * 4)
+    return CacheResultados(max_entradas, max_bytes, ttl, backend)
+
+
+def respuesta_cacheada(valor):
+    """Respuesta JSON a partir de los bytes guardados en la cache."""
+    return Response(valor, mimetype="application/json", headers={"X-Cache": "HIT"})
@@ -0,0 +1,184 @@
+# app/utils/errores.py
+#
+# Registro de errores internos. Cada controlador llamaba a logging.basicConfig al
+# importarse: el logger raíz escribía de forma síncrona en errors.log (sin rotar)
+# desde el hilo de la petición, y como raíz también recogía el log de accesos de
+# werkzeug. Ahora:
+#
+#   - los errores van al logger "app" (el de todos los módulos app.*), no al raíz;
+#   - el hilo de la petición sólo formatea y encola (QueueHandler); un hilo de
+#     fondo (QueueListener) escribe en un RotatingFileHandler;
+#   - un mismo traceback repetido dentro de una ventana se escribe completo una
+#     sola vez: las repeticiones dejan una línea corta con su código y la firma;
+#   - cada línea lleva "code=<código>", el mismo que devuelve _error_response,
+#     para poder buscarlo con grep.
+#
+# Se configura una vez por proceso desde create_app (configurar_logs). Cada
+# archivo tiene un solo escritor: con varios workers (Procfile: gunicorn con 2),
+# dos RotatingFileHandler sobre el mismo errors.log rotarían cada uno por su
+# cuenta y se pisarían registros. Por eso, con la rotación interna (por defecto)
+# cada proceso escribe en su propio archivo, con el pid en el nombre
+# (errors.<pid>.log; "{pid}" en LOG_ARCHIVO indica dónde). Con
+# LOG_ROTACION=externa todos añaden al mismo archivo con un WatchedFileHandler,
+# que lo reabre cuando logrotate (o similar) lo rota. Los hijos de un pool
+# creados con fork escriben directamente (sin cola, su copia del hilo de fondo no
+# existe) con el mismo criterio; fuera de la app (CLI) los errores salen por
+# stderr como antes.
+
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger("app")
+
+FORMATO = "%(asctime)s %(levelname)s code=%(code)s %(message)s"
+
+# "interna": RotatingFileHandler, un archivo por proceso; "externa": WatchedFileHandler
+# sobre un archivo compartido que rota una herramienta externa
+ROTACIONES = ("interna", "externa")
+
+# firmas de traceback recordadas como mucho (se olvidan primero las más antiguas)
+MAX_FIRMAS = 1024
+
+_listener = None
+_lock = threading.Lock()
+
+
+def registrar_error(error_id, detalle):
+    """Registra el detalle (normalmente un traceback) de un error devuelto al cliente con `error_id`."""
+    logger.error("Error %s: %s", error_id, detalle, extra={"code": error_id, "detalle": str(detalle)})
+
+
+class FiltroCodigo(logging.Filter):
+    """Da a todo registro un campo `code` ("-" si no es de registrar_error) para el formato."""
+
+    def filter(self, record):
+        if not hasattr(record, "code"):
+            record.code = "-"
+        return True
+
+
+class MuestreoTracebacks(logging.Filter):
+    """
+    Dentro de `ventana` segundos, sólo la primera aparición de un mismo detalle se
+    registra completa; las siguientes se reducen a una línea con su código, la
+    firma del traceback y cuántas van. Nunca descarta registros.
+    """
+
+    def __init__(self, ventana=60.0):
+        super().__init__()
+        self.ventana = ventana
+        self._vistos = {}  # firma -> [inicio de la ventana, repeticiones]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        detalle = getattr(record, "detalle", None)
+        if detalle is None:
+            return True
+        firma = hashlib.sha1(detalle.encode("utf-8", "replace")).hexdigest()[:12]
+        record.firma = firma
+        ahora = time.monotonic()
+        with self._lock:
+            visto = self._vistos.get(firma)
+            if visto is None or ahora - visto[0] > self.ventana:
+                anteriores = visto[1] if visto is not None else 0
+                self._vistos.pop(firma, None)
+                self._vistos[firma] = [ahora, 0]
+                if len(self._vistos) > MAX_FIRMAS:
+                    del self._vistos[next(iter(self._vistos))]
+                if anteriores:
+                    record.msg = "Error %s (firma %s; %d repeticiones en la ventana anterior): %s"
+                    record.args = (record.code, firma, anteriores, detalle)
+                else:
+                    record.msg = "Error %s (firma %s): %s"
+                    record.args = (record.code, firma, detalle)
+                return True
+            visto[1] += 1
+            repeticiones = visto[1]
+        record.msg = "Error %s: traceback repetido (firma %s, repetición %d en %gs)"
+        record.args = (record.code, firma, repeticiones, self.ventana)
+        record.detalle = None
+        return True
+
+
+def _ruta_archivo(plantilla, rotacion="interna"):
+    """
+    Archivo de log del proceso: con rotación interna, la plantilla con "{pid}"
+    sustituido (o el pid antes de la extensión si no lo lleva); con externa, tal cual.
+    """
+    if rotacion == "externa":
+        return plantilla
+    pid = os.getpid()
+    if "{pid}" in plantilla:
+        return plantilla.replace("{pid}", str(pid))
+    base, extension = os.path.splitext(plantilla)
+    return f"{base}.{pid}{extension}"
+
+
+def _manejador_archivo(plantilla, rotacion, max_bytes, respaldos):
+    archivo = _ruta_archivo(plantilla, rotacion)
+    if rotacion == "externa":
+        manejador = WatchedFileHandler(archivo, encoding="utf-8", delay=True)
+    else:
+        manejador = RotatingFileHandler(archivo, maxBytes=max_bytes, backupCount=respaldos,
+                                        encoding="utf-8", delay=True)
+    manejador.setFormatter(logging.Formatter(FORMATO))
+    return manejador
+
+
+def _tras_fork(plantilla, rotacion, max_bytes, respaldos):
+    # en un hijo de fork la cola no tiene quien la lea: se escribe directamente, en
+    # el archivo del hijo (su pid) o, con rotación externa, en el compartido
+    def reconfigurar():
+        for manejador in list(logger.handlers):
+            if isinstance(manejador, QueueHandler):
+                logger.removeHandler(manejador)
+                directo = _manejador_archivo(plantilla, rotacion, max_bytes, respaldos)
+                for filtro in manejador.filters:
+                    if isinstance(filtro, MuestreoTracebacks):
+                        filtro._lock = threading.Lock()  # otro hilo pudo tenerlo tomado al hacer fork
+                    directo.addFilter(filtro)
+                logger.addHandler(directo)
+    return reconfigurar
+
+
+def configurar_logs():
+    """
+    Configura el logger "app" una sola vez por proceso. Variables de entorno:
+    LOG_ARCHIVO (errors.log; con rotación interna lleva el pid, ver _ruta_archivo),
+    LOG_NIVEL (ERROR), LOG_ROTACION ("interna" o "externa"), LOG_MAX_MB (10) y
+    LOG_RESPALDOS (5) para la rotación interna, y LOG_VENTANA_S (60) para el
+    muestreo de tracebacks.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+        plantilla = os.environ.get("LOG_ARCHIVO", "errors.log")
+        rotacion = os.environ.get("LOG_ROTACION", "interna")
+        if rotacion not in ROTACIONES:
+            raise ValueError(f"LOG_ROTACION debe ser uno de {list(ROTACIONES)}.")
+        max_bytes = int(float(os.environ.get("LOG_MAX_MB", 10)) * 1024 * 1024)
+        respaldos = int(os.environ.get("LOG_RESPALDOS", 5))
+        ventana = float(os.environ.get("LOG_VENTANA_S", 60))
+
+        cola = queue.SimpleQueue()
+        manejador = QueueHandler(cola)
+        # los filtros corren en el hilo que registra, antes de encolar
+        manejador.addFilter(FiltroCodigo())
+        manejador.addFilter(MuestreoTracebacks(ventana))
+        logger.addHandler(manejador)
+        logger.setLevel(os.environ.get("LOG_NIVEL", "ERROR").upper())
+        logger.propagate = False
+
+        _listener = QueueListener(cola, _manejador_archivo(plantilla, rotacion, max_bytes, respaldos))
+        _listener.start()
+        atexit.register(_listener.stop)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_tras_fork(plantilla, rotacion, max_bytes, respaldos))
+        return _listener
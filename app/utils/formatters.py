@@ -0,0 +1,229 @@
+# app/utils/formatters.py
+#
+# Decodificadores de matrices de costos en formatos compactos: binario crudo con
+# cabecera, .npy y CSV. Producen directamente la representación de los solvers
+# (lista de filas con int/float de Python y None en las rutas prohibidas) sin
+# pasar por el parser JSON ni crear un objeto por celda en Python: los números se
+# leen del buffer con NumPy (o array.array) y se convierten con tolist(). Con
+# NumPy la lista conserva además el arreglo decodificado (MatrizDecodificada),
+# así la variante NumPy de Vogel no lo reconstruye desde las listas.
+
+import array
+import csv
+import io
+import math
+import mmap
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él no se aceptan archivos .npy
+    np = None
+
+# Formato binario crudo (little-endian):
+#   cabecera de 16 bytes: b"TRNS", tipo de los costos, tipo de oferta/demanda, 2 bytes
+#   de relleno, filas (uint32) y columnas (uint32); luego filas·columnas costos por
+#   filas, la oferta y la demanda. Los tipos son códigos de struct: "d" float64,
+#   "f" float32, "q" int64, "i" int32. Un costo NaN es una ruta prohibida.
+MAGIA_BINARIO = b"TRNS"
+CABECERA_BINARIO = struct.Struct("<4sccxxII")
+TIPOS_BINARIO = {b"d": 8, b"f": 4, b"q": 8, b"i": 4}
+
+MAGIA_NPY = b"\x93NUMPY"
+
+# por encima de este tamaño un archivo temporal se mapea en memoria en lugar de leerse
+_MIN_MMAP = 1024 * 1024
+
+
+def _como_archivo(fuente):
+    # BytesIO comparte el contenido de un bytes sin copiarlo mientras no se escriba
+    return io.BytesIO(fuente) if isinstance(fuente, bytes) else fuente
+
+
+def formato_archivo(fuente):
+    """Formato del contenido (bytes o archivo binario) según sus primeros bytes: "binario", "npy" o "csv"."""
+    if isinstance(fuente, bytes):
+        inicio = fuente[:len(MAGIA_NPY)]
+    else:
+        inicio = fuente.read(len(MAGIA_NPY))
+        fuente.seek(0)
+    if inicio.startswith(MAGIA_BINARIO):
+        return "binario"
+    if inicio.startswith(MAGIA_NPY):
+        return "npy"
+    return "csv"
+
+
+def _buffer(fuente):
+    """
+    Contenido como objeto buffer: un bytes se usa tal cual; un archivo temporal
+    grande (los que Werkzeug ya volcó a disco) se mapea en memoria y uno pequeño se lee.
+    """
+    if isinstance(fuente, bytes):
+        return fuente
+    flujo = fuente
+    flujo.seek(0, io.SEEK_END)
+    tamano = flujo.tell()
+    flujo.seek(0)
+    if tamano >= _MIN_MMAP:
+        try:
+            return mmap.mmap(flujo.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+    return flujo.read()
+
+
+def _filas(plano, filas, columnas):
+    return [plano[i * columnas:(i + 1) * columnas] for i in range(filas)]
+
+
+def _nan_a_none(costos):
+    # sólo los float pueden ser NaN; NaN != NaN
+    for fila in costos:
+        for j, c in enumerate(fila):
+            if c != c:
+                fila[j] = None
+    return costos
+
+
+class MatrizDecodificada(list):
+    """
+    Lista de filas de un arreglo 2-D de NumPy que conserva el arreglo (NaN en las
+    rutas prohibidas) y los tipos de sus celdas. np.array() la convierte desde el
+    arreglo, sin recorrer las listas, y los solvers NumPy no la inspeccionan
+    celda a celda (ver app/logic/vectorizado.py). Al copiarla con list() o
+    guardarla con pickle queda como lista normal.
+    """
+
+    def __init__(self, filas, arreglo, tipos):
+        super().__init__(filas)
+        self.arreglo = arreglo
+        self.tipos = tipos
+
+    def __array__(self, dtype=None, copy=None):
+        if copy is False:
+            return np.asarray(self.arreglo, dtype=dtype)
+        return np.array(self.arreglo, dtype=dtype)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _matriz_numpy(arreglo):
+    """Arreglo 2-D de NumPy a lista de filas (MatrizDecodificada), con None donde hay NaN."""
+    costos = arreglo.tolist()
+    tipos = {int} if arreglo.dtype.kind in "iu" else {float}
+    if arreglo.dtype.kind == "f":
+        nan = np.isnan(arreglo)
+        for i in np.flatnonzero(nan.any(axis=1)).tolist():
+            tipos.add(type(None))
+            fila = costos[i]
+            for j in np.flatnonzero(nan[i]).tolist():
+                fila[j] = None
+    return MatrizDecodificada(costos, arreglo, tipos)
+
+
+def _leer_plano(buffer, tipo, inicio, cantidad):
+    """`cantidad` valores de tipo `tipo` (little-endian) desde `inicio`: vista NumPy sin copia o array.array."""
+    if np is not None:
+        return np.frombuffer(buffer, dtype="<" + tipo.decode(), count=cantidad, offset=inicio)
+    valores = array.array(tipo.decode())
+    valores.frombytes(memoryview(buffer)[inicio:inicio + cantidad * TIPOS_BINARIO[tipo]])
+    if sys.byteorder == "big":
+        valores.byteswap()
+    return valores
+
+
+def decodificar_binario(fuente):
+    """Lee el formato binario crudo (bytes o archivo). Devuelve (costos, oferta, demanda); ValueError si es inválido."""
+    buffer = _buffer(fuente)
+    if len(buffer) < CABECERA_BINARIO.size:
+        raise ValueError("Archivo binario incompleto: falta la cabecera.")
+    magia, tipo_costos, tipo_vectores, filas, columnas = CABECERA_BINARIO.unpack_from(buffer)
+    if magia != MAGIA_BINARIO:
+        raise ValueError("Archivo binario inválido: debe empezar con b'TRNS'.")
+    if tipo_costos not in TIPOS_BINARIO or tipo_vectores not in TIPOS_BINARIO:
+        raise ValueError(f"Tipo numérico no soportado en el binario; use uno de {[t.decode() for t in TIPOS_BINARIO]}.")
+    inicio_oferta = CABECERA_BINARIO.size + filas * columnas * TIPOS_BINARIO[tipo_costos]
+    inicio_demanda = inicio_oferta + filas * TIPOS_BINARIO[tipo_vectores]
+    if len(buffer) != inicio_demanda + columnas * TIPOS_BINARIO[tipo_vectores]:
+        raise ValueError("Archivo binario inválido: el tamaño no coincide con las dimensiones de la cabecera.")
+
+    costos = _leer_plano(buffer, tipo_costos, CABECERA_BINARIO.size, filas * columnas)
+    oferta = _leer_plano(buffer, tipo_vectores, inicio_oferta, filas).tolist()
+    demanda = _leer_plano(buffer, tipo_vectores, inicio_demanda, columnas).tolist()
+    if np is not None:
+        costos = _matriz_numpy(costos.reshape(filas, columnas))
+    else:
+        costos = _filas(costos.tolist(), filas, columnas)
+        if tipo_costos in (b"d", b"f"):
+            _nan_a_none(costos)
+    return costos, oferta, demanda
+
+
+def decodificar_npy(fuente):
+    """Lee un arreglo .npy (bytes o archivo) de 1 o 2 dimensiones como lista (de filas); ValueError si es inválido."""
+    if np is None:
+        raise ValueError("Los archivos .npy requieren NumPy en el servidor.")
+    flujo = _como_archivo(fuente)
+    flujo.seek(0)
+    try:
+        version = np.lib.format.read_magic(flujo)
+        leer_cabecera = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        forma, fortran, dtype = leer_cabecera(flujo)
+    except ValueError as e:
+        raise ValueError(f"Archivo .npy inválido: {e}")
+    if dtype.kind not in "iuf" or len(forma) not in (1, 2):
+        raise ValueError("El .npy debe ser un arreglo numérico de 1 o 2 dimensiones.")
+    inicio = flujo.tell()
+    buffer = _buffer(fuente)
+    cantidad = math.prod(forma)
+    if len(buffer) < inicio + cantidad * dtype.itemsize:
+        raise ValueError("Archivo .npy incompleto.")
+    arreglo = np.frombuffer(buffer, dtype=dtype, count=cantidad, offset=inicio)
+    arreglo = arreglo.reshape(forma, order="F" if fortran else "C")
+    if arreglo.ndim == 1:
+        return arreglo.tolist()
+    return _matriz_numpy(arreglo)
+
+
+def _numero_csv(texto):
+    texto = texto.strip()
+    if texto in ("", "-"):
+        return None  # ruta prohibida
+    try:
+        return int(texto)
+    except ValueError:
+        pass
+    try:
+        valor = float(texto)
+    except ValueError:
+        raise ValueError(f"Valor no numérico en el CSV: {texto!r}.")
+    if not math.isfinite(valor):
+        raise ValueError(f"Valor no finito en el CSV: {texto!r}.")
+    return valor
+
+
+def decodificar_csv(fuente):
+    """
+    Lee un CSV de números (separado por comas o punto y coma) fila a fila sin cargar
+    el archivo entero. Una celda vacía o "-" es una ruta prohibida.
+    """
+    texto = io.TextIOWrapper(_como_archivo(fuente), encoding="utf-8-sig", newline="")
+    try:
+        muestra = texto.read(4096)
+        texto.seek(0)
+        separador = ";" if muestra.count(";") > muestra.count(",") else ","
+        filas = []
+        for campos in csv.reader(texto, delimiter=separador):
+            if not campos:
+                continue
+            try:
+                # camino rápido: fila de enteros sin huecos
+                filas.append(list(map(int, campos)))
+            except ValueError:
+                filas.append([_numero_csv(c) for c in campos])
+        return filas
+    finally:
+        texto.detach()  # no cerrar el archivo subyacente
@@ -0,0 +1,204 @@
+# app/utils/metricas.py
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from flask import g, request, has_request_context
+import os
+import threading
+
+# límites de los histogramas (formato Prometheus: cada bucket cuenta las observaciones <= le)
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BUCKETS_PASOS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+BUCKETS_CELDAS = (25, 100, 400, 2500, 10000, 40000, 250000, 1000000)
+
+
+class Histograma:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.conteos = [0] * (len(buckets) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.conteos[bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _etiquetas(etiquetas):
+    return ",".join(f'{k}="{v}"' for k, v in etiquetas)
+
+
+class RegistroMetricas:
+    """
+    Contadores e histogramas en memoria del proceso, exportados en formato de texto
+    de Prometheus. Con varios workers de gunicorn cada uno tiene su propio registro
+    (cada serie lleva la etiqueta `pid` para poder agregarlas).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}  # (nombre, etiquetas) -> Histograma
+        self._contadores = {}   # (nombre, etiquetas) -> valor
+        self._ayuda = {}
+        self._fuentes = []      # funciones que devuelven [(nombre, etiquetas, valor, tipo, ayuda)]
+
+    def observar(self, nombre, valor, buckets=BUCKETS_SEGUNDOS, ayuda="", **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma(buckets)
+                self._ayuda.setdefault(nombre, ayuda)
+            histograma.observar(valor)
+
+    def incrementar(self, nombre, valor=1, ayuda="", **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+            self._ayuda.setdefault(nombre, ayuda)
+
+    def agregar_fuente(self, funcion):
+        """Métricas calculadas al exportar (p.ej. aciertos de la cache)."""
+        self._fuentes.append(funcion)
+
+    def exportar(self):
+        pid = ("pid", str(os.getpid()))
+        lineas = []
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(self._histogramas.items(), key=lambda kv: kv[0])
+            histogramas = [(clave, list(h.conteos), h.suma, h.total, h.buckets) for clave, h in histogramas]
+
+        vistos = set()
+        for (nombre, etiquetas), valor in contadores:
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# HELP {nombre} {self._ayuda.get(nombre, '')}")
+                lineas.append(f"# TYPE {nombre} counter")
+            lineas.append(f"{nombre}{{{_etiquetas(etiquetas + (pid,))}}} {valor}")
+
+        for (nombre, etiquetas), conteos, suma, total, buckets in histogramas:
+            if nombre not in vistos:
+                vistos.add(nombre)
+                lineas.append(f"# HELP {nombre} {self._ayuda.get(nombre, '')}")
+                lineas.append(f"# TYPE {nombre} histogram")
+            acumulado = 0
+            for limite, conteo in zip(list(buckets) + ["+Inf"], conteos):
+                acumulado += conteo
+                lineas.append(f"{nombre}_bucket{{{_etiquetas(etiquetas + (('le', str(limite)), pid))}}} {acumulado}")
+            lineas.append(f"{nombre}_sum{{{_etiquetas(etiquetas + (pid,))}}} {suma}")
+            lineas.append(f"{nombre}_count{{{_etiquetas(etiquetas + (pid,))}}} {total}")
+
+        for fuente in self._fuentes:
+            for nombre, etiquetas, valor, tipo, ayuda in fuente():
+                if nombre not in vistos:
+                    vistos.add(nombre)
+                    lineas.append(f"# HELP {nombre} {ayuda}")
+                    lineas.append(f"# TYPE {nombre} {tipo}")
+                lineas.append(f"{nombre}{{{_etiquetas(tuple(sorted(etiquetas.items())) + (pid,))}}} {valor}")
+        return "\n".join(lineas) + "\n"
+
+
+class Cronometro:
+    """Tiempos por etapa de una petición (spans); se vuelcan al registro al terminar."""
+
+    def __init__(self):
+        self.inicio = perf_counter()
+        self.etapas = {}
+        self.pasos = None
+        self.celdas = None
+
+    @contextmanager
+    def etapa(self, nombre):
+        t = perf_counter()
+        try:
+            yield
+        finally:
+            self.agregar(nombre, perf_counter() - t)
+
+    def agregar(self, nombre, segundos):
+        self.etapas[nombre] = self.etapas.get(nombre, 0.0) + segundos
+
+    def server_timing(self):
+        partes = [f"{nombre};dur={seg * 1000:.2f}" for nombre, seg in self.etapas.items()]
+        partes.append(f"total;dur={(perf_counter() - self.inicio) * 1000:.2f}")
+        return ", ".join(partes)
+
+
+class _CronometroNulo:
+    """Sustituto sin costo cuando no hay petición instrumentada (trabajos, lote, CLI)."""
+
+    pasos = celdas = None
+
+    @contextmanager
+    def etapa(self, nombre):
+        yield
+
+    def agregar(self, nombre, segundos):
+        pass
+
+
+CRONOMETRO_NULO = _CronometroNulo()
+
+
+def cronometro():
+    """Cronómetro de la petición en curso (o uno nulo fuera de una petición instrumentada)."""
+    if not has_request_context():
+        return CRONOMETRO_NULO
+    return g.get("cronometro", CRONOMETRO_NULO)
+
+
+def _quiere_server_timing():
+    return request.args.get("tiempos") == "1" or request.headers.get("X-Debug-Tiempos") == "1"
+
+
+def instrumentar(app, registro, endpoints):
+    """
+    Mide cada petición a los `endpoints` dados: duración total, tiempo por etapa,
+    pasos por resolución, tamaño de la matriz y código de respuesta. Con ?tiempos=1
+    o la cabecera X-Debug-Tiempos: 1 se añade el desglose en una cabecera Server-Timing.
+    """
+    @app.before_request
+    def _iniciar_cronometro():
+        if request.endpoint in endpoints:
+            g.cronometro = Cronometro()
+
+    @app.after_request
+    def _registrar_metricas(respuesta):
+        crono = g.get("cronometro")
+        if crono is None:
+            return respuesta
+        endpoint = endpoints[request.endpoint]
+        registro.incrementar("transporte_peticiones_total", ayuda="Peticiones por endpoint y código",
+                             endpoint=endpoint, codigo=respuesta.status_code)
+        registro.observar("transporte_peticion_segundos", perf_counter() - crono.inicio,
+                          ayuda="Duración de la petición (hasta el inicio del envío)", endpoint=endpoint)
+        for nombre, segundos in crono.etapas.items():
+            registro.observar("transporte_etapa_segundos", segundos,
+                              ayuda="Duración de cada etapa de la petición", endpoint=endpoint, etapa=nombre)
+        if crono.pasos is not None:
+            registro.observar("transporte_pasos", crono.pasos, BUCKETS_PASOS,
+                              ayuda="Pasos (asignaciones) por resolución", endpoint=endpoint)
+        if crono.celdas is not None:
+            registro.observar("transporte_celdas", crono.celdas, BUCKETS_CELDAS,
+                              ayuda="Celdas de la matriz balanceada", endpoint=endpoint)
+        if _quiere_server_timing():
+            respuesta.headers["Server-Timing"] = crono.server_timing()
+        return respuesta
+
+
+def fuente_cache(cache):
+    """Aciertos, fallos y tamaño de la cache de resultados como métricas."""
+    def fuente():
+        if cache is None:
+            return []
+        est = cache.estadisticas()
+        return [
+            ("transporte_cache_total", {"resultado": "acierto"}, est["aciertos"], "counter", "Consultas a la cache de resultados"),
+            ("transporte_cache_total", {"resultado": "fallo"}, est["fallos"], "counter", "Consultas a la cache de resultados"),
+            ("transporte_cache_expulsiones_total", {}, est["expulsiones"], "counter", "Entradas expulsadas por LRU"),
+            ("transporte_cache_bytes", {}, est["bytes"], "gauge", "Bytes ocupados por la cache en memoria"),
+        ]
+    return fuente
@@ -0,0 +1,43 @@
+# app/utils/procesos.py
+#
+# Pool de procesos compartido por los endpoints que reparten trabajo de CPU
+# (/resolver/batch, /resolver/comparar y los bloques de "descomponer").
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import os
+import threading
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def num_procesos():
+    return max(1, os.cpu_count() or 1)
+
+
+def obtener_pool():
+    # se crea perezosamente en cada worker (después del fork de gunicorn)
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=num_procesos())
+        return _pool
+
+
+def descartar_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def mapa_pool(funcion, *iterables):
+    """map en el pool de procesos (lista de resultados); si un proceso murió se descarta el pool y se relanza."""
+    try:
+        return list(obtener_pool().map(funcion, *iterables))
+    except BrokenProcessPool:
+        # un proceso murió (p.ej. por memoria): se recrea el pool para la próxima petición
+        descartar_pool()
+        raise
@@ -0,0 +1,149 @@
+# app/utils/serializacion.py
+#
+# Serialización y compresión de las respuestas grandes (pasos, tablas HTML).
+#
+# JSON: jsonify ordena las claves de cada dict y escapa todo lo que no es ASCII;
+# con miles de pasos eso es la mayor parte del tiempo tras resolver. Aquí se usa
+# un único JSONEncoder compacto, sin ordenar y en UTF-8: matrices de asignaciones,
+# tuplas de celdas y dicts de pasos se codifican enteros en el codificador C de
+# la biblioteca estándar (sólo Fraction pasa por valor_json).
+#
+# Compresión: gzip o deflate según Accept-Encoding (con sus pesos q), en un
+# after_request común a todos los endpoints. Las respuestas normales se comprimen
+# de una vez; las de streaming trozo a trozo con Z_SYNC_FLUSH, así cada evento
+# llega al cliente en cuanto se produce. Los tamaños antes y después se informan
+# en la cabecera X-Tamano-Original (Content-Length es el comprimido) y, si hay
+# métricas, en el histograma transporte_respuesta_bytes.
+
+from flask import Response, request
+from app.logic.numerico import valor_json
+from app.utils.metricas import cronometro
+import json
+import os
+import zlib
+
+CODIFICACIONES = ("gzip", "deflate")
+# wbits de zlib: 16+15 escribe cabecera gzip, 15 el formato zlib que HTTP llama "deflate"
+_WBITS = {"gzip": 31, "deflate": 15}
+
+MIMETYPES_COMPRIMIBLES = ("application/json", "text/html", "application/x-ndjson", "text/event-stream", "text/plain")
+
+# por debajo de este tamaño comprimir no compensa la cabecera y el tiempo
+MIN_BYTES_COMPRESION = 1024
+
+BUCKETS_BYTES = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+
+_codificador = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=valor_json)
+
+
+def codificar_json(obj):
+    """Texto JSON compacto, sin ordenar claves y sin escapar lo que no es ASCII."""
+    return _codificador.encode(obj)
+
+
+def respuesta_json(obj, status=200, headers=None):
+    """Como jsonify, pero con codificar_json (ver arriba)."""
+    return Response(codificar_json(obj).encode("utf-8"), status=status, mimetype="application/json", headers=headers)
+
+
+def codificacion_aceptada(accept_encodings):
+    """gzip o deflate, la de mayor peso en Accept-Encoding (gzip en caso de empate), o None."""
+    mejor = None
+    mejor_q = 0
+    for codificacion in CODIFICACIONES:
+        q = accept_encodings.quality(codificacion)
+        if q > mejor_q:
+            mejor, mejor_q = codificacion, q
+    return mejor
+
+
+class Compresor:
+    """Compresión incremental con zlib; cuenta los bytes de entrada y de salida."""
+
+    def __init__(self, codificacion, nivel=1):
+        self._zlib = zlib.compressobj(nivel, zlib.DEFLATED, _WBITS[codificacion])
+        self.original = 0
+        self.comprimido = 0
+
+    def comprimir(self, datos, vaciar=False):
+        # vaciar: Z_SYNC_FLUSH, el cliente puede descomprimir todo lo enviado hasta aquí
+        self.original += len(datos)
+        salida = self._zlib.compress(datos)
+        if vaciar:
+            salida += self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        self.comprimido += len(salida)
+        return salida
+
+    def terminar(self):
+        salida = self._zlib.flush()
+        self.comprimido += len(salida)
+        return salida
+
+
+def comprimir_flujo(trozos, compresor, al_terminar=None):
+    """Comprime cada trozo (bytes) en cuanto llega; al final llama a al_terminar(original, comprimido)."""
+    try:
+        for trozo in trozos:
+            if trozo:
+                yield compresor.comprimir(trozo, vaciar=True)
+        yield compresor.terminar()
+        if al_terminar is not None:
+            al_terminar(compresor.original, compresor.comprimido)
+    finally:
+        cerrar = getattr(trozos, "close", None)
+        if cerrar is not None:
+            cerrar()
+
+
+def instalar_compresion(app, registro=None, endpoints=None, nivel=None):
+    """
+    Comprime las respuestas de texto (JSON, HTML, NDJSON, SSE) con la codificación
+    que acepte el cliente. COMPRESION_NIVEL (1-9) fija el nivel de zlib; el 1 por
+    defecto, porque con tablas HTML repetitivas comprime casi tanto como el 6 en
+    una fracción del tiempo. Con `registro` se observan los tamaños de los
+    `endpoints` medidos.
+    """
+    if nivel is None:
+        nivel = int(os.environ.get("COMPRESION_NIVEL", 1))
+    endpoints = endpoints or {}
+
+    def observar(endpoint, codificacion, original, enviado):
+        if registro is None or endpoint is None:
+            return
+        for medida, valor in (("original", original), ("enviado", enviado)):
+            registro.observar("transporte_respuesta_bytes", valor, BUCKETS_BYTES,
+                              ayuda="Tamaño del cuerpo de la respuesta antes y después de comprimir",
+                              endpoint=endpoint, codificacion=codificacion, medida=medida)
+
+    @app.after_request
+    def _comprimir(respuesta):
+        if (respuesta.mimetype not in MIMETYPES_COMPRIMIBLES or respuesta.direct_passthrough
+                or "Content-Encoding" in respuesta.headers or request.method == "HEAD"
+                or respuesta.status_code < 200 or respuesta.status_code in (204, 304)):
+            return respuesta
+        respuesta.vary.add("Accept-Encoding")
+        endpoint = endpoints.get(request.endpoint)
+        codificacion = codificacion_aceptada(request.accept_encodings)
+
+        if respuesta.is_streamed:
+            if codificacion is None:
+                return respuesta
+            compresor = Compresor(codificacion, nivel)
+            respuesta.response = comprimir_flujo(
+                respuesta.iter_encoded(), compresor,
+                lambda original, enviado: observar(endpoint, codificacion, original, enviado))
+            respuesta.headers.pop("Content-Length", None)
+            respuesta.headers["Content-Encoding"] = codificacion
+            return respuesta
+
+        datos = respuesta.get_data()
+        if codificacion is None or len(datos) < MIN_BYTES_COMPRESION:
+            observar(endpoint, "identity", len(datos), len(datos))
+            return respuesta
+        with cronometro().etapa("compresion"):
+            compresor = Compresor(codificacion, nivel)
+            respuesta.set_data(compresor.comprimir(datos) + compresor.terminar())
+        respuesta.headers["Content-Encoding"] = codificacion
+        respuesta.headers["X-Tamano-Original"] = str(len(datos))
+        observar(endpoint, codificacion, len(datos), compresor.comprimido)
+        return respuesta
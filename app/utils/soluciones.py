@@ -0,0 +1,50 @@
+# app/utils/soluciones.py
+#
+# Soluciones guardadas para re-resolver en caliente (/resolver/cambios): el
+# problema sin balancear, sus asignaciones balanceadas y las opciones con que se
+# resolvió, bajo un id aleatorio. Se reutiliza CacheResultados (LRU por entradas y
+# bytes, TTL y almacén SQLite compartido opcional) guardando los datos con pickle,
+# que conserva los Fraction del modo numerico "fraccion". Sólo se guardan datos
+# producidos por el servidor: el id que envía el cliente sólo sirve para buscarlos.
+
+from app.utils.cache import CacheResultados, BackendSQLite
+import os
+import pickle
+import re
+import uuid
+
+_ID_VALIDO = re.compile(r"^[0-9a-f]{32}$")
+
+
+class AlmacenSoluciones:
+    def __init__(self, cache):
+        self.cache = cache
+
+    def guardar(self, solucion):
+        """Guarda el dict de la solución y devuelve su id, o None si no cabe (mayor que el límite de bytes)."""
+        id_solucion = uuid.uuid4().hex
+        if not self.cache.guardar(id_solucion, pickle.dumps(solucion, protocol=pickle.HIGHEST_PROTOCOL)):
+            return None
+        return id_solucion
+
+    def obtener(self, id_solucion):
+        """Dict de la solución, o None si el id no existe, expiró o fue expulsado."""
+        if not isinstance(id_solucion, str) or not _ID_VALIDO.match(id_solucion):
+            return None
+        valor = self.cache.obtener(id_solucion)
+        return None if valor is None else pickle.loads(valor)
+
+
+def crear_almacen_desde_entorno():
+    """
+    Almacén configurado por variables de entorno: SOLUCIONES_MAX_ENTRADAS,
+    SOLUCIONES_MAX_MB y SOLUCIONES_TTL (segundos, 3600 por defecto) fijan los
+    límites; SOLUCIONES_SQLITE=<ruta> lo comparte entre workers.
+    """
+    max_entradas = int(os.environ.get("SOLUCIONES_MAX_ENTRADAS", 64))
+    max_bytes = int(float(os.environ.get("SOLUCIONES_MAX_MB", 256)) * 1024 * 1024)
+    ttl = float(os.environ.get("SOLUCIONES_TTL", 3600)) or None
+    backend = None
+    if os.environ.get("SOLUCIONES_SQLITE"):
+        backend = BackendSQLite(os.environ["SOLUCIONES_SQLITE"], max_entradas * 4, max_bytes * 4)
+    return AlmacenSoluciones(CacheResultados(max_entradas, max_bytes, ttl, backend))
@@ -0,0 +1,61 @@
+# app/utils/streaming.py
+
+from flask import Response
+from app.utils.serializacion import codificar_json
+from app.utils.errores import registrar_error
+import traceback
+import uuid
+
+# formatos de streaming aceptados: NDJSON (un objeto JSON por línea) o Server-Sent Events
+FORMATOS_STREAM = ("ndjson", "sse")
+
+_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def formato_stream(data, accept_mimetypes=None):
+    """
+    Formato de streaming pedido por el cliente, o None para la respuesta JSON normal.
+
+    Se toma del cuerpo ("stream": "ndjson" | "sse" | true) o, si no viene, de la
+    cabecera Accept. Devuelve "" si el valor del cuerpo no es válido.
+    """
+    valor = data.get("stream")
+    if valor is True:
+        return "ndjson"
+    if valor:
+        return valor if valor in FORMATOS_STREAM else ""
+    if valor is None and accept_mimetypes is not None:
+        for formato, mimetype in _MIMETYPES.items():
+            # sólo si el cliente lo pide explícitamente (no por un comodín */*)
+            if mimetype in accept_mimetypes.values():
+                return formato
+    return None
+
+
+def _codificar(evento, formato):
+    texto = codificar_json(evento)
+    if formato == "sse":
+        return f"event: {evento['tipo']}\ndata: {texto}\n\n"
+    return texto + "\n"
+
+
+def respuesta_stream(eventos, formato, mensaje_error="Error interno al resolver"):
+    """
+    Envía cada evento del generador en cuanto se produce. Un error a mitad de camino
+    ya no puede cambiar el status HTTP, así que se emite como evento "error" con código.
+    """
+    def generar():
+        try:
+            for evento in eventos:
+                yield _codificar(evento, formato)
+        except Exception:
+            error_id = str(uuid.uuid4())[:8]
+            tb = traceback.format_exc()
+            registrar_error(error_id, tb)
+            yield _codificar({"tipo": "error", "error": mensaje_error, "code": error_id, "detalle": tb}, formato)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(generar(), mimetype=_MIMETYPES[formato], headers=headers)
@@ -0,0 +1,246 @@
+# app/utils/trabajos.py
+
+from concurrent.futures import ThreadPoolExecutor
+from app.logic.numerico import valor_json
+from app.utils.errores import registrar_error
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import traceback
+
+# estados de un trabajo; todos salvo "pendiente" y "en_curso" son finales
+ESTADOS = ("pendiente", "en_curso", "terminado", "error", "cancelado", "interrumpido")
+ESTADOS_FINALES = ("terminado", "error", "cancelado", "interrumpido")
+
+_ID_VALIDO = re.compile(r"^[0-9a-f]{32}$")
+
+
+class TrabajoCancelado(Exception):
+    pass
+
+
+def _pid_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class Trabajo:
+    """
+    Vista que recibe la función de un trabajo en ejecución: informa el progreso con
+    avanzar() y lanza TrabajoCancelado en cuanto se pidió cancelar. El progreso se
+    vuelca a disco como mucho cada `intervalo` segundos, para que otros workers
+    puedan consultarlo sin penalizar el bucle del solver.
+    """
+
+    def __init__(self, gestor, id_trabajo, pasos_estimados=None, intervalo=0.5):
+        self._gestor = gestor
+        self.id = id_trabajo
+        self.pasos_estimados = pasos_estimados
+        self.paso_actual = 0
+        self.fase = "resolviendo"
+        self.intervalo = intervalo
+        self._ultimo_volcado = 0.0
+
+    def avanzar(self, paso_actual=None, fase=None):
+        if paso_actual is not None:
+            self.paso_actual = paso_actual
+        if fase is not None:
+            self.fase = fase
+        ahora = time.time()
+        if fase is None and ahora - self._ultimo_volcado < self.intervalo:
+            return
+        self._ultimo_volcado = ahora
+        self._gestor._actualizar(self.id, paso_actual=self.paso_actual, fase=self.fase,
+                                 pasos_estimados=self.pasos_estimados)
+        if self._gestor._cancelacion_pedida(self.id):
+            raise TrabajoCancelado()
+
+
+class GestorTrabajos:
+    """
+    Ejecuta trabajos largos fuera de la petición HTTP en un pool de hilos del propio
+    worker y persiste su estado y resultado como JSON en `directorio`, de modo que
+    cualquier worker puede consultarlos y los resultados terminados sobreviven a un
+    reinicio. Un trabajo cuyo proceso ya no existe se informa como "interrumpido".
+
+    Los hilos comparten el GIL con los que atienden peticiones: mientras un
+    trabajo resuelve, las peticiones de ese worker avanzan más despacio (salvo en
+    las partes NumPy, que lo liberan). Por eso max_hilos es 1 por defecto; para
+    más trabajos simultáneos conviene subir el número de workers de gunicorn,
+    no TRABAJOS_HILOS.
+    """
+
+    def __init__(self, directorio, max_hilos=1, ttl=24 * 3600):
+        self.directorio = directorio
+        self.max_hilos = max_hilos
+        self.ttl = ttl
+        self._executor = None
+        self._lock = threading.Lock()
+        self._cancelar = set()  # ids a cancelar ejecutados por este proceso
+
+    # --- almacenamiento ---
+
+    def _ruta(self, id_trabajo, sufijo="estado"):
+        return os.path.join(self.directorio, f"{id_trabajo}.{sufijo}.json")
+
+    def _escribir(self, ruta, datos):
+        # escritura atómica: nunca se lee un JSON a medio escribir
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, default=valor_json)
+        os.replace(temporal, ruta)
+
+    def _leer(self, ruta):
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _actualizar(self, id_trabajo, **cambios):
+        with self._lock:
+            estado = self._leer(self._ruta(id_trabajo)) or {"id": id_trabajo}
+            estado.update(cambios)
+            self._escribir(self._ruta(id_trabajo), estado)
+            return estado
+
+    def _marca_cancelar(self, id_trabajo):
+        # archivo aparte: no compite con las escrituras de progreso del hilo que ejecuta
+        return os.path.join(self.directorio, f"{id_trabajo}.cancelar")
+
+    def _cancelacion_pedida(self, id_trabajo):
+        return id_trabajo in self._cancelar or os.path.exists(self._marca_cancelar(id_trabajo))
+
+    def _purgar(self):
+        limite = time.time() - self.ttl
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(".estado.json"):
+                continue
+            estado = self._leer(os.path.join(self.directorio, nombre))
+            if estado and estado.get("estado") in ESTADOS_FINALES and (estado.get("terminado") or 0) < limite:
+                self.eliminar(estado["id"])
+
+    # --- API ---
+
+    def crear(self, tipo, funcion, pasos_estimados=None):
+        """
+        Registra un trabajo y lo encola. `funcion(trabajo)` recibe un Trabajo y
+        devuelve el resultado (serializable a JSON).
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        self._purgar()
+        id_trabajo = uuid.uuid4().hex
+        self._escribir(self._ruta(id_trabajo), {
+            "id": id_trabajo,
+            "tipo": tipo,
+            "estado": "pendiente",
+            "creado": time.time(),
+            "pid": os.getpid(),
+            "paso_actual": 0,
+            "pasos_estimados": pasos_estimados,
+            "fase": None
+        })
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="trabajo")
+            executor = self._executor
+        executor.submit(self._ejecutar, id_trabajo, funcion, pasos_estimados)
+        return id_trabajo
+
+    def _ejecutar(self, id_trabajo, funcion, pasos_estimados):
+        self._actualizar(id_trabajo, estado="en_curso", iniciado=time.time(), fase="resolviendo")
+        if self._cancelacion_pedida(id_trabajo):
+            self._actualizar(id_trabajo, estado="cancelado", terminado=time.time())
+            return
+        trabajo = Trabajo(self, id_trabajo, pasos_estimados)
+        try:
+            resultado = funcion(trabajo)
+            self._escribir(self._ruta(id_trabajo, "resultado"), resultado)
+            self._actualizar(id_trabajo, estado="terminado", terminado=time.time(), fase=None,
+                             paso_actual=trabajo.paso_actual)
+        except TrabajoCancelado:
+            self._actualizar(id_trabajo, estado="cancelado", terminado=time.time(), paso_actual=trabajo.paso_actual)
+        except Exception:
+            error_id = str(uuid.uuid4())[:8]
+            tb = traceback.format_exc()
+            registrar_error(error_id, tb)
+            self._actualizar(id_trabajo, estado="error", terminado=time.time(),
+                             error="Error interno al ejecutar el trabajo", code=error_id, detalle=tb)
+        finally:
+            self._cancelar.discard(id_trabajo)
+            self._quitar_marca(id_trabajo)
+
+    def _quitar_marca(self, id_trabajo):
+        try:
+            os.remove(self._marca_cancelar(id_trabajo))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def id_valido(id_trabajo):
+        return bool(_ID_VALIDO.match(id_trabajo or ""))
+
+    def estado(self, id_trabajo):
+        """Estado persistido del trabajo (o None si no existe), con el progreso estimado."""
+        if not self.id_valido(id_trabajo):
+            return None
+        estado = self._leer(self._ruta(id_trabajo))
+        if estado is None:
+            return None
+        if estado["estado"] not in ESTADOS_FINALES and not _pid_vivo(estado.get("pid", 0)):
+            # el worker que lo ejecutaba se reinició: el trabajo no se va a completar
+            estado = self._actualizar(id_trabajo, estado="interrumpido", terminado=time.time())
+        estado.pop("detalle", None)
+        estado["cancelacion_solicitada"] = estado["estado"] not in ESTADOS_FINALES and self._cancelacion_pedida(id_trabajo)
+
+        restante = None
+        total = estado.get("pasos_estimados")
+        hechos = estado.get("paso_actual") or 0
+        if estado["estado"] == "en_curso" and total and hechos:
+            transcurrido = time.time() - estado["iniciado"]
+            restante = max(0, total - hechos) * transcurrido / hechos
+        estado["restante_estimado_s"] = restante
+        return estado
+
+    def resultado(self, id_trabajo):
+        if not self.id_valido(id_trabajo):
+            return None
+        return self._leer(self._ruta(id_trabajo, "resultado"))
+
+    def cancelar(self, id_trabajo):
+        """Pide cancelar el trabajo; devuelve su estado (None si no existe)."""
+        estado = self.estado(id_trabajo)
+        if estado is None or estado["estado"] in ESTADOS_FINALES:
+            return estado
+        self._cancelar.add(id_trabajo)
+        # también en disco, por si lo está ejecutando otro worker
+        open(self._marca_cancelar(id_trabajo), "w").close()
+        return self.estado(id_trabajo)
+
+    def eliminar(self, id_trabajo):
+        for sufijo in ("estado", "resultado"):
+            try:
+                os.remove(self._ruta(id_trabajo, sufijo))
+            except FileNotFoundError:
+                pass
+        self._quitar_marca(id_trabajo)
+
+
+def crear_gestor_desde_entorno(directorio_defecto):
+    """
+    Gestor configurado por variables de entorno: TRABAJOS_DIR (directorio de
+    persistencia), TRABAJOS_HILOS (trabajos simultáneos por worker) y TRABAJOS_TTL
+    (segundos que se conservan los trabajos terminados).
+    """
+    directorio = os.environ.get("TRABAJOS_DIR", directorio_defecto)
+    max_hilos = int(os.environ.get("TRABAJOS_HILOS", 1))
+    ttl = float(os.environ.get("TRABAJOS_TTL", 24 * 3600))
+    return GestorTrabajos(directorio, max_hilos, ttl)
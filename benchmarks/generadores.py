@@ -0,0 +1,81 @@
+# benchmarks/generadores.py
+"""
+Generadores de instancias de transporte con semilla (reproducibles).
+
+Cada generador recibe un tamaño base `s` y un random.Random y devuelve
+(costos, oferta, demanda). Las familias cubren los casos que más afectan al
+rendimiento de los métodos: matrices cuadradas, muy rectangulares, con muchos
+empates de costo, degeneradas (oferta y demanda se agotan a la vez), no
+balanceadas (balancear añade una línea ficticia) y con muchas ofertas en cero.
+"""
+
+import random
+
+
+def _costos(m, n, rng, maximo=100):
+    return [[rng.randint(1, maximo) for _ in range(n)] for _ in range(m)]
+
+
+def _repartir(total, k, rng):
+    # k enteros positivos (si alcanza) que suman total
+    if k == 1:
+        return [total]
+    cortes = sorted(rng.sample(range(1, total), k - 1)) if total > k else sorted(rng.choices(range(total + 1), k=k - 1))
+    partes = [b - a for a, b in zip([0] + cortes, cortes + [total])]
+    return partes
+
+
+def cuadrado(s, rng):
+    oferta = [rng.randint(10, 100) for _ in range(s)]
+    return _costos(s, s, rng), oferta, _repartir(sum(oferta), s, rng)
+
+
+def rectangular(s, rng):
+    # mismo número de celdas que s×s, pero con 100 veces más columnas que filas
+    m = max(2, s // 10)
+    n = max(2, (s * s) // m)
+    oferta = [rng.randint(10 * n // m, 100 * n // m) for _ in range(m)]
+    return _costos(m, n, rng), oferta, _repartir(sum(oferta), n, rng)
+
+
+def empates(s, rng):
+    # sólo tres valores de costo: casi todas las penalizaciones empatan
+    oferta = [rng.randint(10, 100) for _ in range(s)]
+    return _costos(s, s, rng, maximo=3), oferta, _repartir(sum(oferta), s, rng)
+
+
+def degenerado(s, rng):
+    # ofertas y demandas iguales: cada asignación agota fila y columna a la vez
+    valor = rng.randint(10, 100)
+    return _costos(s, s, rng), [valor] * s, [valor] * s
+
+
+def desbalanceado(s, rng):
+    # 20 % más de oferta que de demanda: balancear agrega una columna ficticia
+    oferta = [rng.randint(10, 100) for _ in range(s)]
+    total = sum(oferta)
+    return _costos(s, s, rng), oferta, _repartir(total - total // 5, s, rng)
+
+
+def ofertas_cero(s, rng):
+    # la mitad de las filas sin oferta
+    oferta = [rng.randint(10, 100) if rng.random() < 0.5 else 0 for _ in range(s)]
+    if not any(oferta):
+        oferta[0] = 50
+    return _costos(s, s, rng), oferta, _repartir(sum(oferta), s, rng)
+
+
+FAMILIAS = {
+    "cuadrado": cuadrado,
+    "rectangular": rectangular,
+    "empates": empates,
+    "degenerado": degenerado,
+    "desbalanceado": desbalanceado,
+    "ofertas_cero": ofertas_cero,
+}
+
+
+def generar(familia, s, semilla=0):
+    """Instancia de la familia con tamaño base s; misma semilla, misma instancia."""
+    rng = random.Random(f"{familia}-{s}-{semilla}")
+    return FAMILIAS[familia](s, rng)
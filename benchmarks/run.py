@@ -0,0 +1,231 @@
+# benchmarks/run.py
+"""
+Suite de benchmarks de los métodos de transporte y de los endpoints.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.run                          # preset "rapido", imprime resumen
+    python -m benchmarks.run --preset completo        # tamaños de 5×5 a 1000×1000
+    python -m benchmarks.run --salida resultados.json
+    python -m benchmarks.run --comparar benchmarks/baseline.json
+    python -m benchmarks.run --guardar-base benchmarks/baseline.json
+
+Mide por separado MetodoVogel.resolver (Python y, si hay NumPy, la variante
+vectorizada), MetodoNoroeste, MetodoCostoMinimo y MetodoRussell, balancear y
+_build_step_table_html, además de latencia y throughput de punta a punta con el
+cliente de pruebas de Flask.
+Cada medición guarda mediana y mínimo de tiempo y el pico de memoria
+(tracemalloc, en una ejecución aparte para no distorsionar los tiempos).
+Con --comparar se marcan como regresión los casos cuyo tiempo mínimo (o pico
+de memoria) supera al de la base en más de --tolerancia, y el proceso sale con 1.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+# sin cache de resultados: cada petición de punta a punta debe resolver de verdad
+os.environ.setdefault("CACHE_RESULTADOS", "0")
+
+from benchmarks.generadores import FAMILIAS, generar  # noqa: E402
+from app.logic.vogel import MetodoVogel  # noqa: E402
+from app.logic.noroeste import MetodoNoroeste  # noqa: E402
+from app.logic.costo_minimo import MetodoCostoMinimo  # noqa: E402
+from app.logic.russell import MetodoRussell  # noqa: E402
+from app.logic.vectorizado import MetodoVogelNumpy, numpy_disponible  # noqa: E402
+from app.utils.balanceador import balancear  # noqa: E402
+from app.controllers.resolver_controller import (  # noqa: E402
+    _build_step_table_html, _PlantillaTabla, _penalizaciones_de_paso
+)
+
+PRESETS = {
+    "rapido": {"tamanos": [5, 20, 50, 100], "e2e": [5, 20, 50], "peticiones": 30},
+    "completo": {"tamanos": [5, 20, 50, 100, 200, 500, 1000], "e2e": [5, 20, 50, 100], "peticiones": 50},
+}
+
+# por encima de este tamaño el registro expandido de Vogel/Noroeste ocupa demasiada memoria
+LIMITE_EXPANDIDO = 200
+# pasos cuyo HTML se mide (el tiempo se informa por paso)
+PASOS_HTML = 5
+# diferencias menores que esto se consideran ruido al comparar con la base
+PISO_RUIDO_S = 0.002
+
+
+def medir(funcion, repeticiones, memoria=True):
+    """Ejecuta funcion() `repeticiones` veces; devuelve tiempos y pico de memoria de una ejecución extra."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    datos = {
+        "mediana_s": statistics.median(tiempos),
+        "min_s": min(tiempos),
+        "repeticiones": repeticiones,
+    }
+    if memoria:
+        tracemalloc.start()
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        datos["pico_mem_kb"] = pico // 1024
+    return datos
+
+
+def _repeticiones(s):
+    return 20 if s <= 20 else 5 if s <= 100 else 1
+
+
+def bench_componentes(tamanos, registrar):
+    for familia in FAMILIAS:
+        for s in tamanos:
+            costos, oferta, demanda = generar(familia, s)
+            m, n = len(oferta), len(demanda)
+            etiqueta = f"{familia}/{m}x{n}"
+            rep = _repeticiones(s)
+
+            registrar(f"balancear/{etiqueta}", medir(lambda: balancear(costos, oferta, demanda), rep))
+            costos_b, oferta_b, demanda_b, meta = balancear(costos, oferta, demanda)
+
+            registros = ["ninguno"] + (["expandido"] if s <= LIMITE_EXPANDIDO else [])
+            for registro in registros:
+                registrar(f"vogel[{registro}]/{etiqueta}", medir(
+                    lambda: MetodoVogel(costos_b, oferta_b[:], demanda_b[:], registro).resolver(), rep))
+                registrar(f"noroeste[{registro}]/{etiqueta}", medir(
+                    lambda: MetodoNoroeste(costos_b, oferta_b[:], demanda_b[:], registro).resolver(), rep))
+                registrar(f"costo_minimo[{registro}]/{etiqueta}", medir(
+                    lambda: MetodoCostoMinimo(costos_b, oferta_b[:], demanda_b[:], registro).resolver(), rep))
+                registrar(f"russell[{registro}]/{etiqueta}", medir(
+                    lambda: MetodoRussell(costos_b, oferta_b[:], demanda_b[:], registro).resolver(), rep))
+                if numpy_disponible():
+                    registrar(f"vogel_numpy[{registro}]/{etiqueta}", medir(
+                        lambda: MetodoVogelNumpy(costos_b, oferta_b[:], demanda_b[:], registro).resolver(), rep))
+
+            # HTML por paso con la plantilla compartida, como en _build_pasos_html
+            # sólo los primeros pasos: el registro expandido completo no cabe en memoria a 1000×1000
+            pasos = list(itertools.islice(MetodoVogel(costos_b, oferta_b[:], demanda_b[:]).iterar(), PASOS_HTML + 1))
+            plantilla = _PlantillaTabla(costos_b, meta)
+            k = min(PASOS_HTML, len(pasos))
+
+            def html_pasos():
+                for idx in range(k):
+                    pen = _penalizaciones_de_paso(pasos[idx + 1]) if idx + 1 < len(pasos) else None
+                    _build_step_table_html(costos_b, oferta_b, demanda_b, pasos[idx], meta, idx + 1, plantilla, pen)
+
+            datos = medir(html_pasos, max(1, rep // 2))
+            datos["pasos"] = k
+            datos["por_paso_s"] = datos["mediana_s"] / k if k else 0
+            registrar(f"paso_html/{etiqueta}", datos)
+
+
+def bench_endpoints(tamanos, peticiones, registrar):
+    from app.main import create_app
+    cliente = create_app().test_client()
+    for ruta in ("/resolver/vogel", "/resolver/noroeste"):
+        for s in tamanos:
+            costos, oferta, demanda = generar("cuadrado", s)
+            cuerpo = {"costos": costos, "oferta": oferta, "demanda": demanda}
+            latencias = []
+            inicio_total = time.perf_counter()
+            for _ in range(peticiones):
+                inicio = time.perf_counter()
+                respuesta = cliente.post(ruta, json=cuerpo)
+                respuesta.get_data()
+                latencias.append(time.perf_counter() - inicio)
+                if respuesta.status_code != 200:
+                    raise RuntimeError(f"{ruta} devolvió {respuesta.status_code}")
+            total = time.perf_counter() - inicio_total
+            latencias.sort()
+            datos = {
+                "mediana_s": statistics.median(latencias),
+                "p95_s": latencias[min(len(latencias) - 1, int(0.95 * len(latencias)))],
+                "min_s": latencias[0],
+                "repeticiones": peticiones,
+                "peticiones_por_s": peticiones / total,
+            }
+            tracemalloc.start()
+            cliente.post(ruta, json=cuerpo).get_data()
+            datos["pico_mem_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+            registrar(f"e2e{ruta}/{s}x{s}", datos)
+
+
+def comparar(actual, base, tolerancia):
+    """Lista de regresiones (nombre, métrica, valor base, valor actual) frente a la base."""
+    regresiones = []
+    for nombre, datos in actual["resultados"].items():
+        previo = base["resultados"].get(nombre)
+        if previo is None:
+            continue
+        # el mínimo es el estimador menos sensible a la carga de la máquina
+        t_base, t_act = previo["min_s"], datos["min_s"]
+        if t_act > t_base * (1 + tolerancia) and t_act - t_base > PISO_RUIDO_S:
+            regresiones.append((nombre, "min_s", t_base, t_act))
+        m_base, m_act = previo.get("pico_mem_kb"), datos.get("pico_mem_kb")
+        if m_base and m_act and m_act > m_base * (1 + tolerancia) and m_act - m_base > 64:
+            regresiones.append((nombre, "pico_mem_kb", m_base, m_act))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de los métodos de transporte")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="rapido")
+    parser.add_argument("--tamanos", type=int, nargs="+", help="tamaños base (reemplaza los del preset)")
+    parser.add_argument("--solo", choices=("componentes", "endpoints"), help="ejecutar sólo una parte")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de base contra el que detectar regresiones")
+    parser.add_argument("--guardar-base", help="guardar los resultados como nueva base")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="regresión si empeora más de esta fracción")
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    tamanos = args.tamanos or preset["tamanos"]
+    resultados = {}
+
+    def registrar(nombre, datos):
+        resultados[nombre] = datos
+        extra = f"  {datos['pico_mem_kb']:>8} KB" if "pico_mem_kb" in datos else ""
+        print(f"{nombre:<55} {datos['mediana_s'] * 1000:>10.2f} ms{extra}", flush=True)
+
+    if args.solo in (None, "componentes"):
+        bench_componentes(tamanos, registrar)
+    if args.solo in (None, "endpoints"):
+        bench_endpoints([s for s in preset["e2e"] if not args.tamanos or s in tamanos], preset["peticiones"], registrar)
+
+    informe = {
+        "meta": {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "numpy": numpy_disponible(),
+            "preset": args.preset,
+            "tamanos": tamanos,
+        },
+        "resultados": resultados,
+    }
+    for ruta in (args.salida, args.guardar_base):
+        if ruta:
+            with open(ruta, "w", encoding="utf-8") as f:
+                json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regresiones = comparar(informe, base, args.tolerancia)
+        for nombre, metrica, antes, ahora in regresiones:
+            print(f"REGRESIÓN {nombre} {metrica}: {antes:.4g} -> {ahora:.4g}")
+        if regresiones:
+            return 1
+        print(f"Sin regresiones frente a {args.comparar} (tolerancia {args.tolerancia:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+# cli.py
+"""
+Resolución por lotes de problemas guardados en disco, sin levantar la app Flask.
+
+Uso (desde la raíz del repositorio):
+
+    python cli.py problemas/ --metodo vogel --salida resultados.jsonl
+    python cli.py a.json b.csv app/tes.txt --no-steps --salida resumen.csv
+    python cli.py problemas/ --jobs 4 --salida resultados.jsonl --reanudar
+
+Cada argumento es un archivo o un directorio. En los directorios se buscan, de
+forma recursiva, archivos .json, .csv y .txt (ver leer_archivo en
+app/models/input_schema.py). Los formatos son:
+
+  - .json: un problema con el mismo JSON que /resolver/batch, o una lista de ellos.
+  - .csv: la tabla de transporte, con la oferta en la última columna y la demanda en la última fila.
+  - .txt: el formato de app/tes.txt (listas JSON seguidas de su nombre).
+
+Cada problema se resuelve con app.logic.lote.resolver_problema, igual que en
+/resolver/batch. Los resultados se escriben en cuanto salen, en el orden de
+entrada. En JSONL va una línea por problema con el mismo objeto que devuelve el
+lote más "entrada". En CSV va una fila de resumen con las asignaciones como JSON.
+Con --jobs N los problemas se reparten en N procesos. Con --no-steps no se
+guarda registro de pasos, que es el camino más rápido. Con --descomponer cada
+componente de rutas permitidas se resuelve por separado. Con --reanudar la salida
+existente se conserva y se omiten las entradas que ya tienen status "ok".
+
+Sale con 1 si algún problema terminó con error. Este módulo no importa Flask,
+así que arranca rápido.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.logic.lote import FABRICAS, resolver_problema, _error_item
+from app.logic.vectorizado import MODOS
+from app.logic.bitacora import FORMATOS_PASOS
+from app.logic.numerico import MODOS_NUMERICOS, valor_json
+from app.models.input_schema import leer_archivo, ErrorEntrada, EXTENSIONES_ARCHIVO
+
+FORMATOS_SALIDA = ("jsonl", "csv")
+
+CAMPOS_CSV = ("entrada", "status", "metodo", "costo_total", "num_pasos", "error", "asignaciones")
+
+# problemas en vuelo por proceso: acota la memoria sin dejar procesos ociosos
+EN_VUELO_POR_PROCESO = 4
+
+
+def _archivos(rutas):
+    """Archivos de problemas en el orden dado; los directorios se recorren ordenados."""
+    for ruta in rutas:
+        if not os.path.isdir(ruta):
+            yield ruta
+            continue
+        for raiz, dirs, nombres in os.walk(ruta):
+            dirs.sort()
+            for nombre in sorted(nombres):
+                if nombre.lower().endswith(EXTENSIONES_ARCHIVO):
+                    yield os.path.join(raiz, nombre)
+
+
+def _tareas(rutas, opciones, resueltas):
+    """
+    (entrada, problema, error) por problema. Las opciones de la línea de comandos
+    prevalecen sobre las del archivo. Las entradas ya resueltas se omiten.
+    """
+    for ruta in _archivos(rutas):
+        try:
+            problemas = leer_archivo(ruta)
+        except ErrorEntrada as e:
+            if ruta not in resueltas:
+                yield ruta, None, _error_item(str(e), e.status)
+            continue
+        for entrada, problema in problemas:
+            if entrada in resueltas:
+                continue
+            if isinstance(problema, dict):
+                problema = {**problema, **opciones}
+            yield entrada, problema, None
+
+
+def _resolver(tareas, jobs):
+    """(entrada, resultado) en el orden de `tareas`; con jobs > 1, en un pool con a lo sumo EN_VUELO_POR_PROCESO·jobs problemas pendientes."""
+    if jobs <= 1:
+        for entrada, problema, error in tareas:
+            yield entrada, error if error is not None else resolver_problema(problema)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        en_vuelo = deque()
+        for entrada, problema, error in tareas:
+            en_vuelo.append((entrada, error if error is not None else pool.submit(resolver_problema, problema)))
+            if len(en_vuelo) >= EN_VUELO_POR_PROCESO * jobs:
+                entrada, pendiente = en_vuelo.popleft()
+                yield entrada, pendiente if isinstance(pendiente, dict) else pendiente.result()
+        while en_vuelo:
+            entrada, pendiente = en_vuelo.popleft()
+            yield entrada, pendiente if isinstance(pendiente, dict) else pendiente.result()
+
+
+# --- salida ---
+
+def _resueltas(ruta, formato):
+    """Entradas con status "ok" en una salida anterior. Se ignora una última línea a medio escribir."""
+    resueltas = set()
+    if ruta is None or not os.path.exists(ruta):
+        return resueltas
+    with open(ruta, encoding="utf-8", newline="") as f:
+        if formato == "csv":
+            filas = csv.DictReader(f)
+        else:
+            filas = []
+            for linea in f:
+                try:
+                    filas.append(json.loads(linea))
+                except ValueError:
+                    continue
+        for fila in filas:
+            if fila.get("status") == "ok" and fila.get("entrada"):
+                resueltas.add(fila["entrada"])
+    return resueltas
+
+
+class EscritorJSONL:
+    def __init__(self, archivo):
+        self.archivo = archivo
+
+    def escribir(self, entrada, resultado):
+        linea = json.dumps({"entrada": entrada, **resultado}, ensure_ascii=False, default=valor_json)
+        self.archivo.write(linea + "\n")
+        self.archivo.flush()
+
+
+def _numero_csv(valor):
+    # Fraction como "p/q"; int y float tal cual
+    try:
+        return valor_json(valor)
+    except TypeError:
+        return valor
+
+
+class EscritorCSV:
+    def __init__(self, archivo, cabecera=True):
+        self.archivo = archivo
+        self.escritor = csv.DictWriter(archivo, fieldnames=CAMPOS_CSV)
+        if cabecera:
+            self.escritor.writeheader()
+
+    def escribir(self, entrada, resultado):
+        asignaciones = resultado.get("asignaciones")
+        self.escritor.writerow({
+            "entrada": entrada,
+            "status": resultado["status"],
+            "metodo": resultado.get("metodo", ""),
+            "costo_total": _numero_csv(resultado.get("costo_total", "")),
+            "num_pasos": resultado.get("num_pasos", ""),
+            "error": resultado.get("error") or resultado.get("error_solver") or "",
+            "asignaciones": "" if asignaciones is None else json.dumps(asignaciones, default=valor_json),
+        })
+        self.archivo.flush()
+
+
+def _formato(args):
+    if args.formato:
+        return args.formato
+    if args.salida and args.salida.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def _argumentos(argv):
+    parser = argparse.ArgumentParser(description="Resuelve problemas de transporte guardados en archivos.")
+    parser.add_argument("rutas", nargs="+", help="archivos (.json, .csv, .txt) o directorios de problemas")
+    parser.add_argument("--metodo", choices=list(FABRICAS), help="método de solución (por defecto, el del archivo o vogel)")
+    parser.add_argument("--modo", choices=list(MODOS), help="python, numpy o auto")
+    parser.add_argument("--formato-pasos", choices=list(FORMATOS_PASOS), help="registro de pasos expandido o compacto")
+    parser.add_argument("--no-steps", action="store_true", help="sin registro de pasos (sólo asignaciones, costo y número de pasos)")
+    parser.add_argument("--optimizar", action="store_true", help="aplica MODI a la solución inicial")
+    parser.add_argument("--descomponer", action="store_true",
+                        help="resuelve por separado cada componente de rutas permitidas (ver app/logic/bloques.py)")
+    parser.add_argument("--numerico", choices=list(MODOS_NUMERICOS), help="auto o fraccion (resultados exactos)")
+    parser.add_argument("--tolerancia", type=float, help="tolerancia relativa para cantidades float")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="procesos en paralelo (por defecto 1)")
+    parser.add_argument("--salida", "-o", help="archivo de resultados (por defecto, la salida estándar)")
+    parser.add_argument("--formato", choices=FORMATOS_SALIDA, help="jsonl o csv (por defecto según la extensión de --salida)")
+    parser.add_argument("--reanudar", action="store_true", help="conserva --salida y omite las entradas ya resueltas")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs debe ser al menos 1.")
+    if args.reanudar and not args.salida:
+        parser.error("--reanudar requiere --salida.")
+    return args
+
+
+def _opciones(args, formato):
+    opciones = {}
+    for clave in ("metodo", "modo", "formato_pasos", "numerico", "tolerancia"):
+        valor = getattr(args, clave)
+        if valor is not None:
+            opciones[clave] = valor
+    if args.optimizar:
+        opciones["optimizar"] = True
+    if args.descomponer:
+        opciones["descomponer"] = True
+    # en CSV no caben los pasos: tampoco se registran
+    opciones["detalle"] = "resumen" if args.no_steps or formato == "csv" else "pasos"
+    return opciones
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    formato = _formato(args)
+    resueltas = _resueltas(args.salida, formato) if args.reanudar else set()
+    tareas = _tareas(args.rutas, _opciones(args, formato), resueltas)
+
+    if args.salida:
+        previo = args.reanudar and os.path.exists(args.salida) and os.path.getsize(args.salida) > 0
+        archivo = open(args.salida, "a" if previo else "w", encoding="utf-8", newline="")
+        if previo:
+            # una ejecución interrumpida puede haber dejado la última línea sin terminar
+            with open(args.salida, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    archivo.write("\n")
+    else:
+        archivo = sys.stdout
+        previo = False
+
+    escritor = EscritorCSV(archivo, cabecera=not previo) if formato == "csv" else EscritorJSONL(archivo)
+    total = errores = 0
+    try:
+        for entrada, resultado in _resolver(tareas, args.jobs):
+            escritor.escribir(entrada, resultado)
+            total += 1
+            errores += resultado["status"] != "ok"
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+    print(f"{total} problemas resueltos ({errores} con error); {len(resueltas)} ya estaban resueltos en la salida.",
+          file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
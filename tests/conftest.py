@@ -0,0 +1,9 @@
+# tests/conftest.py
+#
+# Las pruebas importan el paquete `app` desde la raíz del repositorio, también
+# cuando se ejecuta `pytest` sin `python -m`.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,99 @@
+# tests/referencia.py
+#
+# Versiones de referencia de Vogel y Noroeste, escritas de la forma más directa
+# posible (sin motor de penalizaciones ni punteros) y con las mismas reglas de
+# desempate que app/logic: sirven para comprobar las asignaciones y el orden de
+# los pasos de los solvers optimizados. Sólo enteros, sin tolerancias.
+
+import random
+
+
+def instancia(rnd, filas, columnas, max_costo=9, max_cantidad=30):
+    """Problema balanceado aleatorio: (costos, oferta, demanda) con enteros positivos."""
+    costos = [[rnd.randint(1, max_costo) for _ in range(columnas)] for _ in range(filas)]
+    oferta = [rnd.randint(1, max_cantidad) for _ in range(filas)]
+    demanda = [rnd.randint(1, max_cantidad) for _ in range(columnas)]
+    # se reparte la diferencia para que oferta y demanda sumen lo mismo
+    diferencia = sum(oferta) - sum(demanda)
+    destino = demanda if diferencia > 0 else oferta
+    for _ in range(abs(diferencia)):
+        destino[rnd.randrange(len(destino))] += 1
+    return costos, oferta, demanda
+
+
+def instancias(semilla, cantidad, max_lado=8):
+    rnd = random.Random(semilla)
+    for _ in range(cantidad):
+        yield instancia(rnd, rnd.randint(1, max_lado), rnd.randint(1, max_lado))
+
+
+def _retirar(oferta, demanda, fila_viva, col_viva, i, j, cantidad):
+    oferta[i] -= cantidad
+    demanda[j] -= cantidad
+    if oferta[i] == 0:
+        fila_viva[i] = False
+    if demanda[j] == 0:
+        col_viva[j] = False
+
+
+def vogel(costos, oferta, demanda):
+    """Pasos (fila, columna, cantidad) de Vogel y la matriz de asignaciones."""
+    oferta, demanda = list(oferta), list(demanda)
+    m, n = len(oferta), len(demanda)
+    fila_viva = [o > 0 for o in oferta]
+    col_viva = [d > 0 for d in demanda]
+    asignaciones = [[0] * n for _ in range(m)]
+    pasos = []
+
+    def orden_fila(i):
+        return sorted((costos[i][j], j) for j in range(n) if col_viva[j] and costos[i][j] is not None)
+
+    def orden_columna(j):
+        return sorted((costos[i][j], i) for i in range(m) if fila_viva[i] and costos[i][j] is not None)
+
+    def penalizacion(orden):
+        # diferencia entre los dos menores costos vivos; un solo costo cuenta entero
+        if not orden:
+            return -1
+        if len(orden) == 1:
+            return orden[0][0]
+        return orden[1][0] - orden[0][0]
+
+    while any(fila_viva) and any(col_viva):
+        lineas = [("fila", i, orden_fila(i)) for i in range(m) if fila_viva[i]]
+        lineas += [("columna", j, orden_columna(j)) for j in range(n) if col_viva[j]]
+        mayor = max(penalizacion(orden) for _, _, orden in lineas)
+        # empate: menor costo mínimo, luego menor índice, y la fila antes que la columna
+        tipo, pos, orden = min(
+            (linea for linea in lineas if penalizacion(linea[2]) == mayor),
+            key=lambda linea: (linea[2][0][0] if linea[2] else float("inf"), linea[1], linea[0] != "fila"))
+        if not orden:
+            break
+        i, j = (pos, orden[0][1]) if tipo == "fila" else (orden[0][1], pos)
+        cantidad = min(oferta[i], demanda[j])
+        asignaciones[i][j] = cantidad
+        pasos.append((i, j, cantidad))
+        _retirar(oferta, demanda, fila_viva, col_viva, i, j, cantidad)
+    return pasos, asignaciones
+
+
+def noroeste(costos, oferta, demanda):
+    """Pasos (fila, columna, cantidad) de la esquina noroeste (costos densos) y la matriz de asignaciones."""
+    oferta, demanda = list(oferta), list(demanda)
+    m, n = len(oferta), len(demanda)
+    asignaciones = [[0] * n for _ in range(m)]
+    pasos = []
+    i = j = 0
+    while i < m and j < n:
+        if oferta[i] == 0:
+            i += 1
+            continue
+        if demanda[j] == 0:
+            j += 1
+            continue
+        cantidad = min(oferta[i], demanda[j])
+        asignaciones[i][j] = cantidad
+        pasos.append((i, j, cantidad))
+        oferta[i] -= cantidad
+        demanda[j] -= cantidad
+    return pasos, asignaciones
@@ -0,0 +1,90 @@
+# tests/test_cambios.py
+
+import random
+
+import pytest
+
+from app.logic.cambios import reresolver, verificar_asignaciones, basificar
+from app.logic.modi import MetodoModi, costo_total
+from app.logic.lote import FABRICAS
+from app.utils.balanceador import balancear
+import referencia
+
+
+def _sin_ciclos(asignaciones):
+    """True si las celdas con flujo no forman ciclos (filas y columnas como nodos de un bosque)."""
+    m = len(asignaciones)
+    padre = list(range(m + len(asignaciones[0])))
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for i, fila in enumerate(asignaciones):
+        for j, x in enumerate(fila):
+            if x:
+                a, b = raiz(i), raiz(m + j)
+                if a == b:
+                    return False
+                padre[a] = b
+    return True
+
+
+def _cambios(rnd, oferta, demanda):
+    m, n = len(oferta), len(demanda)
+    cambios = {"costos": [], "oferta": [], "demanda": []}
+    for _ in range(rnd.randint(1, 3)):
+        cambios["costos"].append([rnd.randrange(m), rnd.randrange(n), rnd.randint(1, 9)])
+    if rnd.random() < 0.5:
+        cambios["oferta"].append([rnd.randrange(m), rnd.randint(1, 30)])
+    if rnd.random() < 0.5:
+        cambios["demanda"].append([rnd.randrange(n), rnd.randint(1, 30)])
+    return cambios
+
+
+@pytest.mark.parametrize("metodo", ["vogel", "noroeste", "costo_minimo"])
+def test_reparacion_factible_y_basica(metodo):
+    rnd = random.Random(21)
+    for _ in range(150):
+        costos, oferta, demanda = referencia.instancia(rnd, rnd.randint(2, 7), rnd.randint(2, 7))
+        # también problemas sin balancear: la línea ficticia puede aparecer, cambiar o desaparecer
+        oferta[0] += rnd.randint(0, 10)
+        costos_b, oferta_b, demanda_b, _ = balancear(costos, oferta, demanda)
+        previas = FABRICAS[metodo](costos_b, oferta_b, demanda_b, "python", "ninguno").resolver()["asignaciones"]
+
+        cambios = _cambios(rnd, oferta, demanda)
+        costos_n, oferta_n, demanda_n, costos_nb, asignaciones, _, info = reresolver(
+            costos, oferta, demanda, previas, cambios, metodo, "python")
+        _, oferta_nb, demanda_nb, _ = balancear(costos_n, oferta_n, demanda_n)
+        assert "error_solver" not in info
+        assert verificar_asignaciones(asignaciones, oferta_nb, demanda_nb, costos_b=costos_nb) is None
+        assert _sin_ciclos(asignaciones), info
+        assert sum(1 for fila in asignaciones for x in fila if x) <= len(oferta_nb) + len(demanda_nb) - 1
+
+
+def test_sin_cambios_conserva_la_solucion():
+    for costos, oferta, demanda in referencia.instancias(semilla=22, cantidad=30):
+        _, asignaciones_ref = referencia.vogel(costos, oferta, demanda)
+        *_, asignaciones, _, info = reresolver(costos, oferta, demanda, asignaciones_ref, {}, "vogel", "python")
+        assert asignaciones == asignaciones_ref
+        assert info["subproblema"] == [0, 0] and not info["completa"]
+
+
+def test_basificar_solucion_no_basica():
+    rnd = random.Random(23)
+    for _ in range(100):
+        m, n = rnd.randint(2, 6), rnd.randint(2, 6)
+        # todas las celdas con flujo: factible y con ciclos
+        asignaciones = [[rnd.randint(1, 9) for _ in range(n)] for _ in range(m)]
+        costos = [[rnd.randint(1, 20) for _ in range(n)] for _ in range(m)]
+        oferta = [sum(fila) for fila in asignaciones]
+        demanda = [sum(col) for col in zip(*asignaciones)]
+        costo = costo_total(costos, asignaciones)
+        celdas = [(i, j) for i in range(m) for j in range(n)]
+        basificar(costos, asignaciones, [], celdas)
+        assert verificar_asignaciones(asignaciones, oferta, demanda, costos_b=costos) is None
+        assert _sin_ciclos(asignaciones)
+        assert costo_total(costos, asignaciones) <= costo
+        MetodoModi(costos, asignaciones).resolver()
@@ -0,0 +1,35 @@
+# tests/test_modi.py
+
+from app.logic.lote import FABRICAS
+from app.logic.modi import MetodoModi, optimizar_solucion
+from app.logic.bitacora import error_resultado
+
+
+def test_modi_saca_flujo_de_rutas_prohibidas():
+    opt = MetodoModi([[1, None], [3, 2]], [[0, 5], [5, 0]]).resolver()
+    assert opt["asignaciones"] == [[5, 0], [0, 5]]
+    assert opt["costo_inicial"] is None
+    assert opt["costo_final"] == 15
+    assert opt["optimo"]
+
+
+def test_modi_infactible_no_lanza():
+    # sólo las rutas (0, 0) y (1, 1) están permitidas y la columna 1 pide más que la fila 1
+    opt = MetodoModi([[1, None], [None, 2]], [[3, 2], [0, 5]]).resolver()
+    assert opt["costo_final"] is None
+    assert not opt["optimo"]
+    assert "motivo" in opt
+
+
+def test_no_optimiza_solucion_incompleta():
+    costos = [[1, None], [None, 2]]
+    for metodo in ("vogel", "noroeste"):
+        for registro in ("expandido", "compacto", "ninguno"):
+            resultado = FABRICAS[metodo](costos, [5, 5], [3, 7], "python", registro).resolver()
+            error = error_resultado(resultado)
+            assert error
+            asignaciones, optimizacion, costo = optimizar_solucion(costos, resultado["asignaciones"], error)
+            assert asignaciones == [[3, 0], [0, 5]]
+            assert not optimizacion["optimo"]
+            assert error in optimizacion["motivo"]
+            assert costo == 13
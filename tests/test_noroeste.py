@@ -0,0 +1,79 @@
+# tests/test_noroeste.py
+
+import pytest
+
+from app.logic.vectorizado import crear_noroeste, numpy_disponible
+from app.logic.noroeste import MetodoNoroeste
+from app.logic.dispersa import MatrizDispersa
+from app.logic.modi import costo_total
+import referencia
+
+MODOS = ["python", pytest.param("numpy", marks=pytest.mark.skipif(not numpy_disponible(), reason="sin NumPy"))]
+
+
+def _lista(asignaciones):
+    return asignaciones.tolist() if hasattr(asignaciones, "tolist") else asignaciones
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_coincide_con_la_referencia(modo):
+    for costos, oferta, demanda in referencia.instancias(semilla=11, cantidad=150):
+        pasos_ref, asignaciones_ref = referencia.noroeste(costos, oferta, demanda)
+        resultado = crear_noroeste(costos, oferta, demanda, modo).resolver()
+        assert _lista(resultado["asignaciones"]) == asignaciones_ref
+        assert [(*p["celda"], p["asignacion"]) for p in resultado["pasos"]] == pasos_ref
+
+
+@pytest.mark.skipif(not numpy_disponible(), reason="sin NumPy")
+@pytest.mark.parametrize("registro", ["expandido", "compacto", "ninguno"])
+def test_numpy_igual_a_python(registro):
+    for costos, oferta, demanda in referencia.instancias(semilla=12, cantidad=60, max_lado=12):
+        py = crear_noroeste(costos, oferta, demanda, "python", registro).resolver()
+        np_ = crear_noroeste(costos, oferta, demanda, "numpy", registro).resolver()
+        assert _lista(np_["asignaciones"]) == py["asignaciones"]
+        assert np_["num_pasos"] == py["num_pasos"]
+        if registro == "expandido":
+            assert np_["pasos"] == py["pasos"]
+        elif registro == "compacto":
+            assert np_["bitacora"].a_dict() == py["bitacora"].a_dict()
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_salta_la_esquina_prohibida(modo):
+    # (0, 0) y (1, 1) prohibidas: el recorrido no puede empezar en la esquina
+    costos = MatrizDispersa(2, 2)
+    costos[0][1] = 3
+    costos[1][0] = 4
+    resultado = crear_noroeste(costos, [5, 5], [5, 5], modo).resolver()
+    assert sorted(resultado["asignaciones"]) == [[0, 1, 5], [1, 0, 5]]
+    assert "error" not in resultado
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_nunca_asigna_en_rutas_prohibidas(modo):
+    for costos, oferta, demanda in referencia.instancias(semilla=13, cantidad=150):
+        for i, fila in enumerate(costos):
+            for j in range(len(fila)):
+                if (3 * i + j) % 4 == 1:
+                    fila[j] = None
+        resultado = crear_noroeste(costos, oferta, demanda, modo).resolver()
+        asignaciones = _lista(resultado["asignaciones"])
+        for i, fila in enumerate(asignaciones):
+            for j, cantidad in enumerate(fila):
+                assert cantidad == 0 or costos[i][j] is not None
+        if "error" not in resultado and not (resultado["pasos"] and "error" in resultado["pasos"][-1]):
+            assert [sum(fila) for fila in asignaciones] == oferta
+            assert [sum(col) for col in zip(*asignaciones)] == demanda
+            costo_total(costos, asignaciones)  # lanza si hay flujo en una ruta prohibida
+
+
+def test_error_si_no_queda_ruta_permitida():
+    # la fila 1 sólo puede enviar a la columna 0, que la fila 0 ya agota
+    costos = [[1, 2], [3, None]]
+    resultado = MetodoNoroeste(costos, [5, 5], [5, 5], "ninguno").resolver()
+    assert resultado["error"] == "No se encontró celda válida para asignar"
+
+
+def test_costo_total_rechaza_flujo_en_ruta_prohibida():
+    with pytest.raises(ValueError):
+        costo_total([[1, None], [2, 3]], [[0, 5], [5, 0]])
@@ -0,0 +1,102 @@
+# tests/test_vogel.py
+
+import pytest
+
+from app.logic.vectorizado import crear_vogel, numpy_disponible
+from app.logic.vogel import MetodoVogel
+from app.logic.dispersa import MatrizDispersa, asignaciones_a_rutas
+import referencia
+
+MODOS = ["python", pytest.param("numpy", marks=pytest.mark.skipif(not numpy_disponible(), reason="sin NumPy"))]
+
+
+def _lista(asignaciones):
+    return asignaciones.tolist() if hasattr(asignaciones, "tolist") else asignaciones
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_coincide_con_la_referencia(modo):
+    for costos, oferta, demanda in referencia.instancias(semilla=1, cantidad=150):
+        pasos_ref, asignaciones_ref = referencia.vogel(costos, oferta, demanda)
+        resultado = crear_vogel(costos, oferta, demanda, modo).resolver()
+        assert _lista(resultado["asignaciones"]) == asignaciones_ref
+        assert [(*p["celda_elegida"], p["asignacion_realizada"]) for p in resultado["pasos"]] == pasos_ref
+        assert resultado["num_pasos"] == len(pasos_ref)
+
+
+@pytest.mark.skipif(not numpy_disponible(), reason="sin NumPy")
+@pytest.mark.parametrize("registro", ["expandido", "compacto", "ninguno"])
+def test_numpy_igual_a_python(registro):
+    for costos, oferta, demanda in referencia.instancias(semilla=2, cantidad=60, max_lado=12):
+        py = crear_vogel(costos, oferta, demanda, "python", registro).resolver()
+        np_ = crear_vogel(costos, oferta, demanda, "numpy", registro).resolver()
+        assert _lista(np_["asignaciones"]) == py["asignaciones"]
+        assert np_["num_pasos"] == py["num_pasos"]
+        if registro == "expandido":
+            assert np_["pasos"] == py["pasos"]
+        elif registro == "compacto":
+            assert np_["bitacora"].a_dict() == py["bitacora"].a_dict()
+
+
+def test_bitacora_compacta_reconstruye_los_pasos_expandidos():
+    for costos, oferta, demanda in referencia.instancias(semilla=3, cantidad=40):
+        expandido = MetodoVogel(costos, oferta, demanda, "expandido").resolver()["pasos"]
+        bitacora = MetodoVogel(costos, oferta, demanda, "compacto").resolver()["bitacora"]
+        for k, paso in enumerate(expandido, start=1):
+            reconstruido = bitacora.paso_expandido(k)
+            for campo in ("celda_elegida", "asignacion_realizada", "oferta_restante", "demanda_restante",
+                          "oferta_posterior", "demanda_posterior"):
+                assert reconstruido[campo] == paso[campo], campo
+
+
+def test_rutas_prohibidas():
+    # (0, 0) y (1, 1) prohibidas: la única solución es la diagonal opuesta
+    costos = MatrizDispersa(2, 2)
+    costos[0][1] = 3
+    costos[1][0] = 4
+    resultado = MetodoVogel(costos, [5, 5], [5, 5]).resolver()
+    assert sorted(resultado["asignaciones"]) == [[0, 1, 5], [1, 0, 5]]
+    assert "error" not in resultado
+
+
+def test_rutas_prohibidas_aleatorias():
+    # con None en la matriz densa: la referencia también las salta
+    for costos, oferta, demanda in referencia.instancias(semilla=4, cantidad=100):
+        for i, fila in enumerate(costos):
+            for j in range(len(fila)):
+                if (i + 2 * j) % 3 == 0 and len(fila) > 1:
+                    fila[j] = None
+        pasos_ref, asignaciones_ref = referencia.vogel(costos, oferta, demanda)
+        resultado = MetodoVogel(costos, oferta, demanda).resolver()
+        pasos = [p for p in resultado["pasos"] if "error" not in p]
+        assert [(*p["celda_elegida"], p["asignacion_realizada"]) for p in pasos] == pasos_ref
+        for i, fila in enumerate(resultado["asignaciones"]):
+            for j, cantidad in enumerate(fila):
+                assert cantidad == 0 or costos[i][j] is not None
+
+
+def test_dispersa_igual_a_densa_con_none():
+    for costos, oferta, demanda in referencia.instancias(semilla=5, cantidad=60):
+        dispersa = MatrizDispersa(len(oferta), len(demanda))
+        for i, fila in enumerate(costos):
+            for j, c in enumerate(fila):
+                if (i * 7 + j) % 4:
+                    dispersa[i][j] = c
+                else:
+                    fila[j] = None
+        densa = MetodoVogel(costos, oferta, demanda, "ninguno").resolver()
+        rutas = MetodoVogel(dispersa, oferta, demanda, "ninguno").resolver()
+        assert rutas["asignaciones"] == asignaciones_a_rutas(
+            [{j: a for j, a in enumerate(fila) if a} for fila in densa["asignaciones"]])
+        assert rutas.get("error") == densa.get("error")
+
+
+def test_reproducir_sigue_con_los_mismos_pasos():
+    # base de las páginas de /resolver/<id>/pasos: mismos pasos expandidos que la resolución completa
+    for costos, oferta, demanda in referencia.instancias(semilla=6, cantidad=40):
+        completos = MetodoVogel(costos, oferta, demanda).resolver()["pasos"]
+        bitacora = MetodoVogel(costos, oferta, demanda, "compacto").resolver()["bitacora"]
+        for desde in range(1, len(completos) + 1):
+            metodo = MetodoVogel(costos, oferta, demanda)
+            metodo.reproducir(bitacora.pasos[:desde - 1])
+            assert list(metodo.iterar(guardar=False)) == completos[desde - 1:]